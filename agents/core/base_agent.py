@@ -15,7 +15,8 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 """
 
-from typing import List, Optional, Any, Dict, Callable
+from types import MappingProxyType
+from typing import List, Optional, Any, Dict, Callable, Mapping, Tuple
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from enum import Enum
@@ -65,6 +66,10 @@ class GoogleCloudIntegration:
     
     This class manages connections to various Google Cloud services
     used by Axiom agents. Each service is lazily initialized on first use.
+    
+    Service availability is read from the environment once; call
+    `reload()` after changing credentials. Each reload bumps `version`,
+    which invalidates the agents' tool snapshots.
     """
     
     _instance = None
@@ -77,6 +82,11 @@ class GoogleCloudIntegration:
     
     def _initialize(self):
         """Initialize service configurations"""
+        self.version = 0
+        self._load()
+    
+    def _load(self):
+        """Read service configurations and availability from the environment"""
         self.services: Dict[GoogleCloudService, GoogleServiceConfig] = {
             GoogleCloudService.GEMINI: GoogleServiceConfig(
                 service=GoogleCloudService.GEMINI,
@@ -103,13 +113,21 @@ class GoogleCloudIntegration:
                 endpoint="aiplatform.googleapis.com"
             ),
         }
+        # Every known service, configured or not: availability is one dict lookup
+        self._available: Dict[GoogleCloudService, bool] = {
+            service: service in self.services and self.services[service].is_enabled
+            for service in GoogleCloudService
+        }
+    
+    def reload(self):
+        """Re-read service configuration (explicit hook; invalidates tool snapshots)"""
+        self._load()
+        self.version += 1
+        logger.info(f"🔄 Google Cloud services reloaded (version {self.version})")
     
     def is_service_available(self, service: GoogleCloudService) -> bool:
         """Check if a service is configured and available"""
-        return self.services.get(service, GoogleServiceConfig(
-            service=service, 
-            api_key_env=""
-        )).is_enabled
+        return self._available.get(service, False)
     
     def get_config(self, service: GoogleCloudService) -> Optional[GoogleServiceConfig]:
         """Get configuration for a service"""
@@ -124,6 +142,24 @@ google_cloud = GoogleCloudIntegration()
 # ADK TOOL SYSTEM
 # ═══════════════════════════════════════════════════════════════════════════════
 
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """
+    Result caching for an idempotent tool
+    
+    Calls with the same arguments (only `key_fields`, if given) reuse the
+    result for `ttl` seconds; at most `max_entries` results are kept.
+    
+    Example:
+        ```python
+        ADKTool(name="get_menu", ..., cache=ToolCachePolicy(ttl=900))
+        ```
+    """
+    ttl: float
+    key_fields: Optional[Tuple[str, ...]] = None
+    max_entries: int = 256
+
+
 @dataclass
 class ADKTool:
     """
@@ -131,14 +167,23 @@ class ADKTool:
     
     Tools are the building blocks of agent capabilities.
     Each tool represents a specific action an agent can perform.
+    
+    `cache` opts an idempotent tool into result caching; tools with side
+    effects (orders, bookings) set `mutating=True` and can never be cached.
     """
     name: str
     description: str
     description_ar: str
     required_service: Optional[GoogleCloudService] = None
     parameters: Dict[str, Any] = field(default_factory=dict)
+    cache: Optional[ToolCachePolicy] = None
+    mutating: bool = False
     _handler: Optional[Callable] = None
     
+    def __post_init__(self):
+        if self.mutating and self.cache is not None:
+            raise ValueError(f"Tool {self.name} is mutating and cannot have a cache policy")
+    
     def is_available(self) -> bool:
         """Check if this tool can be used"""
         if self.required_service is None:
@@ -153,6 +198,11 @@ class ADKTool:
             "parameters": self.parameters
         }
     
+    @property
+    def handler(self) -> Optional[Callable]:
+        """The execution handler (None until `set_handler()`)"""
+        return self._handler
+    
     def execute(self, **kwargs) -> Any:
         """Execute the tool with given parameters"""
         if self._handler:
@@ -165,6 +215,31 @@ class ADKTool:
         return self
 
 
+def _freeze(value: Any) -> Any:
+    """Read-only deep copy of a JSON-like value (dicts -> mappingproxy, lists -> tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ToolSnapshot:
+    """
+    Immutable view of an agent's available tools and their Gemini
+    function declarations, valid for one (tools, services) version
+    """
+    tools_version: int
+    services_version: int
+    tools: Tuple[ADKTool, ...]
+    declarations: Tuple[Mapping[str, Any], ...]
+    
+    @property
+    def version(self) -> str:
+        return f"{self.tools_version}.{self.services_version}"
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # AXIOM BASE AGENT (The Heart of ADK)
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -267,6 +342,10 @@ class AxiomBaseAgent(ABC):
         self.sub_agents = sub_agents or []
         self.required_services = required_services or [GoogleCloudService.GEMINI]
         
+        # Available tools + declarations, rebuilt only after reload_tools() / google_cloud.reload()
+        self._tools_version = 0
+        self._tool_snapshot: Optional[ToolSnapshot] = None
+        
         # Build system instruction
         self._instruction = self._build_system_instruction()
         
@@ -337,13 +416,41 @@ class AxiomBaseAgent(ABC):
         """Get the system instruction"""
         return self._instruction
     
-    def get_available_tools(self) -> List[ADKTool]:
-        """Get list of tools that are currently available"""
-        return [t for t in self.tools if t.is_available()]
+    def tool_snapshot(self) -> ToolSnapshot:
+        """Current tool snapshot (built on first use and after a reload)"""
+        snapshot = self._tool_snapshot
+        if (
+            snapshot is None
+            or snapshot.tools_version != self._tools_version
+            or snapshot.services_version != google_cloud.version
+        ):
+            tools = tuple(t for t in self.tools if t.is_available())
+            snapshot = self._tool_snapshot = ToolSnapshot(
+                tools_version=self._tools_version,
+                services_version=google_cloud.version,
+                tools=tools,
+                declarations=tuple(_freeze(t.to_function_declaration()) for t in tools)
+            )
+        return snapshot
+    
+    def reload_tools(self, tools: Optional[List[ADKTool]] = None) -> None:
+        """
+        Explicit reload hook: replace the tool list (or pick up in-place
+        edits to it) and invalidate the tool snapshot
+        """
+        if tools is not None:
+            self.tools = list(tools)
+        self._tools_version += 1
+        self._instruction = self._build_system_instruction()
+        logger.info(f"🔄 Tools reloaded for '{self.name}' (version {self._tools_version})")
+    
+    def get_available_tools(self) -> Tuple[ADKTool, ...]:
+        """Get the tools that are currently available (cached, read-only)"""
+        return self.tool_snapshot().tools
     
-    def get_tool_declarations(self) -> List[Dict]:
-        """Get tools in Google function calling format"""
-        return [t.to_function_declaration() for t in self.get_available_tools()]
+    def get_tool_declarations(self) -> Tuple[Mapping[str, Any], ...]:
+        """Get tools in Google function calling format (cached, read-only)"""
+        return self.tool_snapshot().declarations
     
     @abstractmethod
     async def process(self, input_text: str, language: str = "ar") -> str:
@@ -441,6 +548,8 @@ __all__ = [
     "AxiomBaseAgent",
     "AgentRegistry",
     "ADKTool",
+    "ToolCachePolicy",
+    "ToolSnapshot",
     "AgentPersona",
     "AgentDNA",
     # Google Cloud
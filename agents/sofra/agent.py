@@ -23,6 +23,7 @@ from agents.core.base_agent import (
     AxiomBaseAgent,
     AgentRegistry,
     ADKTool,
+    ToolCachePolicy,
     AgentPersona,
     AgentDNA,
     GoogleCloudService,
@@ -187,7 +188,8 @@ search_restaurants_tool = ADKTool(
             }
         },
         "required": ["location"]
-    }
+    },
+    cache=ToolCachePolicy(ttl=300, key_fields=("location", "cuisine", "radius_km"))
 )
 
 async def _search_restaurants_handler(
@@ -236,7 +238,8 @@ get_menu_tool = ADKTool(
             }
         },
         "required": ["restaurant_id"]
-    }
+    },
+    cache=ToolCachePolicy(ttl=900, max_entries=512)
 )
 
 async def _get_menu_handler(
@@ -264,7 +267,34 @@ async def _get_menu_handler(
 get_menu_tool.set_handler(_get_menu_handler)
 
 
-# Tool 3: Place Order
+# Tool 3: Restaurant Details (Google Maps Place Details API)
+get_restaurant_details_tool = ADKTool(
+    name="get_restaurant_details",
+    description="Get address, phone, opening hours and reviews of a restaurant",
+    description_ar="الحصول على عنوان المطعم ورقم الهاتف ومواعيد العمل والتقييمات",
+    required_service=GoogleCloudService.MAPS,
+    parameters={
+        "type": "object",
+        "properties": {
+            "place_id": {
+                "type": "string",
+                "description": "Google Maps place ID from search_restaurants"
+            }
+        },
+        "required": ["place_id"]
+    },
+    cache=ToolCachePolicy(ttl=3600, max_entries=1024)
+)
+
+async def _get_restaurant_details_handler(place_id: str) -> Dict[str, Any]:
+    """Handler for restaurant details"""
+    details = await maps_client.get_restaurant_details(place_id)
+    return {**details, "powered_by": "Google Maps Platform"}
+
+get_restaurant_details_tool.set_handler(_get_restaurant_details_handler)
+
+
+# Tool 4: Place Order
 place_order_tool = ADKTool(
     name="place_order",
     description="Place a food order for delivery or pickup",
@@ -288,7 +318,8 @@ place_order_tool = ADKTool(
             "payment_method": {"type": "string", "enum": ["cash", "card", "wallet"]}
         },
         "required": ["restaurant_id", "items", "delivery_address"]
-    }
+    },
+    mutating=True
 )
 
 async def _place_order_handler(**kwargs) -> Dict[str, Any]:
@@ -308,7 +339,7 @@ async def _place_order_handler(**kwargs) -> Dict[str, Any]:
 place_order_tool.set_handler(_place_order_handler)
 
 
-# Tool 4: Track Order
+# Tool 5: Track Order
 track_order_tool = ADKTool(
     name="track_order",
     description="Track the status of an existing order",
@@ -347,7 +378,7 @@ async def _track_order_handler(order_id: str) -> Dict[str, Any]:
 track_order_tool.set_handler(_track_order_handler)
 
 
-# Tool 5: Make Reservation
+# Tool 6: Make Reservation
 make_reservation_tool = ADKTool(
     name="make_reservation",
     description="Make a table reservation at a restaurant",
@@ -363,7 +394,8 @@ make_reservation_tool = ADKTool(
             "special_requests": {"type": "string"}
         },
         "required": ["restaurant_id", "date", "time", "party_size"]
-    }
+    },
+    mutating=True
 )
 
 async def _make_reservation_handler(**kwargs) -> Dict[str, Any]:
@@ -422,6 +454,7 @@ class SofraAgent(AxiomBaseAgent):
             tools=[
                 search_restaurants_tool,
                 get_menu_tool,
+                get_restaurant_details_tool,
                 place_order_tool,
                 track_order_tool,
                 make_reservation_tool
@@ -499,6 +532,7 @@ __all__ = [
     # Tools
     "search_restaurants_tool",
     "get_menu_tool",
+    "get_restaurant_details_tool",
     "place_order_tool",
     "track_order_tool",
     "make_reservation_tool",
@@ -0,0 +1,252 @@
+"""
+Axiom RESET - Upstream Admission Control
+Global and per-agent concurrency limits for Gemini calls, with weighted
+fair queuing across agents and queue-time deadlines
+
+Two controllers guard the upstream quotas separately:
+    chat_admission    concurrent generate_content calls
+    voice_admission   concurrent Gemini Live sessions (held per session)
+
+When a limit is reached, callers queue per agent. Freed slots go to the
+agent whose head-of-line request has the smallest virtual finish tag
+(tag = max(virtual clock, agent's last tag) + 1 / weight), so a busy
+agent cannot starve the others and a weight-2 agent gets twice the share
+of a weight-1 agent under contention. A caller that waits longer than
+the queue timeout, or finds its agent's queue full, is rejected at once
+with AdmissionRejected instead of piling more load on the upstream.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Mapping, Optional
+
+from api.metrics import registry
+
+logger = logging.getLogger("AxiomAdmission")
+
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "axiom_admission_queue_depth", "Requests waiting for an upstream slot", ("controller", "agent")
+)
+ADMISSION_ACTIVE = registry.gauge(
+    "axiom_admission_active", "Upstream slots in use", ("controller", "agent")
+)
+ADMISSION_WAIT = registry.histogram(
+    "axiom_admission_wait_seconds", "Time spent waiting for an upstream slot", ("controller", "agent")
+)
+ADMISSION_REJECTED = registry.counter(
+    "axiom_admission_rejected_total", "Requests rejected before reaching upstream", ("controller", "agent", "reason")
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot get an upstream slot in time"""
+
+    def __init__(self, controller: str, agent_id: str, reason: str):
+        self.controller = controller
+        self.agent_id = agent_id
+        self.reason = reason
+        super().__init__(f"{controller} upstream busy for {agent_id} ({reason})")
+
+
+class _Waiter:
+    __slots__ = ("future", "tag", "enqueued_at")
+
+    def __init__(self, future: asyncio.Future, tag: float):
+        self.future = future
+        self.tag = tag
+        self.enqueued_at = time.perf_counter()
+
+
+class _AgentQueue:
+    def __init__(self, controller: str, agent_id: str, weight: float):
+        self.agent_id = agent_id
+        self.weight = max(weight, 0.01)
+        self.active = 0
+        self.last_tag = 0.0
+        self.waiters: Deque[_Waiter] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.depth_gauge = ADMISSION_QUEUE_DEPTH.labels(controller, agent_id)
+        self.active_gauge = ADMISSION_ACTIVE.labels(controller, agent_id)
+        self.wait_histogram = ADMISSION_WAIT.labels(controller, agent_id)
+
+
+class AdmissionController:
+    """
+    Example:
+        ```python
+        async with chat_admission.slot("sofra"):
+            response = await client.aio.models.generate_content(...)
+        ```
+    """
+
+    def __init__(
+        self,
+        name: str,
+        global_limit: int,
+        per_agent_limit: int,
+        queue_timeout: float,
+        max_queue: int
+    ):
+        self.name = name
+        self.global_limit = global_limit
+        self.per_agent_limit = per_agent_limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.active = 0
+        self._virtual = 0.0
+        self._weights: Dict[str, float] = {}
+        self._queues: Dict[str, _AgentQueue] = {}
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str, global_limit: int, per_agent_limit: int) -> "AdmissionController":
+        """Limits from <PREFIX>_MAX_CONCURRENCY / _MAX_PER_AGENT / _QUEUE_TIMEOUT / _MAX_QUEUE"""
+        return cls(
+            name,
+            global_limit=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", global_limit)),
+            per_agent_limit=int(os.getenv(f"{prefix}_MAX_PER_AGENT", per_agent_limit)),
+            queue_timeout=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", 5)),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", 100))
+        )
+
+    def set_weights(self, weights: Mapping[str, float]) -> None:
+        """Fair-queuing weight per agent (default 1.0)"""
+        self._weights = dict(weights)
+        for agent_id, queue in self._queues.items():
+            queue.weight = max(self._weights.get(agent_id, 1.0), 0.01)
+
+    def _queue(self, agent_id: str) -> _AgentQueue:
+        queue = self._queues.get(agent_id)
+        if queue is None:
+            queue = self._queues[agent_id] = _AgentQueue(
+                self.name, agent_id, self._weights.get(agent_id, 1.0)
+            )
+        return queue
+
+    def _has_capacity(self, queue: _AgentQueue) -> bool:
+        return self.active < self.global_limit and queue.active < self.per_agent_limit
+
+    def _waiting(self) -> bool:
+        return any(queue.waiters for queue in self._queues.values())
+
+    def _grant(self, queue: _AgentQueue) -> None:
+        self.active += 1
+        queue.active += 1
+        queue.admitted += 1
+        queue.active_gauge.inc()
+
+    def _reject(self, queue: _AgentQueue, reason: str) -> AdmissionRejected:
+        queue.rejected += 1
+        ADMISSION_REJECTED.labels(self.name, queue.agent_id, reason).inc()
+        logger.warning(f"🚦 {self.name}: rejected {queue.agent_id} request ({reason})")
+        return AdmissionRejected(self.name, queue.agent_id, reason)
+
+    async def acquire(self, agent_id: str) -> None:
+        """Wait for a slot (fair-queued) or raise AdmissionRejected"""
+        queue = self._queue(agent_id)
+        if self._has_capacity(queue) and not self._waiting():
+            self._grant(queue)
+            queue.wait_histogram.observe(0.0)
+            return
+        if len(queue.waiters) >= self.max_queue:
+            raise self._reject(queue, "queue_full")
+
+        queue.last_tag = max(self._virtual, queue.last_tag) + 1 / queue.weight
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), queue.last_tag)
+        queue.waiters.append(waiter)
+        queue.depth_gauge.inc()
+        # Slots may be free for this agent while others wait on their own limit
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the deadline fired: hand the slot on
+                self.release(agent_id)
+            else:
+                self._forget(queue, waiter)
+            raise self._reject(queue, "queue_timeout") from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller went away
+                self.release(agent_id)
+            else:
+                self._forget(queue, waiter)
+            raise
+        waited = time.perf_counter() - waiter.enqueued_at
+        queue.wait_total += waited
+        queue.wait_histogram.observe(waited)
+
+    def _forget(self, queue: _AgentQueue, waiter: _Waiter) -> None:
+        try:
+            queue.waiters.remove(waiter)
+            queue.depth_gauge.dec()
+        except ValueError:
+            pass
+
+    def release(self, agent_id: str) -> None:
+        """Return a slot and hand it to the next fair-queued waiter"""
+        queue = self._queues[agent_id]
+        self.active -= 1
+        queue.active -= 1
+        queue.active_gauge.dec()
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.active < self.global_limit:
+            best: Optional[_AgentQueue] = None
+            for queue in self._queues.values():
+                # Skip waiters that timed out or were cancelled
+                while queue.waiters and queue.waiters[0].future.done():
+                    queue.waiters.popleft()
+                    queue.depth_gauge.dec()
+                if not queue.waiters or queue.active >= self.per_agent_limit:
+                    continue
+                if best is None or queue.waiters[0].tag < best.waiters[0].tag:
+                    best = queue
+            if best is None:
+                return
+            waiter = best.waiters.popleft()
+            best.depth_gauge.dec()
+            self._virtual = max(self._virtual, waiter.tag)
+            self._grant(best)
+            waiter.future.set_result(True)
+
+    @asynccontextmanager
+    async def slot(self, agent_id: str):
+        """Hold one upstream slot for the duration of the block"""
+        await self.acquire(agent_id)
+        try:
+            yield
+        finally:
+            self.release(agent_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "global_limit": self.global_limit,
+            "per_agent_limit": self.per_agent_limit,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "queued": sum(len(queue.waiters) for queue in self._queues.values()),
+            "agents": {
+                agent_id: {
+                    "weight": queue.weight,
+                    "active": queue.active,
+                    "queued": len(queue.waiters),
+                    "admitted": queue.admitted,
+                    "rejected": queue.rejected,
+                    "avg_wait_ms": round(queue.wait_total / queue.admitted * 1000, 2) if queue.admitted else 0
+                }
+                for agent_id, queue in self._queues.items()
+            }
+        }
+
+
+# Singleton controllers (weights set by the FastAPI lifespan)
+chat_admission = AdmissionController.from_env("chat", "CHAT_ADMISSION", global_limit=64, per_agent_limit=32)
+voice_admission = AdmissionController.from_env("voice", "VOICE_ADMISSION", global_limit=100, per_agent_limit=50)
@@ -0,0 +1,374 @@
+"""
+Axiom RESET - Agent Registry
+Agent configurations loaded from definition files, hot-reloaded without
+dropping live calls
+
+Each agent is one JSON file (default directory agents/config/):
+
+    {
+      "agent_id": "sofra",                  defaults to the file name
+      "adk_module": "agents.sofra.agent",   optional: registers the ADK agent (tools)
+      "voice_name": "Kore",
+      "weight": 1.0,                        fair-queuing share (api/admission.py)
+      "instruction": ["line", "line"]       string or list of lines
+    }
+
+No shipped agent enables the voice activity gate: every frame is
+forwarded and Gemini detects end of speech. To opt an agent in, add a
+`vad` object with VADConfig fields (api/audio.py), e.g.
+
+      "vad": {}                             drop silent frames only
+      "vad": {"auto_end_turn": true}        also end the turn after 800 ms of silence
+
+If `adk_module` registers an agent in the ADK AgentRegistry under the
+same id, its tools become the config's Gemini function declarations
+(api/tool_dispatch.py) and its instruction / voice are the defaults for
+fields the file leaves out. When the agent's tools change between loads
+(reload_tools(), google_cloud.reload()), the registry publishes a new
+config with the new declarations, like a file change.
+
+Readers take `agent_registry.snapshot` (or `get()`): an immutable
+RegistrySnapshot holding a read-only id -> AgentConfig mapping. A reload
+builds a new snapshot and swaps the reference, copy-on-write: configs
+whose file did not change are reused as-is, changed files get a new
+AgentConfig (version = content hash). AgentConfig is frozen: a change is
+always a new object (`dataclasses.replace()`), never an edit to one a
+session may already hold. Sessions and requests hold the
+AgentConfig they started with, so in-flight calls finish on their
+version and new ones get the new config. A file that fails to parse
+keeps its previous version.
+
+    AGENT_CONFIG_PATH=agents/config          directory, or files separated by ","
+    AGENT_CONFIG_WATCH_SECONDS=2             poll for changes (0 = reload only on demand)
+"""
+
+import asyncio
+import glob
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from agents.core.base_agent import AgentRegistry
+from api.audio import VADConfig
+from api.metrics import registry
+from api.tool_dispatch import ToolDispatchTable, tool_dispatch
+
+logger = logging.getLogger("AxiomAgents")
+
+_DEFAULT_CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents", "config")
+AGENT_CONFIG_PATH = os.getenv("AGENT_CONFIG_PATH", _DEFAULT_CONFIG_DIR)
+AGENT_CONFIG_WATCH_SECONDS = float(os.getenv("AGENT_CONFIG_WATCH_SECONDS", 2))
+
+AGENT_REGISTRY_VERSION = registry.gauge(
+    "axiom_agent_registry_version", "Agent registry snapshot version (bumped on every config swap)"
+)
+AGENT_REGISTRY_RELOADS = registry.counter(
+    "axiom_agent_registry_reloads_total",
+    "Agent config reloads (changed, unchanged, tools = tool declarations changed, invalid = a file was rejected)",
+    ("outcome",)
+)
+
+
+@dataclass(frozen=True, eq=False)
+class AgentConfig:
+    """
+    Agent configuration for Gemini Live API
+
+    `vad` enables the voice activity gate for this agent: silent frames
+    are not streamed upstream (None = forward everything).
+    `weight` is the agent's share of upstream capacity under contention.
+    `version` identifies the definition it was loaded from.
+    Compared by identity: the pools and the tool table detect a swap with `is`.
+    """
+    agent_id: str
+    instruction: str
+    tools: Tuple[Mapping[str, Any], ...] = ()
+    voice_name: str = "Kore"
+    vad: Optional[VADConfig] = None
+    weight: float = 1.0
+    version: str = ""
+
+    def to_live_config(self) -> Dict[str, Any]:
+        """Build the Gemini Live connect config for this agent"""
+        config: Dict[str, Any] = {
+            "system_instruction": self.instruction,
+            "generation_config": {
+                "response_modalities": ["AUDIO"],
+                "speech_config": {
+                    "voice_config": {
+                        "prebuilt_voice_config": {
+                            "voice_name": self.voice_name
+                        }
+                    }
+                }
+            }
+        }
+        if self.tools:
+            config["tools"] = [{"function_declarations": self.tools}]
+        return config
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """One immutable generation of agent configs"""
+    version: int
+    configs: Mapping[str, AgentConfig]
+    loaded_at: float
+
+
+Subscriber = Callable[[RegistrySnapshot], Union[None, Awaitable[None]]]
+
+
+def _config_files(path: str) -> List[str]:
+    files: List[str] = []
+    for part in path.split(","):
+        part = part.strip()
+        if os.path.isdir(part):
+            files.extend(sorted(glob.glob(os.path.join(part, "*.json"))))
+        elif part:
+            files.append(part)
+    return files
+
+
+def _signature(files: List[str]) -> Tuple[Tuple[str, int, int], ...]:
+    """(path, mtime, size) per file: cheap change detection for the watcher"""
+    signature = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def parse_agent_config(data: Mapping[str, Any], default_id: str, version: str) -> AgentConfig:
+    """Build an AgentConfig from a definition (ADK agent fills in missing fields)"""
+    agent_id = str(data.get("agent_id") or default_id).lower()
+    module = data.get("adk_module")
+    if module:
+        importlib.import_module(module)
+    adk_agent = AgentRegistry.get(agent_id)
+
+    instruction = data.get("instruction")
+    if isinstance(instruction, list):
+        instruction = "\n".join(instruction)
+    if not instruction:
+        if adk_agent is None:
+            raise ValueError(f"agent {agent_id} has no instruction")
+        instruction = adk_agent.instruction
+
+    vad = data.get("vad")
+    return AgentConfig(
+        agent_id=agent_id,
+        instruction=instruction,
+        voice_name=data.get("voice_name") or (adk_agent.voice_name if adk_agent else "Kore"),
+        vad=VADConfig(**vad) if vad is not None else None,
+        weight=float(data.get("weight", 1.0)),
+        version=version
+    )
+
+
+class AgentConfigRegistry:
+    """
+    Example:
+        ```python
+        config = agent_registry.get("sofra")        # lock-free, current version
+        agent_registry.subscribe(on_change)         # called after every swap
+        await agent_registry.reload()               # explicit reload hook
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str = AGENT_CONFIG_PATH,
+        watch_interval: float = AGENT_CONFIG_WATCH_SECONDS,
+        tools: ToolDispatchTable = tool_dispatch
+    ):
+        self.path = path
+        self.watch_interval = watch_interval
+        self.tool_dispatch = tools
+        self._snapshot = RegistrySnapshot(0, MappingProxyType({}), 0.0)
+        self._sources: Dict[str, Tuple[str, str]] = {}  # file -> (content hash, agent id)
+        self._signature: Tuple[Tuple[str, int, int], ...] = ()
+        self._subscribers: List[Subscriber] = []
+        self._task: Optional[asyncio.Task] = None
+        self._notifying: Set[asyncio.Task] = set()
+        self.reloads = 0
+        self.invalid = 0
+        self.last_error: Optional[str] = None
+        self.load()
+        tools.subscribe(self.refresh_tools)
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, agent_id: str) -> Optional[AgentConfig]:
+        return self._snapshot.configs.get(agent_id.lower())
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call `callback(snapshot)` (sync or async) after every swap"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def load(self) -> bool:
+        """Re-read the definition files; swap in a new snapshot if anything changed"""
+        files = _config_files(self.path)
+        self._signature = _signature(files)
+        current = self._snapshot.configs
+        configs: Dict[str, AgentConfig] = {}
+        sources: Dict[str, Tuple[str, str]] = {}
+        invalid = 0
+        for path in files:
+            previous = self._sources.get(path)
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.sha256(raw).hexdigest()[:12]
+                if previous is not None and previous[0] == digest and previous[1] in current:
+                    config = current[previous[1]]  # unchanged file: keep the same object
+                else:
+                    default_id = os.path.splitext(os.path.basename(path))[0]
+                    config = parse_agent_config(json.loads(raw), default_id, digest)
+            except Exception as e:
+                invalid += 1
+                self.last_error = f"{path}: {e}"
+                logger.error(f"❌ Invalid agent config {path}: {e}")
+                if previous is not None and previous[1] in current:
+                    configs[previous[1]] = current[previous[1]]
+                    sources[path] = previous
+                continue
+            if config.agent_id in configs:
+                logger.warning(f"⚠️ Agent {config.agent_id} defined twice, using {path}")
+            configs[config.agent_id] = config
+            sources[path] = (config.version, config.agent_id)
+
+        # Tool declarations go into the configs before the snapshot is published
+        self.tool_dispatch.sync(configs)
+        configs = {agent_id: self._with_tools(config) for agent_id, config in configs.items()}
+
+        self.invalid += invalid
+        if invalid:
+            AGENT_REGISTRY_RELOADS.labels("invalid").inc()
+        changed = configs.keys() != current.keys() or any(
+            configs[agent_id] is not current[agent_id] for agent_id in configs
+        )
+        self._sources = sources
+        if not changed:
+            AGENT_REGISTRY_RELOADS.labels("unchanged").inc()
+            return False
+
+        self._publish(configs, "changed")
+        return True
+
+    def _with_tools(self, config: AgentConfig) -> AgentConfig:
+        """`config` with its agent's current tool declarations (the same object if unchanged)"""
+        declarations = self.tool_dispatch.declarations(config.agent_id)
+        if config.tools == declarations:
+            return config
+        return replace(config, tools=declarations)
+
+    def _publish(self, configs: Dict[str, AgentConfig], outcome: str) -> None:
+        self._snapshot = RegistrySnapshot(self._snapshot.version + 1, MappingProxyType(configs), time.time())
+        self.reloads += 1
+        AGENT_REGISTRY_VERSION.set(self._snapshot.version)
+        AGENT_REGISTRY_RELOADS.labels(outcome).inc()
+        logger.info(
+            f"📦 Agent registry v{self._snapshot.version} ({outcome}): "
+            + ", ".join(f"{agent_id}@{config.version}" for agent_id, config in configs.items())
+        )
+
+    def refresh_tools(self, agent_id: str) -> bool:
+        """
+        Publish a new config for an agent whose tools changed between loads
+        (called by the tool dispatch table); subscribers are notified as
+        after a reload. True if a new snapshot was published.
+        """
+        config = self.get(agent_id)
+        if config is None:
+            return False
+        updated = self._with_tools(config)
+        if updated is config:
+            return False
+        configs = dict(self._snapshot.configs)
+        configs[updated.agent_id] = updated
+        self._publish(configs, "tools")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return True  # no loop yet: the lifespan starts from the current snapshot
+        task = loop.create_task(self._notify())
+        self._notifying.add(task)
+        task.add_done_callback(self._notifying.discard)
+        return True
+
+    async def reload(self) -> bool:
+        """Explicit reload hook: load, then notify subscribers if the snapshot changed"""
+        changed = self.load()
+        if changed:
+            await self._notify()
+        return changed
+
+    async def _notify(self) -> None:
+        for callback in self._subscribers:
+            try:
+                result = callback(self._snapshot)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"❌ Agent registry subscriber failed: {e}")
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if _signature(_config_files(self.path)) != self._signature:
+                await self.reload()
+            # Tool changes since the last load publish through refresh_tools()
+            for agent_id in list(self._snapshot.configs):
+                self.tool_dispatch.get(agent_id)
+
+    def start(self) -> None:
+        """Start the file watcher (called from the lifespan)"""
+        if self.watch_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "loaded_at": snapshot.loaded_at,
+            "path": self.path,
+            "watching": self._task is not None,
+            "reloads": self.reloads,
+            "invalid": self.invalid,
+            "last_error": self.last_error,
+            "agents": {
+                agent_id: {"version": config.version, "tools": len(config.tools)}
+                for agent_id, config in snapshot.configs.items()
+            }
+        }
+
+
+# Singleton agent registry (loaded at import, watcher started by the FastAPI lifespan)
+agent_registry = AgentConfigRegistry()
@@ -0,0 +1,402 @@
+"""
+Axiom RESET - Voice Audio Pipeline
+Audio processing stages between the client WebSocket and Gemini Live
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # Resampling needs NumPy; native-rate streams do not
+    np = None
+
+from api.codecs import available_codecs
+
+# Gemini Live audio formats
+UPSTREAM_SAMPLE_RATE = 16000    # PCM16 mono sent to Gemini
+DOWNSTREAM_SAMPLE_RATE = 24000  # PCM16 mono returned by Gemini
+SAMPLE_WIDTH = 2  # PCM16
+UPSTREAM_MIME_TYPE = f"audio/pcm;rate={UPSTREAM_SAMPLE_RATE}"
+
+SUPPORTED_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+
+
+class FrameCoalescer:
+    """
+    Combines small PCM chunks into fixed frame windows before upstream sends
+
+    Clients push audio in whatever chunk size their capture API produces
+    (test_voice_client.py sends 1024 frames, ~64 ms). Sending each chunk
+    as its own `session.send` costs one upstream request per chunk. The
+    coalescer copies incoming audio into a single preallocated bytearray
+    and emits one frame per `window_ms` of audio. A window of 0 disables
+    coalescing (every chunk is passed through as-is).
+
+    The caller flushes any partial window on `end_turn` / `text_input`
+    and when no audio arrives for a full window.
+    """
+
+    def __init__(
+        self,
+        window_ms: int = 100,
+        sample_rate: int = UPSTREAM_SAMPLE_RATE,
+        sample_width: int = SAMPLE_WIDTH
+    ):
+        self.window_ms = window_ms
+        frame_bytes = int(sample_rate * window_ms / 1000) * sample_width
+        self.window_bytes = frame_bytes
+        self._buffer = bytearray(frame_bytes)
+        self._view = memoryview(self._buffer)
+        self._fill = 0
+
+        # Per-connection counters
+        self.chunks_in = 0
+        self.bytes_in = 0
+        self.sends = 0
+        self.bytes_sent = 0
+        self._started_at = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_bytes > 0
+
+    @property
+    def pending(self) -> int:
+        """Bytes buffered in the current (partial) window"""
+        return self._fill
+
+    @property
+    def window_seconds(self) -> float:
+        return self.window_ms / 1000
+
+    def push(self, data: bytes) -> List[bytes]:
+        """Add a chunk; return the complete frames that are ready to send"""
+        self.chunks_in += 1
+        self.bytes_in += len(data)
+        if not self.enabled:
+            return [data]
+
+        frames = []
+        incoming = memoryview(data)
+        offset = 0
+        remaining = len(incoming)
+        while remaining:
+            take = min(self.window_bytes - self._fill, remaining)
+            self._view[self._fill:self._fill + take] = incoming[offset:offset + take]
+            self._fill += take
+            offset += take
+            remaining -= take
+            if self._fill == self.window_bytes:
+                frames.append(bytes(self._buffer))
+                self._fill = 0
+        return frames
+
+    def flush(self) -> Optional[bytes]:
+        """Return the partial window (if any) and reset the buffer"""
+        if not self._fill:
+            return None
+        frame = bytes(self._view[:self._fill])
+        self._fill = 0
+        return frame
+
+    def record_send(self, nbytes: int) -> None:
+        self.sends += 1
+        self.bytes_sent += nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started_at, 1e-6)
+        return {
+            "window_ms": self.window_ms,
+            "chunks_in": self.chunks_in,
+            "sends": self.sends,
+            "sends_per_second": round(self.sends / elapsed, 2),
+            "bytes_per_send": round(self.bytes_sent / self.sends, 1) if self.sends else 0,
+            "chunks_per_send": round(self.chunks_in / self.sends, 2) if self.sends else 0
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FORMAT NEGOTIATION & RESAMPLING
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class AudioFormat:
+    """
+    Audio format negotiated with a voice client at connect time
+
+    Client message:
+        {"type": "audio_format", "input_rate": 48000, "output_rate": 48000,
+         "encoding": "opus"}
+
+    `input_rate` is the rate of audio the client sends, `output_rate` the
+    rate it wants to play back and `encoding` the transport codec for both
+    directions (see api/codecs.py). Defaults are Gemini's native rates and
+    raw PCM16, so clients that never negotiate keep the original raw
+    16 kHz / 24 kHz protocol.
+    """
+    input_rate: int = UPSTREAM_SAMPLE_RATE
+    output_rate: int = DOWNSTREAM_SAMPLE_RATE
+    encoding: str = "pcm16"
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> "AudioFormat":
+        """Parse and validate an `audio_format` message"""
+        fmt = cls(
+            input_rate=int(data.get("input_rate", UPSTREAM_SAMPLE_RATE)),
+            output_rate=int(data.get("output_rate", DOWNSTREAM_SAMPLE_RATE)),
+            encoding=str(data.get("encoding", "pcm16")).lower()
+        )
+        for rate in (fmt.input_rate, fmt.output_rate):
+            if rate not in SUPPORTED_SAMPLE_RATES:
+                raise ValueError(f"Unsupported sample rate: {rate}")
+        if fmt.encoding not in available_codecs():
+            raise ValueError(
+                f"Unsupported encoding: {fmt.encoding} (available: {available_codecs()})"
+            )
+        if np is None and (
+            fmt.input_rate != UPSTREAM_SAMPLE_RATE
+            or fmt.output_rate != DOWNSTREAM_SAMPLE_RATE
+        ):
+            raise ValueError("Server resampling unavailable (numpy not installed)")
+        return fmt
+
+    def to_message(self) -> Dict[str, Any]:
+        return {
+            "type": "audio_format",
+            "input_rate": self.input_rate,
+            "output_rate": self.output_rate,
+            "encoding": self.encoding,
+            "upstream_rate": UPSTREAM_SAMPLE_RATE,
+            "downstream_rate": DOWNSTREAM_SAMPLE_RATE,
+            "available_encodings": available_codecs()
+        }
+
+
+class StreamingResampler:
+    """
+    Vectorized PCM16 resampler that keeps its state across chunks
+
+    Downsampling runs a windowed-sinc low-pass FIR (anti-aliasing) before
+    linear interpolation; upsampling interpolates directly. The FIR history
+    and the fractional read position carry over between `process()` calls,
+    so arbitrary chunk boundaries produce a continuous stream with no
+    clicks. CPU time spent is accumulated for per-stream cost reporting.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, num_taps: int = 31):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.passthrough = in_rate == out_rate
+        self._step = in_rate / out_rate  # input samples per output sample
+        self._pos = 0.0                  # next output position (index 0 = previous last sample)
+        self._last = 0.0
+        self._odd = b""                  # trailing byte of an odd-length chunk
+
+        self._taps = None
+        if not self.passthrough and out_rate < in_rate:
+            cutoff = 0.45 * out_rate / in_rate  # cycles per input sample
+            n = np.arange(num_taps) - (num_taps - 1) / 2
+            taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(num_taps)
+            self._taps = (taps / taps.sum()).astype(np.float32)
+            self._history = np.zeros(num_taps - 1, dtype=np.float32)
+
+        # Per-stream cost counters
+        self.cpu_seconds = 0.0
+        self.samples_in = 0
+
+    def process(self, pcm: bytes) -> bytes:
+        """Resample one PCM16 little-endian mono chunk"""
+        if self.passthrough:
+            return pcm
+        started = time.perf_counter()
+
+        if self._odd:
+            pcm = self._odd + pcm
+            self._odd = b""
+        if len(pcm) % SAMPLE_WIDTH:
+            self._odd = pcm[-1:]
+            pcm = pcm[:-1]
+
+        x = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+        self.samples_in += x.size
+        if self._taps is not None:
+            buffered = np.concatenate((self._history, x))
+            x = np.convolve(buffered, self._taps, mode="valid")
+            self._history = buffered[buffered.size - self._history.size:]
+
+        # s[0] is the last sample of the previous chunk, s[1:] this chunk
+        s = np.empty(x.size + 1, dtype=np.float32)
+        s[0] = self._last
+        s[1:] = x
+        length = x.size
+        count = max(0, math.ceil((length - self._pos) / self._step))
+        positions = self._pos + np.arange(count, dtype=np.float64) * self._step
+        index = positions.astype(np.int64)
+        frac = (positions - index).astype(np.float32)
+        out = s[index] * (1.0 - frac) + s[index + 1] * frac
+
+        self._pos = self._pos + count * self._step - length
+        self._last = s[-1]
+
+        result = np.clip(np.rint(out), -32768, 32767).astype("<i2").tobytes()
+        self.cpu_seconds += time.perf_counter() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        audio_seconds = self.samples_in / self.in_rate if self.in_rate else 0
+        return {
+            "in_rate": self.in_rate,
+            "out_rate": self.out_rate,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "audio_seconds": round(audio_seconds, 2),
+            "cpu_ms_per_audio_second": (
+                round(self.cpu_seconds * 1000 / audio_seconds, 3) if audio_seconds else 0
+            )
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# VOICE ACTIVITY DETECTION
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class VADConfig:
+    """Per-agent voice activity gate settings (see AgentConfig.vad)"""
+    frame_ms: int = 20
+    energy_threshold_db: float = -45.0   # dBFS a frame needs to count as speech
+    loud_threshold_db: float = -30.0     # above this, speech regardless of ZCR
+    max_zero_crossing_rate: float = 0.35 # noise/hiss crosses zero more often than voice
+    hangover_ms: int = 300               # keep forwarding after speech stops
+    pre_roll_ms: int = 60                # silence kept before an onset (avoids clipped starts)
+    auto_end_turn: bool = False          # send end_turn after `end_turn_silence_ms`
+    end_turn_silence_ms: int = 800
+
+
+class VoiceActivityGate:
+    """
+    Drops silent PCM frames before they are sent upstream
+
+    Each `frame_ms` frame is scored with short-term energy (dBFS) and
+    zero-crossing rate, vectorized over all complete frames in a chunk.
+    A frame is speech if it is loud, or moderately loud with a voice-like
+    ZCR. Frames within `hangover_ms` after speech and `pre_roll_ms` before
+    it are forwarded too, so word endings and onsets are not clipped.
+
+    With `auto_end_turn`, `process()` reports end of speech once silence
+    has lasted `end_turn_silence_ms`, so the bridge can end the turn
+    itself (Gemini no longer sees the silence it would otherwise use).
+    """
+
+    def __init__(self, config: VADConfig, sample_rate: int = UPSTREAM_SAMPLE_RATE):
+        self.config = config
+        self.frame_samples = int(sample_rate * config.frame_ms / 1000)
+        self.frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        self._hangover_frames = max(0, config.hangover_ms // config.frame_ms)
+        self._end_turn_frames = max(1, config.end_turn_silence_ms // config.frame_ms)
+        self._pre_roll: List[bytes] = []
+        self._pre_roll_frames = max(0, config.pre_roll_ms // config.frame_ms)
+        self._remainder = bytearray()
+        self._hangover = 0
+        self._silent_run = 0
+        self.in_speech = False
+        self._turn_open = False
+
+        # Counters
+        self.frames_forwarded = 0
+        self.frames_dropped = 0
+        self.auto_end_turns = 0
+
+    @property
+    def enabled(self) -> bool:
+        return np is not None and self.frame_samples > 0
+
+    def _score(self, frames) -> Any:
+        """Vectorized speech decision for a (n_frames, frame_samples) array"""
+        x = frames.astype(np.float32) / 32768.0
+        energy = np.mean(x * x, axis=1)
+        energy_db = 10.0 * np.log10(energy + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_samples - 1)
+        cfg = self.config
+        return (energy_db >= cfg.loud_threshold_db) | (
+            (energy_db >= cfg.energy_threshold_db) & (zcr <= cfg.max_zero_crossing_rate)
+        )
+
+    def process(self, pcm: bytes):
+        """
+        Gate one PCM16 chunk
+
+        Returns:
+            (audio to forward, end_of_speech) - end_of_speech is True when
+            auto_end_turn is on and the speaker has just gone quiet
+        """
+        if not self.enabled:
+            return pcm, False
+
+        self._remainder += pcm
+        n_frames = len(self._remainder) // self.frame_bytes
+        if not n_frames:
+            return b"", False
+        usable = n_frames * self.frame_bytes
+        block = bytes(self._remainder[:usable])
+        del self._remainder[:usable]
+
+        frames = np.frombuffer(block, dtype="<i2").reshape(n_frames, self.frame_samples)
+        speech = self._score(frames)
+
+        forwarded = []
+        end_of_speech = False
+        for index in range(n_frames):
+            frame = block[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            if speech[index]:
+                if not self.in_speech:
+                    forwarded.extend(self._pre_roll)
+                    self.frames_forwarded += len(self._pre_roll)
+                    self.frames_dropped -= len(self._pre_roll)
+                    self._pre_roll.clear()
+                self.in_speech = True
+                self._turn_open = True
+                self._hangover = self._hangover_frames
+                self._silent_run = 0
+            elif self._hangover > 0:
+                self._hangover -= 1
+                self._silent_run += 1
+            else:
+                self.in_speech = False
+                self._silent_run += 1
+                self.frames_dropped += 1
+                if self._pre_roll_frames:
+                    self._pre_roll.append(frame)
+                    if len(self._pre_roll) > self._pre_roll_frames:
+                        self._pre_roll.pop(0)
+                if (
+                    self.config.auto_end_turn
+                    and self._turn_open
+                    and self._silent_run >= self._end_turn_frames
+                ):
+                    self._turn_open = False
+                    self.auto_end_turns += 1
+                    end_of_speech = True
+                continue
+            forwarded.append(frame)
+            self.frames_forwarded += 1
+
+        return b"".join(forwarded), end_of_speech
+
+    def reset_turn(self) -> None:
+        """The client ended the turn itself; don't end it again"""
+        self._turn_open = False
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.frames_forwarded + self.frames_dropped
+        return {
+            "enabled": self.enabled,
+            "frames_forwarded": self.frames_forwarded,
+            "frames_dropped": self.frames_dropped,
+            "dropped_ratio": round(self.frames_dropped / total, 3) if total else 0,
+            "bytes_saved": self.frames_dropped * self.frame_bytes,
+            "auto_end_turns": self.auto_end_turns
+        }
@@ -0,0 +1,172 @@
+"""
+Axiom RESET - Chat Micro-batching
+Collects chat requests per agent for a few milliseconds and dispatches
+them together through the shared Gemini client
+
+Gemini's batch prediction API is asynchronous (results arrive minutes to
+hours later), so a batch here is fanned out as concurrent
+`generate_content` calls over the shared HTTP pool. The batcher has no
+concurrency limit of its own: every call takes a chat_admission slot
+(api/admission.py), so fair queuing, queue timeouts and queue caps
+apply to batched requests exactly as to direct ones. Batching trades a
+small queueing delay (up to the window) for fewer bursts against the
+upstream; both sides of that trade are measured:
+
+    queue delay   request enqueued -> its batch dispatched
+    upstream      handler time (incl. waiting for an admission slot)
+
+CHAT_BATCH_WINDOW_MS=0 (default) disables batching: requests go straight
+to the handler.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from api.metrics import registry
+
+CHAT_BATCH_WINDOW_MS = float(os.getenv("CHAT_BATCH_WINDOW_MS", 0))
+CHAT_BATCH_MAX_SIZE = int(os.getenv("CHAT_BATCH_MAX_SIZE", 16))
+
+CHAT_BATCH_SIZE = registry.histogram(
+    "axiom_chat_batch_size", "Chat requests per dispatched batch", ("agent",),
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+CHAT_QUEUE_DELAY = registry.histogram(
+    "axiom_chat_queue_delay_seconds", "Chat request wait before its batch is dispatched", ("agent",)
+)
+CHAT_UPSTREAM_LATENCY = registry.histogram(
+    "axiom_chat_upstream_seconds", "Chat upstream call time including admission wait", ("agent",)
+)
+
+
+@dataclass
+class _PendingChat:
+    config: Any
+    text: str
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    task: Optional[asyncio.Task] = None
+
+
+class ChatBatcher:
+    """
+    Example:
+        ```python
+        chat_batcher = ChatBatcher(_generate_reply)
+        reply = await chat_batcher.submit(config, text)
+        ```
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any, str], Awaitable[str]],
+        window_ms: float = CHAT_BATCH_WINDOW_MS,
+        max_batch: int = CHAT_BATCH_MAX_SIZE
+    ):
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[str, List[_PendingChat]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.batched_requests = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.queue_delay_total = 0.0
+        self.upstream_total = 0.0
+        self.completed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def submit(self, config: Any, text: str) -> str:
+        """Queue one chat request and wait for its reply"""
+        self.requests += 1
+        if not self.enabled:
+            return await self._call(config, text)
+
+        item = _PendingChat(config, text, asyncio.get_running_loop().create_future())
+        agent_id = config.agent_id
+        batch = self._pending.setdefault(agent_id, [])
+        batch.append(item)
+        if len(batch) >= self.max_batch:
+            self._flush(agent_id)
+        elif agent_id not in self._timers:
+            self._timers[agent_id] = asyncio.get_running_loop().call_later(
+                self.window, self._flush, agent_id
+            )
+
+        try:
+            return await item.future
+        except asyncio.CancelledError:
+            # Caller went away: drop it from the batch or stop its call
+            if item.task is not None:
+                item.task.cancel()
+            elif item in self._pending.get(agent_id, []):
+                self._pending[agent_id].remove(item)
+            raise
+
+    def _flush(self, agent_id: str) -> None:
+        timer = self._timers.pop(agent_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(agent_id, [])
+        if not batch:
+            return
+        dispatched_at = time.perf_counter()
+        self.batches += 1
+        self.batched_requests += len(batch)
+        CHAT_BATCH_SIZE.labels(agent_id).observe(len(batch))
+        queue_delay = CHAT_QUEUE_DELAY.labels(agent_id)
+        for item in batch:
+            delay = dispatched_at - item.enqueued_at
+            queue_delay.observe(delay)
+            self.queue_delay_total += delay
+            item.task = asyncio.create_task(self._run(item))
+
+    async def _run(self, item: _PendingChat) -> None:
+        try:
+            reply = await self._call(item.config, item.text)
+        except asyncio.CancelledError:
+            if not item.future.done():
+                item.future.cancel()
+            raise
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+        else:
+            if not item.future.done():
+                item.future.set_result(reply)
+
+    async def _call(self, config: Any, text: str) -> str:
+        started = time.perf_counter()
+        self.in_flight += 1
+        try:
+            return await self.handler(config, text)
+        finally:
+            self.in_flight -= 1
+            elapsed = time.perf_counter() - started
+            CHAT_UPSTREAM_LATENCY.labels(config.agent_id).observe(elapsed)
+            self.upstream_total += elapsed
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "in_flight": self.in_flight,
+            "queued": sum(len(batch) for batch in self._pending.values()),
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else None,
+            "avg_queue_delay_ms": (
+                round(self.queue_delay_total / self.batched_requests * 1000, 2)
+                if self.batched_requests else None
+            ),
+            "avg_upstream_ms": round(self.upstream_total / self.completed * 1000, 2) if self.completed else None
+        }
@@ -0,0 +1,329 @@
+"""
+Axiom RESET - Chat Response Cache
+Reuses replies to repeated text chat messages (greetings, menu questions)
+
+Entries are keyed by agent id, a hash of the agent's system instruction
+and the normalized message text, so editing an instruction invalidates
+its answers. Normalization folds the Arabic spelling variants users mix
+freely (أ/إ/آ/ٱ → ا, ة → ه, ى → ي, ؤ → و, ئ → ي), strips tashkeel and
+tatweel, maps Arabic-Indic digits to ASCII, drops punctuation and
+collapses whitespace.
+
+Two tiers:
+    exact     normalized text matches                      (dict lookup)
+    similar   character-trigram Jaccard >= threshold       (off by default)
+
+The similar tier only absorbs spelling slips. A candidate must carry
+the same numbers (digits and number words: table 12 is not table 13,
+8 o'clock is not 9) and every word that differs must be within one edit
+of a word in the other message (a different restaurant name is a miss).
+Candidates are indexed per agent, instruction and number set, and at
+most `CHAT_CACHE_SIMILAR_SCAN` of the most recently used are scored.
+
+Eviction is TTL + LRU under both an entry cap and a memory cap.
+
+    CHAT_CACHE_SIMILARITY=0          trigram threshold, 0 = exact matches only
+    CHAT_CACHE_SIMILAR_SCAN=256      candidates scored per similar lookup
+"""
+
+import hashlib
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from api.metrics import registry
+
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 2000))
+CHAT_CACHE_MAX_MB = float(os.getenv("CHAT_CACHE_MAX_MB", 16))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", 600))
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", 0))  # 0 = exact only
+CHAT_CACHE_SIMILAR_SCAN = int(os.getenv("CHAT_CACHE_SIMILAR_SCAN", 256))
+
+CHAT_CACHE_LOOKUPS = registry.counter(
+    "axiom_chat_cache_lookups_total", "Chat response cache lookups", ("agent", "result")
+)
+CHAT_CACHE_ENTRIES = registry.gauge("axiom_chat_cache_entries", "Chat response cache entries")
+CHAT_CACHE_BYTES = registry.gauge("axiom_chat_cache_bytes", "Chat response cache memory estimate")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ARABIC NORMALIZATION
+# ═══════════════════════════════════════════════════════════════════
+
+_TASHKEEL = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+_FOLD = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+    **{digit: str(value) for value, digit in enumerate("٠١٢٣٤٥٦٧٨٩")},
+    **{digit: str(value) for value, digit in enumerate("۰۱۲۳۴۵۶۷۸۹")},
+})
+
+# Number words (normalized spelling) that change the meaning of a message
+_NUMBER_WORDS = frozenset({
+    "صفر", "واحد", "واحده", "اتنين", "اثنين", "اثنان", "تلاته", "ثلاثه", "اربعه", "اربع",
+    "خمسه", "خمس", "سته", "ست", "سبعه", "سبع", "تمانيه", "ثمانيه", "تمان", "ثمان",
+    "تسعه", "تسع", "عشره", "عشر", "حداشر", "احدعشر", "اتناشر", "اثناعشر", "عشرين",
+    "تلاتين", "ثلاثين", "اربعين", "خمسين", "ميه", "مايه", "الف",
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "twenty", "thirty", "hundred", "thousand",
+})
+
+
+def normalize_arabic(text: str) -> str:
+    """Fold spelling variants so near-identical messages share a key"""
+    text = _TASHKEEL.sub("", text or "")
+    text = text.translate(_FOLD).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def instruction_hash(instruction: str) -> str:
+    """Short stable hash of a system instruction"""
+    return hashlib.sha256(instruction.encode("utf-8")).hexdigest()[:16]
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _numbers(words: FrozenSet[str]) -> FrozenSet[str]:
+    """Words that carry a quantity: anything with a digit, or a number word"""
+    return frozenset(
+        word for word in words
+        if word in _NUMBER_WORDS or any(char.isdigit() for char in word)
+    )
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """Whether `a` and `b` differ by at most one insertion, deletion or substitution"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _same_words(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Every word only one message has is a one-edit typo of a word the other has"""
+    for extra, other in ((a - b, b - a), (b - a, a - b)):
+        for word in extra:
+            if len(word) < 4 or not any(_one_edit(word, candidate) for candidate in other):
+                return False
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════════
+
+CacheKey = Tuple[str, str, str]  # (agent_id, instruction_hash, normalized_text)
+IndexKey = Tuple[str, str, FrozenSet[str]]  # (agent_id, instruction_hash, numbers)
+
+
+@dataclass
+class CachedResponse:
+    response: str
+    expires_at: float
+    size: int
+    trigrams: FrozenSet[str]
+    words: FrozenSet[str]
+    numbers: FrozenSet[str]
+    hits: int = 0
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of chat replies with an optional n-gram similarity tier
+
+    Example:
+        ```python
+        hit = chat_cache.get("sofra", config.instruction, text)
+        if hit is None:
+            reply = ...  # call Gemini
+            chat_cache.put("sofra", config.instruction, text, reply)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+        max_bytes: int = int(CHAT_CACHE_MAX_MB * 1024 * 1024),
+        ttl: float = CHAT_CACHE_TTL,
+        similarity: float = CHAT_CACHE_SIMILARITY,
+        similar_scan: int = CHAT_CACHE_SIMILAR_SCAN
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.similarity = similarity
+        self.similar_scan = similar_scan
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        # Similar-tier candidates, least recently used first
+        self._candidates: Dict[IndexKey, "OrderedDict[CacheKey, None]"] = {}
+        self._bytes = 0
+        self.hits_exact = 0
+        self.hits_similar = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, agent_id: str, instruction: str, text: str) -> Optional[Tuple[str, str]]:
+        """Cached reply and tier ("exact" / "similar"), or None on a miss"""
+        if not self.enabled:
+            return None
+        normalized = normalize_arabic(text)
+        ihash = instruction_hash(instruction)
+        now = time.monotonic()
+
+        key = (agent_id, ihash, normalized)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        if entry is not None:
+            self._touch(key, entry)
+            entry.hits += 1
+            self.hits_exact += 1
+            CHAT_CACHE_LOOKUPS.labels(agent_id, "exact").inc()
+            return entry.response, "exact"
+
+        if self.similarity > 0 and normalized:
+            match = self._find_similar(agent_id, ihash, normalized, now)
+            if match is not None:
+                entry = self._entries[match]
+                self._touch(match, entry)
+                entry.hits += 1
+                self.hits_similar += 1
+                CHAT_CACHE_LOOKUPS.labels(agent_id, "similar").inc()
+                return entry.response, "similar"
+
+        self.misses += 1
+        CHAT_CACHE_LOOKUPS.labels(agent_id, "miss").inc()
+        return None
+
+    def _find_similar(self, agent_id: str, ihash: str, normalized: str, now: float) -> Optional[CacheKey]:
+        words = frozenset(normalized.split())
+        candidates = self._candidates.get((agent_id, ihash, _numbers(words)))
+        if not candidates:
+            return None
+        trigrams = _trigrams(normalized)
+        best_key, best_score = None, self.similarity
+        for scanned, key in enumerate(reversed(candidates)):
+            if scanned >= self.similar_scan:
+                break
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            # Jaccard can't reach the threshold if the sizes differ too much
+            smaller, larger = sorted((len(trigrams), len(entry.trigrams)))
+            if not larger or smaller / larger < best_score:
+                continue
+            score = _jaccard(trigrams, entry.trigrams)
+            if score >= best_score and _same_words(words, entry.words):
+                best_key, best_score = key, score
+        return best_key
+
+    def _index_key(self, key: CacheKey, entry: CachedResponse) -> IndexKey:
+        return key[0], key[1], entry.numbers
+
+    def _touch(self, key: CacheKey, entry: CachedResponse) -> None:
+        self._entries.move_to_end(key)
+        self._candidates[self._index_key(key, entry)].move_to_end(key)
+
+    def put(self, agent_id: str, instruction: str, text: str, response: str) -> None:
+        """Store a successful reply"""
+        if not self.enabled or not response:
+            return
+        normalized = normalize_arabic(text)
+        if not normalized:
+            return
+        key = (agent_id, instruction_hash(instruction), normalized)
+        if key in self._entries:
+            self._remove(key)
+        trigrams = _trigrams(normalized)
+        words = frozenset(normalized.split())
+        size = (
+            sys.getsizeof(response) + sys.getsizeof(normalized)
+            + sum(sys.getsizeof(gram) for gram in trigrams) + sys.getsizeof(trigrams)
+            + sys.getsizeof(words)
+        )
+        if size > self.max_bytes:
+            return
+        entry = CachedResponse(response, time.monotonic() + self.ttl, size, trigrams, words, _numbers(words))
+        self._entries[key] = entry
+        self._candidates.setdefault(self._index_key(key, entry), OrderedDict())[key] = None
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        self._update_gauges()
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        index_key = self._index_key(key, entry)
+        candidates = self._candidates[index_key]
+        del candidates[key]
+        if not candidates:
+            del self._candidates[index_key]
+        self._bytes -= entry.size
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        CHAT_CACHE_ENTRIES.set(len(self._entries))
+        CHAT_CACHE_BYTES.set(self._bytes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._candidates.clear()
+        self._bytes = 0
+        self._update_gauges()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_exact + self.hits_similar + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "similarity": self.similarity,
+            "similar_scan": self.similar_scan,
+            "hits_exact": self.hits_exact,
+            "hits_similar": self.hits_similar,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits_exact + self.hits_similar) / lookups, 3) if lookups else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+# Singleton chat response cache
+chat_cache = ResponseCache()
@@ -0,0 +1,153 @@
+"""
+Axiom RESET - Gemini Client Manager
+Process-wide genai clients shared by the Voice Bridge and the chat endpoint
+"""
+
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+from google import genai
+
+logger = logging.getLogger("AxiomClients")
+
+# API versions used by the platform
+LIVE_API_VERSION = "v1alpha"   # Multimodal Live API (Voice Bridge)
+CHAT_API_VERSION = "v1beta"    # generate_content (text chat)
+
+# Models used by the platform
+LIVE_MODEL_ID = "gemini-2.0-flash-exp"  # Multimodal Live API model
+CHAT_MODEL_ID = "gemini-2.0-flash-exp"
+
+# Upstream backend: "genai" (Gemini API) or "fake" (api/fake_live.py, no network)
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "genai").lower()
+BACKENDS = ("genai", "fake")
+
+
+class GeminiClientManager:
+    """
+    Owns one genai.Client per API version on top of a single HTTP pool.
+
+    Building a genai.Client per WebSocket or per chat request repeats
+    client construction, TLS setup and connection-pool creation for every
+    caller. The manager builds each client lazily on first use, shares one
+    httpx connection pool between them and keeps a count of the sessions
+    currently using each client.
+
+    The FastAPI lifespan owns the manager: `start()` on startup and
+    `aclose()` on shutdown. With `backend="fake"` every client is a
+    FakeLiveClient configured from FAKE_LIVE_* variables, so the bridge
+    can be benchmarked without network or an API key.
+
+    Example:
+        ```python
+        async with gemini_clients.session(LIVE_API_VERSION) as client:
+            async with client.aio.live.connect(...) as session:
+                ...
+        ```
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        backend: str = GEMINI_BACKEND
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown GEMINI_BACKEND: {backend} (expected one of {BACKENDS})")
+        self.backend = backend
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self._http: Optional[httpx.AsyncClient] = None
+        self._clients: Dict[str, genai.Client] = {}
+        self._active: Dict[str, int] = {}
+        self._total: Dict[str, int] = {}
+        self._closed = False
+
+    def start(self) -> None:
+        """Open the shared HTTP pool (idempotent)"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0)
+            )
+            self._closed = False
+            logger.info("🔗 Gemini HTTP pool opened")
+
+    def get(self, api_version: str = CHAT_API_VERSION) -> genai.Client:
+        """Get (or lazily build) the shared client for an API version"""
+        client = self._clients.get(api_version)
+        if client is None:
+            if self._closed:
+                raise RuntimeError("Gemini client manager is closed")
+            self.start()
+            client = self._build(api_version)
+            self._clients[api_version] = client
+            self._active.setdefault(api_version, 0)
+            self._total.setdefault(api_version, 0)
+            logger.info(f"🔗 Gemini client created for API {api_version} ({self.backend})")
+        return client
+
+    def _build(self, api_version: str):
+        if self.backend == "fake":
+            from api.fake_live import FakeLiveClient
+            return FakeLiveClient()
+        return genai.Client(http_options={
+            "api_version": api_version,
+            "httpx_async_client": self._http
+        })
+
+    def install(self, api_version: str, client) -> None:
+        """Use a pre-built client for an API version (e.g. FakeLiveClient)"""
+        self._clients[api_version] = client
+        self._active.setdefault(api_version, 0)
+        self._total.setdefault(api_version, 0)
+        logger.info(f"🔗 Gemini client installed for API {api_version}: {type(client).__name__}")
+
+    @asynccontextmanager
+    async def session(self, api_version: str = CHAT_API_VERSION):
+        """Borrow the shared client for the lifetime of one session"""
+        client = self.get(api_version)
+        self._active[api_version] += 1
+        self._total[api_version] += 1
+        try:
+            yield client
+        finally:
+            self._active[api_version] -= 1
+
+    def active_sessions(self, api_version: str) -> int:
+        """Number of sessions currently using the client for a version"""
+        return self._active.get(api_version, 0)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-version session counters"""
+        return {
+            version: {
+                "active_sessions": self._active.get(version, 0),
+                "total_sessions": self._total.get(version, 0)
+            }
+            for version in self._clients
+        }
+
+    async def aclose(self) -> None:
+        """Close every client and the shared HTTP pool"""
+        self._closed = True
+        for version, client in self._clients.items():
+            try:
+                await client.aio.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing Gemini client {version}: {e}")
+        self._clients.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        logger.info("🔌 Gemini clients closed")
+
+
+# Singleton client manager (opened/closed by the FastAPI lifespan)
+gemini_clients = GeminiClientManager()
@@ -0,0 +1,389 @@
+"""
+Axiom RESET - Voice Transport Codecs
+Compressed audio encodings for the /ws/voice client link
+
+Gemini Live always receives and returns PCM16; these codecs only apply
+between the voice client and the bridge. Codec instances are stateful, so
+each session keeps one per direction (uplink decoder, downlink encoder).
+
+    pcm16   raw PCM16 little-endian (no compression)
+    mulaw   G.711 μ-law, 8 bit/sample (2:1), stateless, pure Python or NumPy
+    adpcm   IMA ADPCM, 4 bit/sample (~4:1), stateful encoder, pure Python
+    opus    Opus 20 ms packets (~16-32 kbit/s), requires `opuslib`
+
+ADPCM is a per-sample recurrence with no vectorized form, so it costs
+roughly 37 ms (encode) / 25 ms (decode) of CPU per second of 24 kHz
+audio. Its work runs on a small thread pool instead of the event loop;
+it still holds the GIL, so prefer μ-law or Opus for many sessions.
+The bridge calls `encode_async()` / `decode_async()`, which offload
+codecs with `offload = True`.
+
+Encoders that frame their input (Opus, ADPCM) hold back a partial frame
+between calls; the bridge calls `flush()` at the end of each model turn
+so a reply's last few milliseconds are not held until the next one.
+
+An undecodable Opus packet is dropped (counted in `dropped_packets` and
+axiom_codec_dropped_packets_total) instead of failing the session.
+
+    VOICE_CODEC_THREADS=4     thread pool size for offloaded codecs
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Type
+
+from api.metrics import registry
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import opuslib
+except ImportError:  # Opus is optional; μ-law / ADPCM always work
+    opuslib = None
+
+logger = logging.getLogger("AxiomVoice")
+
+VOICE_CODEC_THREADS = int(os.getenv("VOICE_CODEC_THREADS", 4))
+
+# Shared by every session: slow pure-Python codecs run here, off the event loop
+codec_threads = ThreadPoolExecutor(max_workers=VOICE_CODEC_THREADS, thread_name_prefix="axiom-codec")
+
+CODEC_DROPPED_PACKETS = registry.counter(
+    "axiom_codec_dropped_packets_total",
+    "Client audio messages dropped because they could not be decoded",
+    ("codec",)
+)
+
+
+class AudioCodec:
+    """Base codec: PCM16 <-> wire format, with per-stream CPU accounting"""
+
+    name = "pcm16"
+    offload = False  # run encode/decode on codec_threads
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.dropped_packets = 0
+        self.encode_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.pcm_bytes_encoded = 0
+        self.wire_bytes_encoded = 0
+        self.wire_bytes_decoded = 0
+        self.pcm_bytes_decoded = 0
+
+    def encode(self, pcm: bytes) -> List[bytes]:
+        """Encode PCM16 into zero or more wire messages"""
+        started = time.perf_counter()
+        messages = self._encode(pcm)
+        self.encode_seconds += time.perf_counter() - started
+        self.pcm_bytes_encoded += len(pcm)
+        self.wire_bytes_encoded += sum(len(m) for m in messages)
+        return messages
+
+    def decode(self, data: bytes) -> bytes:
+        """Decode one wire message into PCM16"""
+        started = time.perf_counter()
+        pcm = self._decode(data)
+        self.decode_seconds += time.perf_counter() - started
+        self.wire_bytes_decoded += len(data)
+        self.pcm_bytes_decoded += len(pcm)
+        return pcm
+
+    def flush(self) -> List[bytes]:
+        """Encode any held-back partial frame (zero-padded) at the end of a stream segment"""
+        started = time.perf_counter()
+        messages = self._flush()
+        self.encode_seconds += time.perf_counter() - started
+        self.wire_bytes_encoded += sum(len(m) for m in messages)
+        return messages
+
+    async def encode_async(self, pcm: bytes) -> List[bytes]:
+        """`encode()`, off the event loop for offloaded codecs"""
+        if not self.offload:
+            return self.encode(pcm)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(codec_threads, self.encode, pcm)
+
+    async def decode_async(self, data: bytes) -> bytes:
+        """`decode()`, off the event loop for offloaded codecs"""
+        if not self.offload:
+            return self.decode(data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(codec_threads, self.decode, data)
+
+    def _drop(self, error: Exception) -> bytes:
+        """Count an undecodable message; it decodes to no audio"""
+        self.dropped_packets += 1
+        CODEC_DROPPED_PACKETS.labels(self.name).inc()
+        logger.debug("Dropped undecodable %s packet: %s", self.name, error)
+        return b""
+
+    def _encode(self, pcm: bytes) -> List[bytes]:
+        return [pcm] if pcm else []
+
+    def _decode(self, data: bytes) -> bytes:
+        return data
+
+    def _flush(self) -> List[bytes]:
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "codec": self.name,
+            "dropped_packets": self.dropped_packets,
+            "encode_cpu_ms": round(self.encode_seconds * 1000, 3),
+            "decode_cpu_ms": round(self.decode_seconds * 1000, 3),
+            "downlink_ratio": (
+                round(self.wire_bytes_encoded / self.pcm_bytes_encoded, 3)
+                if self.pcm_bytes_encoded else None
+            ),
+            "uplink_ratio": (
+                round(self.wire_bytes_decoded / self.pcm_bytes_decoded, 3)
+                if self.pcm_bytes_decoded else None
+            )
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# G.711 μ-LAW
+# ═══════════════════════════════════════════════════════════════════
+
+def _mulaw_encode_sample(sample: int) -> int:
+    bias, clip = 0x84, 32635
+    sign = 0x80 if sample < 0 else 0
+    if sample < 0:
+        sample = -sample
+    sample = min(sample, clip) + bias
+    exponent = 7
+    mask = 0x4000
+    while exponent > 0 and not sample & mask:
+        exponent -= 1
+        mask >>= 1
+    mantissa = (sample >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+def _mulaw_decode_byte(byte: int) -> int:
+    byte = ~byte & 0xFF
+    sign = byte & 0x80
+    exponent = (byte >> 4) & 0x07
+    mantissa = byte & 0x0F
+    sample = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return -sample if sign else sample
+
+
+# Lookup tables: unsigned 16-bit PCM value -> μ-law byte, μ-law byte -> PCM16
+_MULAW_ENCODE = bytes(
+    _mulaw_encode_sample(value - 65536 if value >= 32768 else value)
+    for value in range(65536)
+)
+_MULAW_DECODE = array("h", (_mulaw_decode_byte(byte) for byte in range(256)))
+
+
+class MuLawCodec(AudioCodec):
+    """G.711 μ-law (table driven, vectorized when NumPy is available)"""
+
+    name = "mulaw"
+
+    if np is not None:
+        _encode_table = np.frombuffer(_MULAW_ENCODE, dtype=np.uint8)
+        _decode_table = np.array(_MULAW_DECODE, dtype="<i2")
+
+    def _encode(self, pcm: bytes) -> List[bytes]:
+        if not pcm:
+            return []
+        pcm = pcm[:len(pcm) - len(pcm) % 2]
+        if np is not None:
+            return [self._encode_table[np.frombuffer(pcm, dtype="<u2")].tobytes()]
+        samples = array("H", pcm)
+        return [bytes(_MULAW_ENCODE[value] for value in samples)]
+
+    def _decode(self, data: bytes) -> bytes:
+        if np is not None:
+            return self._decode_table[np.frombuffer(data, dtype=np.uint8)].tobytes()
+        return array("h", (_MULAW_DECODE[byte] for byte in data)).tobytes()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# IMA ADPCM
+# ═══════════════════════════════════════════════════════════════════
+
+_IMA_INDEX = (-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8)
+_IMA_STEPS = (
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41,
+    45, 50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190,
+    209, 230, 253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724,
+    796, 876, 963, 1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272,
+    2499, 2749, 3024, 3327, 3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132,
+    7845, 8630, 9493, 10442, 11487, 12635, 13899, 15289, 16818, 18500,
+    20350, 22385, 24623, 27086, 29794, 32767
+)
+
+
+class ImaAdpcmCodec(AudioCodec):
+    """
+    IMA ADPCM, 4 bits per sample, two samples per byte (low nibble first)
+
+    The encoder carries its predictor and step index across messages so
+    the stream stays continuous. Each message starts with a 4-byte block
+    header holding the encoder state at the start of the block (int16
+    predictor, uint8 step index, pad byte), like WAV IMA ADPCM blocks, so
+    a message dropped by the downstream queue does not desync the decoder.
+    Offloaded to codec_threads (see the module docstring for its cost).
+    """
+
+    name = "adpcm"
+    offload = True
+    HEADER = struct.Struct("<hBx")
+
+    def __init__(self, sample_rate: int):
+        super().__init__(sample_rate)
+        self._enc_predictor = 0
+        self._enc_index = 0
+        self._odd = b""
+
+    @staticmethod
+    def _step(code: int, predictor: int, index: int):
+        step = _IMA_STEPS[index]
+        diff = step >> 3
+        if code & 4:
+            diff += step
+        if code & 2:
+            diff += step >> 1
+        if code & 1:
+            diff += step >> 2
+        predictor = predictor - diff if code & 8 else predictor + diff
+        predictor = max(-32768, min(32767, predictor))
+        index = max(0, min(88, index + _IMA_INDEX[code]))
+        return predictor, index
+
+    def _encode(self, pcm: bytes) -> List[bytes]:
+        pcm = self._odd + pcm
+        usable = len(pcm) - len(pcm) % 4  # whole byte = two samples
+        self._odd = pcm[usable:]
+        if not usable:
+            return []
+        samples = array("h", pcm[:usable])
+        predictor, index = self._enc_predictor, self._enc_index
+        header = self.HEADER.pack(predictor, index)
+        out = bytearray(len(samples) // 2)
+        for position, sample in enumerate(samples):
+            step = _IMA_STEPS[index]
+            diff = sample - predictor
+            code = 0
+            if diff < 0:
+                code = 8
+                diff = -diff
+            if diff >= step:
+                code |= 4
+                diff -= step
+            if diff >= step >> 1:
+                code |= 2
+                diff -= step >> 1
+            if diff >= step >> 2:
+                code |= 1
+            predictor, index = self._step(code, predictor, index)
+            if position & 1:
+                out[position >> 1] |= code << 4
+            else:
+                out[position >> 1] = code
+        self._enc_predictor, self._enc_index = predictor, index
+        return [header + out]
+
+    def _flush(self) -> List[bytes]:
+        if not self._odd:
+            return []
+        return self._encode(bytes(4 - len(self._odd)))
+
+    def _decode(self, data: bytes) -> bytes:
+        if len(data) < self.HEADER.size:
+            return b""
+        predictor, index = self.HEADER.unpack_from(data)
+        index = min(index, 88)
+        data = memoryview(data)[self.HEADER.size:]
+        samples = array("h", bytes(len(data) * 4))
+        position = 0
+        for byte in data:
+            predictor, index = self._step(byte & 0x0F, predictor, index)
+            samples[position] = predictor
+            predictor, index = self._step(byte >> 4, predictor, index)
+            samples[position + 1] = predictor
+            position += 2
+        return samples.tobytes()
+
+
+# ═══════════════════════════════════════════════════════════════════
+# OPUS (optional)
+# ═══════════════════════════════════════════════════════════════════
+
+class OpusCodec(AudioCodec):
+    """Opus VOIP codec; each wire message is one 20 ms packet"""
+
+    name = "opus"
+    SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+    FRAME_MS = 20
+
+    def __init__(self, sample_rate: int):
+        super().__init__(sample_rate)
+        self._frame_samples = sample_rate * self.FRAME_MS // 1000
+        self._frame_bytes = self._frame_samples * 2
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._pending = bytearray()
+
+    def _encode(self, pcm: bytes) -> List[bytes]:
+        self._pending += pcm
+        packets = []
+        while len(self._pending) >= self._frame_bytes:
+            frame = bytes(self._pending[:self._frame_bytes])
+            del self._pending[:self._frame_bytes]
+            packets.append(self._encoder.encode(frame, self._frame_samples))
+        return packets
+
+    def _flush(self) -> List[bytes]:
+        if not self._pending:
+            return []
+        return self._encode(bytes(self._frame_bytes - len(self._pending)))
+
+    def _decode(self, data: bytes) -> bytes:
+        # Max Opus packet duration is 120 ms
+        try:
+            return self._decoder.decode(data, self.sample_rate * 120 // 1000)
+        except opuslib.OpusError as e:
+            return self._drop(e)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════════════════════
+
+CODECS: Dict[str, Type[AudioCodec]] = {
+    "pcm16": AudioCodec,
+    "mulaw": MuLawCodec,
+    "adpcm": ImaAdpcmCodec,
+}
+if opuslib is not None:
+    CODECS["opus"] = OpusCodec
+
+
+def available_codecs() -> List[str]:
+    """Codec names this server can negotiate"""
+    return list(CODECS)
+
+
+def create_codec(name: str, sample_rate: int) -> AudioCodec:
+    """Create a codec instance for one session"""
+    codec_cls = CODECS.get(name)
+    if codec_cls is None:
+        raise ValueError(f"Unsupported encoding: {name} (available: {available_codecs()})")
+    if codec_cls is OpusCodec and sample_rate not in OpusCodec.SAMPLE_RATES:
+        raise ValueError(f"Opus does not support {sample_rate} Hz")
+    return codec_cls(sample_rate)
@@ -0,0 +1,422 @@
+"""
+Axiom RESET - Fake Gemini Live Backend
+Local stand-in for the Gemini API (no network, no API key)
+
+Implements the subset of the google-genai surface the platform uses:
+`client.aio.live.connect(model=..., config=...)` returning a session with
+`send(input=..., end_of_turn=...)` and `receive()`. Every time the user's
+turn ends, the fake replies with a scripted text part followed by PCM16
+24 kHz audio chunks, then `turn_complete`. Text chat gets
+`client.aio.models.generate_content(...)` and
+`generate_content_stream(...)`, which answer with `chat_reply` word by
+word; `count_tokens(...)` estimates ~4 characters per token.
+`client.aio.caches` keeps cached instructions in memory.
+
+Selected with GEMINI_BACKEND=fake (see api/clients.py). The script is
+read from FAKE_LIVE_* environment variables, one per FakeLiveScript
+field, e.g.:
+
+    FAKE_LIVE_CONNECT_LATENCY=0.3     handshake time
+    FAKE_LIVE_FIRST_AUDIO_DELAY=0.5   model think time per turn
+    FAKE_LIVE_SEND_LATENCY=0.02       per-send upstream latency (backpressure)
+    FAKE_LIVE_CHUNK_MS=20             reply audio chunk size
+    FAKE_LIVE_TOOL_EVERY=2            inject a tool call every 2nd turn
+    FAKE_LIVE_TOOL_PARALLEL=3         ... carrying 3 function calls at once
+    FAKE_LIVE_CONNECT_ERROR="received 1007 ... API key not valid"
+    FAKE_LIVE_CONNECT_FAILURE_RATE=0.1
+    FAKE_LIVE_DISCONNECT_AFTER=30     upstream drops the session after 30 s
+    FAKE_LIVE_CHAT_LATENCY=0.5        chat time to first token
+    FAKE_LIVE_CHAT_FAILURE_RATE=0.05  chat calls failing with 503
+    FAKE_LIVE_CHAT_SLOW_RATE=0.02     chat calls that take CHAT_SLOW_LATENCY longer
+"""
+
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import random
+import struct
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+class FakeLiveError(Exception):
+    """Failure raised by the fake backend (mirrors upstream API errors)"""
+    pass
+
+
+@dataclass
+class FakeLiveScript:
+    """Behaviour of the fake model and its failure modes"""
+    reply_text: str = "أهلاً! أنا وكيل تجريبي."
+    reply_seconds: float = 2.0         # audio duration per reply
+    chunk_ms: int = 40                 # audio chunk size sent downstream
+    first_audio_delay: float = 0.2     # model "thinking" time before the first chunk
+    connect_latency: float = 0.05      # handshake time for live.connect()
+    send_latency: float = 0.0          # time each session.send() takes
+    realtime: bool = True              # pace chunks at real time (False = burst)
+
+    # Tool-call injection
+    tool_every: int = 0                # every Nth turn starts with a tool call (0 = never)
+    tool_name: str = "search_restaurants"
+    tool_args: str = '{"location": "القاهرة"}'  # JSON
+    tool_parallel: int = 1             # function calls per tool_call message
+    tool_timeout: float = 10.0         # give up waiting for the tool response
+
+    # Failure modes
+    connect_error: str = ""            # always fail live.connect() with this message
+    connect_failure_rate: float = 0.0  # probability that live.connect() fails
+    disconnect_after: float = 0.0      # upstream closes the session after N seconds (0 = never)
+    seed: int = 0                      # RNG seed (0 = nondeterministic)
+
+    # Text chat (generate_content)
+    chat_reply: str = "أهلاً بيك! تحب تطلب إيه النهارده؟"
+    chat_latency: float = 0.3          # time to first token
+    chat_token_delay: float = 0.02     # gap between streamed tokens
+    chat_error: str = ""               # always fail generate_content with this message
+    chat_failure_rate: float = 0.0     # probability of a transient "503 UNAVAILABLE"
+    chat_slow_rate: float = 0.0        # probability that a call is a slow outlier
+    chat_slow_latency: float = 2.0     # extra latency added to slow outliers
+
+    @classmethod
+    def from_env(cls, prefix: str = "FAKE_LIVE_") -> "FakeLiveScript":
+        """Build a script from FAKE_LIVE_<FIELD> environment variables"""
+        values: Dict[str, Any] = {}
+        for f in dataclasses.fields(cls):
+            raw = os.getenv(prefix + f.name.upper())
+            if raw is None:
+                continue
+            if f.type in (bool, "bool"):
+                values[f.name] = raw.lower() in ("1", "true", "yes")
+            elif f.type in (int, "int"):
+                values[f.name] = int(raw)
+            elif f.type in (float, "float"):
+                values[f.name] = float(raw)
+            else:
+                values[f.name] = raw
+        return cls(**values)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# RESPONSE OBJECTS (shaped like google.genai.types.LiveServerMessage)
+# ═══════════════════════════════════════════════════════════════════
+
+class FakeServerContent:
+    def __init__(self, turn_complete: bool = False):
+        self.turn_complete = turn_complete
+
+
+class FakeFunctionCall:
+    def __init__(self, call_id: str, name: str, args: Dict[str, Any]):
+        self.id = call_id
+        self.name = name
+        self.args = args
+
+
+class FakeToolCall:
+    def __init__(self, function_calls: List[FakeFunctionCall]):
+        self.function_calls = function_calls
+
+
+class FakeLiveResponse:
+    """Mimics google.genai.types.LiveServerMessage accessors"""
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        text: Optional[str] = None,
+        turn_complete: bool = False,
+        tool_call: Optional[FakeToolCall] = None
+    ):
+        self.data = data
+        self.text = text
+        self.tool_call = tool_call
+        self.server_content = FakeServerContent(True) if turn_complete else None
+
+
+class FakeUsageMetadata:
+    def __init__(
+        self,
+        prompt_token_count: int,
+        candidates_token_count: int,
+        cached_content_token_count: Optional[int] = None
+    ):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+
+class FakeCountTokensResponse:
+    def __init__(self, total_tokens: int):
+        self.total_tokens = total_tokens
+
+
+class FakeCachedContent:
+    def __init__(self, name: str, model: str, instruction: str):
+        self.name = name
+        self.model = model
+        self.instruction = instruction
+        self.usage_metadata = FakeUsageMetadata(_count_tokens(instruction), 0)
+
+
+class FakeGenerateResponse:
+    """Mimics google.genai.types.GenerateContentResponse accessors"""
+
+    def __init__(self, text: str, usage_metadata: Optional[FakeUsageMetadata] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+def _count_tokens(value: Any) -> int:
+    """Rough token count (~4 characters per token)"""
+    return max(1, len(str(value or "")) // 4)
+
+
+def _tone(seconds: float, sample_rate: int = 24000, freq: float = 220.0) -> bytes:
+    """A quiet sine tone as PCM16 (the fake model's 'voice')"""
+    count = int(seconds * sample_rate)
+    return struct.pack(
+        f"<{count}h",
+        *(int(3000 * math.sin(2 * math.pi * freq * i / sample_rate)) for i in range(count))
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FAKE SESSION
+# ═══════════════════════════════════════════════════════════════════
+
+class FakeLiveSession:
+    """One fake Live session: replies to each completed user turn"""
+
+    SAMPLE_RATE = 24000
+
+    def __init__(self, script: FakeLiveScript, audio: bytes):
+        self.script = script
+        self._audio = audio
+        self._responses: asyncio.Queue = asyncio.Queue()
+        self._reply_task: Optional[asyncio.Task] = None
+        self._drop_task: Optional[asyncio.Task] = None
+        self._tool_response = asyncio.Event()
+        self.closed = False
+
+        # Counters
+        self.sends = 0
+        self.bytes_received = 0
+        self.turns = 0
+        self.tool_calls = 0
+        self.tool_round_trips: List[float] = []
+
+        if script.disconnect_after > 0:
+            self._drop_task = asyncio.create_task(self._drop_after(script.disconnect_after))
+
+    @staticmethod
+    def _is_tool_response(input: Any) -> bool:
+        if isinstance(input, dict):
+            return "response" in input and "name" in input
+        if isinstance(input, (list, tuple)):
+            return any(FakeLiveSession._is_tool_response(item) for item in input)
+        return hasattr(input, "function_responses") or hasattr(input, "response")
+
+    async def send(self, input: Any = None, end_of_turn: bool = False) -> None:
+        if self.closed:
+            raise FakeLiveError("Session is closed")
+        if self.script.send_latency:
+            await asyncio.sleep(self.script.send_latency)
+        self.sends += 1
+        if isinstance(input, dict) and "data" in input:
+            self.bytes_received += len(input["data"])
+        elif self._is_tool_response(input):
+            self._tool_response.set()
+        if end_of_turn:
+            self.turns += 1
+            self._reply_task = asyncio.create_task(self._reply(self.turns))
+
+    async def _reply(self, turn: int) -> None:
+        script = self.script
+        if script.tool_every and turn % script.tool_every == 0:
+            await self._call_tool(turn)
+        await asyncio.sleep(script.first_audio_delay)
+        await self._responses.put(FakeLiveResponse(text=script.reply_text))
+        chunk_bytes = int(self.SAMPLE_RATE * script.chunk_ms / 1000) * 2
+        for offset in range(0, len(self._audio), chunk_bytes):
+            await self._responses.put(FakeLiveResponse(data=self._audio[offset:offset + chunk_bytes]))
+            if script.realtime:
+                await asyncio.sleep(script.chunk_ms / 1000)
+        await self._responses.put(FakeLiveResponse(turn_complete=True))
+
+    async def _call_tool(self, turn: int) -> None:
+        """Ask the bridge to run a tool and wait for its response"""
+        self.tool_calls += 1
+        self._tool_response.clear()
+        calls = [
+            FakeFunctionCall(
+                f"fake-call-{turn}-{index}",
+                self.script.tool_name,
+                json.loads(self.script.tool_args or "{}")
+            )
+            for index in range(max(1, self.script.tool_parallel))
+        ]
+        started = time.perf_counter()
+        await self._responses.put(FakeLiveResponse(tool_call=FakeToolCall(calls)))
+        try:
+            await asyncio.wait_for(self._tool_response.wait(), self.script.tool_timeout)
+            self.tool_round_trips.append(time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _drop_after(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        await self.close()
+
+    async def receive(self):
+        """Yield responses until the end of the current turn (like the SDK)"""
+        while not self.closed:
+            response = await self._responses.get()
+            if response is None:
+                return
+            yield response
+            if response.server_content and response.server_content.turn_complete:
+                return
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for task in (self._reply_task, self._drop_task):
+            if task and task is not asyncio.current_task():
+                task.cancel()
+        await self._responses.put(None)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FAKE CLIENT
+# ═══════════════════════════════════════════════════════════════════
+
+class _FakeLive:
+    def __init__(self, script: FakeLiveScript):
+        self.script = script
+        self._audio = _tone(script.reply_seconds)
+        self._rng = random.Random(script.seed or None)
+        self.sessions_opened = 0
+        self.connect_failures = 0
+
+    @asynccontextmanager
+    async def connect(self, model: str, config: Any = None):
+        await asyncio.sleep(self.script.connect_latency)
+        if self.script.connect_error:
+            self.connect_failures += 1
+            raise FakeLiveError(self.script.connect_error)
+        if self.script.connect_failure_rate and self._rng.random() < self.script.connect_failure_rate:
+            self.connect_failures += 1
+            raise FakeLiveError("received 1011 (internal error) fake upstream failure")
+        self.sessions_opened += 1
+        session = FakeLiveSession(self.script, self._audio)
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class _FakeCaches:
+    def __init__(self):
+        self.entries: Dict[str, FakeCachedContent] = {}
+
+    async def create(self, model: str, config: Any = None) -> FakeCachedContent:
+        config = config or {}
+        name = f"cachedContents/fake-{len(self.entries) + 1}"
+        content = FakeCachedContent(name, model, config.get("system_instruction", ""))
+        self.entries[name] = content
+        return content
+
+    async def update(self, name: str, config: Any = None) -> FakeCachedContent:
+        if name not in self.entries:
+            raise FakeLiveError(f"404 {name} not found")
+        return self.entries[name]
+
+    async def delete(self, name: str, config: Any = None) -> None:
+        self.entries.pop(name, None)
+
+
+class _FakeModels:
+    def __init__(self, script: FakeLiveScript, caches: _FakeCaches):
+        self.script = script
+        self.caches = caches
+        self._rng = random.Random(script.seed or None)
+        self.calls = 0
+        self.failures = 0
+
+    async def _upstream_delay(self, seconds: float) -> None:
+        """Wait like the upstream would, failing or stalling per the script"""
+        if self.script.chat_slow_rate and self._rng.random() < self.script.chat_slow_rate:
+            seconds += self.script.chat_slow_latency
+        await asyncio.sleep(seconds)
+        if self.script.chat_error:
+            self.failures += 1
+            raise FakeLiveError(self.script.chat_error)
+        if self.script.chat_failure_rate and self._rng.random() < self.script.chat_failure_rate:
+            self.failures += 1
+            raise FakeLiveError("503 UNAVAILABLE. The model is overloaded. Please try again later.")
+
+    async def count_tokens(self, model: str, contents: Any, config: Any = None) -> FakeCountTokensResponse:
+        return FakeCountTokensResponse(_count_tokens(contents))
+
+    def _usage(self, contents: Any, config: Any) -> FakeUsageMetadata:
+        config = config if isinstance(config, dict) else {}
+        prompt = _count_tokens(contents)
+        cached_tokens = None
+        if config.get("cached_content"):
+            cached = self.caches.entries.get(config["cached_content"])
+            if cached is None:
+                raise FakeLiveError(f"404 {config['cached_content']} not found")
+            cached_tokens = cached.usage_metadata.total_token_count
+            prompt += cached_tokens
+        else:
+            prompt += _count_tokens(config.get("system_instruction"))
+        return FakeUsageMetadata(prompt, _count_tokens(self.script.chat_reply), cached_tokens)
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None) -> FakeGenerateResponse:
+        self.calls += 1
+        usage = self._usage(contents, config)
+        words = self.script.chat_reply.split()
+        await self._upstream_delay(self.script.chat_latency + self.script.chat_token_delay * max(len(words) - 1, 0))
+        return FakeGenerateResponse(self.script.chat_reply, usage)
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Any = None):
+        self.calls += 1
+        usage = self._usage(contents, config)
+
+        async def stream():
+            await self._upstream_delay(self.script.chat_latency)
+            words = self.script.chat_reply.split()
+            for position, word in enumerate(words):
+                if position:
+                    await asyncio.sleep(self.script.chat_token_delay)
+                last = position == len(words) - 1
+                yield FakeGenerateResponse(
+                    word if not position else " " + word,
+                    usage if last else None
+                )
+
+        return stream()
+
+
+class _FakeAio:
+    def __init__(self, script: FakeLiveScript):
+        self.live = _FakeLive(script)
+        self.caches = _FakeCaches()
+        self.models = _FakeModels(script, self.caches)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeLiveClient:
+    """Drop-in for genai.Client (GEMINI_BACKEND=fake)"""
+
+    def __init__(self, script: Optional[FakeLiveScript] = None):
+        self.script = script or FakeLiveScript.from_env()
+        self.aio = _FakeAio(self.script)
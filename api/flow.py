@@ -0,0 +1,143 @@
+"""
+Axiom RESET - Voice Flow Control
+Bounded queues with explicit overflow policies between bridge tasks
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Tuple
+
+logger = logging.getLogger("AxiomFlow")
+
+
+class OverflowPolicy(str, Enum):
+    """What a full queue does with a new item"""
+    DROP_OLDEST = "drop_oldest"   # Discard the oldest audio chunk (control messages are kept)
+    BLOCK = "block"               # Wait for the consumer (backpressure to the producer)
+    DISCONNECT = "disconnect"     # Give up on the connection
+
+
+class QueueOverflow(Exception):
+    """Raised by a DISCONNECT-policy queue when it is full"""
+    pass
+
+
+class BoundedStreamQueue:
+    """
+    Bounded FIFO between a producer task and a consumer task
+
+    Items are tagged as droppable (audio) or not (JSON control/events).
+    When the queue is full the overflow policy decides what happens:
+    DROP_OLDEST evicts the oldest droppable item, so a slow listener hears
+    the newest audio instead of an ever-growing backlog; BLOCK makes the
+    producer wait; DISCONNECT raises QueueOverflow. Control items are
+    never dropped and are allowed to exceed the bound under DROP_OLDEST.
+
+    High/low watermarks (fractions of `maxsize`) give a hysteresis
+    `congested` flag for monitoring and logging.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        high_watermark: float = 0.75,
+        low_watermark: float = 0.25
+    ):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.policy = OverflowPolicy(policy)
+        self.high = max(1, int(self.maxsize * high_watermark))
+        self.low = int(self.maxsize * low_watermark)
+        self._items: Deque[Tuple[bool, Any]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.congested = False
+
+        # Counters
+        self.enqueued = 0
+        self.dropped = 0
+        self.congestion_events = 0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def _drop_oldest(self) -> bool:
+        for index, (droppable, _) in enumerate(self._items):
+            if droppable:
+                del self._items[index]
+                self.dropped += 1
+                return True
+        return False
+
+    def _update_watermarks(self) -> None:
+        depth = len(self._items)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if not self.congested and depth >= self.high:
+            self.congested = True
+            self.congestion_events += 1
+            logger.warning(f"⚠️ Queue {self.name} congested (depth={depth}/{self.maxsize})")
+        elif self.congested and depth <= self.low:
+            self.congested = False
+            logger.info(f"✅ Queue {self.name} drained (depth={depth}/{self.maxsize})")
+
+    async def put(self, item: Any, droppable: bool = True) -> None:
+        """Enqueue an item, applying the overflow policy when full"""
+        if len(self._items) >= self.maxsize:
+            if self.policy is OverflowPolicy.DISCONNECT:
+                raise QueueOverflow(f"Queue {self.name} overflowed ({self.maxsize} items)")
+            if self.policy is OverflowPolicy.DROP_OLDEST:
+                if droppable and not self._drop_oldest():
+                    # Only control items queued: drop the new audio instead
+                    self.dropped += 1
+                    return
+            else:
+                started = time.monotonic()
+                while len(self._items) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                self.blocked_seconds += time.monotonic() - started
+
+        self._items.append((droppable, item))
+        self.enqueued += 1
+        self._not_empty.set()
+        self._update_watermarks()
+
+    async def get(self) -> Any:
+        """Dequeue the next item, waiting while the queue is empty"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        _, item = self._items.popleft()
+        if len(self._items) < self.maxsize:
+            self._not_full.set()
+        self._update_watermarks()
+        return item
+
+    def drain(self) -> None:
+        """Discard everything still queued"""
+        self._items.clear()
+        self._not_full.set()
+        self._update_watermarks()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._items),
+            "maxsize": self.maxsize,
+            "policy": self.policy.value,
+            "congested": self.congested,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "congestion_events": self.congestion_events,
+            "blocked_seconds": round(self.blocked_seconds, 3)
+        }
@@ -0,0 +1,294 @@
+"""
+Axiom RESET - Instruction Context Cache
+Uploads each agent's system instruction once to Gemini cached content
+
+Without it every chat call resends the full instruction as prompt
+tokens. The manager creates one cached-content entry per distinct
+instruction (keyed by its hash), hands chat calls a config that points
+at the entry (`cached_content`) instead of the text, extends the entry's
+TTL before it expires, and counts the prompt tokens served from cache.
+
+Explicit caching only accepts content above a per-model minimum
+(1,024 tokens for Gemini 2.5 Flash, 4,096 for 2.5 Pro and older models),
+and the shipped agent instructions are far below it. So the manager
+counts an instruction's tokens once (models.count_tokens) and only
+uploads it when it clears the model's minimum; smaller instructions are
+sent inline and listed under "skipped" in the stats with their token
+count, so it is visible which agents could never use the cache. The
+savings reported per entry are the `cached_content_token_count` Gemini
+returns for each call, not an estimate.
+
+Any other failure (model without caching support, quota) falls back to
+the inline instruction and is not retried until INSTRUCTION_CACHE_RETRY
+seconds have passed.
+
+    INSTRUCTION_CACHE_ENABLED=false     opt-in
+    INSTRUCTION_CACHE_MIN_TOKENS=0      override the model's minimum (0 = model table)
+
+The Live API setup message has no cached-content field, so voice
+sessions still send the instruction once per connection (the warm
+session pool takes that off the caller's path).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from api.chat_cache import instruction_hash
+from api.clients import gemini_clients, CHAT_API_VERSION
+from api.metrics import registry
+
+logger = logging.getLogger("AxiomInstructionCache")
+
+INSTRUCTION_CACHE_ENABLED = os.getenv("INSTRUCTION_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+INSTRUCTION_CACHE_TTL = int(os.getenv("INSTRUCTION_CACHE_TTL", 3600))
+INSTRUCTION_CACHE_REFRESH_MARGIN = int(os.getenv("INSTRUCTION_CACHE_REFRESH_MARGIN", 300))
+INSTRUCTION_CACHE_RETRY = int(os.getenv("INSTRUCTION_CACHE_RETRY", 600))
+INSTRUCTION_CACHE_MIN_TOKENS = int(os.getenv("INSTRUCTION_CACHE_MIN_TOKENS", 0))
+
+# Minimum cacheable tokens by model name prefix (first match); anything else gets the default
+MODEL_MIN_CACHE_TOKENS = (
+    ("gemini-2.5-flash", 1024),
+    ("gemini-2.5-pro", 4096),
+)
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+
+def min_cache_tokens(model: str) -> int:
+    """Smallest instruction (in tokens) the model accepts for explicit caching"""
+    if INSTRUCTION_CACHE_MIN_TOKENS > 0:
+        return INSTRUCTION_CACHE_MIN_TOKENS
+    name = model.split("/")[-1]
+    for prefix, tokens in MODEL_MIN_CACHE_TOKENS:
+        if name.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHE_TOKENS
+
+INSTRUCTION_TOKENS_SAVED = registry.counter(
+    "axiom_instruction_cache_tokens_saved_total",
+    "Prompt tokens served from cached instructions",
+    ("agent",)
+)
+
+
+@dataclass
+class SkippedInstruction:
+    """An instruction sent inline because it is below the model's cacheable minimum"""
+    agent_id: str
+    model: str
+    token_count: int
+    min_tokens: int
+
+
+@dataclass
+class CachedInstruction:
+    """One cached-content entry for an instruction"""
+    name: str
+    agent_id: str
+    model: str
+    expires_at: float
+    token_count: Optional[int] = None
+    requests: int = 0
+    tokens_saved: int = 0
+
+
+class InstructionCacheManager:
+    """
+    Maps instruction hash -> Gemini cached-content handle
+
+    Example:
+        ```python
+        config = await instruction_cache.chat_config("sofra", config.instruction, CHAT_MODEL_ID)
+        response = await client.aio.models.generate_content(model=..., contents=..., config=config)
+        instruction_cache.record_usage("sofra", config, response.usage_metadata)
+        ```
+    """
+
+    def __init__(
+        self,
+        enabled: bool = INSTRUCTION_CACHE_ENABLED,
+        ttl: int = INSTRUCTION_CACHE_TTL,
+        refresh_margin: int = INSTRUCTION_CACHE_REFRESH_MARGIN,
+        retry_after: int = INSTRUCTION_CACHE_RETRY
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl // 2)
+        self.retry_after = retry_after
+        self._handles: Dict[str, CachedInstruction] = {}
+        self._skipped: Dict[str, SkippedInstruction] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        self.created = 0
+        self.refreshed = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        """Start the background refresher (called from the lifespan)"""
+        if self.enabled and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+            logger.info(f"🗂️ Instruction cache enabled (ttl={self.ttl}s)")
+
+    async def handle(self, agent_id: str, instruction: str, model: str) -> Optional[str]:
+        """Cached-content name for an instruction, creating it on first use"""
+        if not self.enabled:
+            return None
+        key = instruction_hash(instruction)
+        if key in self._skipped:
+            return None
+        cached = self._handles.get(key)
+        if cached is not None and cached.expires_at > time.monotonic():
+            return cached.name
+        if self._failed_until.get(key, 0) > time.monotonic():
+            return None
+
+        # One upload per instruction even when many requests arrive at once
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._create(key, agent_id, instruction, model))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        cached = await asyncio.shield(task)
+        return cached.name if cached else None
+
+    async def _create(self, key: str, agent_id: str, instruction: str, model: str) -> Optional[CachedInstruction]:
+        min_tokens = min_cache_tokens(model)
+        try:
+            client = gemini_clients.get(CHAT_API_VERSION)
+            # A token is at least one character: shorter text cannot reach the minimum
+            if len(instruction) < min_tokens:
+                token_count = None
+            else:
+                counted = await client.aio.models.count_tokens(model=model, contents=instruction)
+                token_count = counted.total_tokens
+            if token_count is None or token_count < min_tokens:
+                self._skip(key, agent_id, model, token_count, min_tokens)
+                return None
+            content = await client.aio.caches.create(
+                model=model,
+                config={
+                    "system_instruction": instruction,
+                    "display_name": f"axiom-{agent_id}-{key}",
+                    "ttl": f"{self.ttl}s"
+                }
+            )
+        except Exception as e:
+            self.failures += 1
+            self._failed_until[key] = time.monotonic() + self.retry_after
+            logger.warning(f"⚠️ Instruction cache unavailable for {agent_id}, sending inline: {e}")
+            return None
+
+        usage = getattr(content, "usage_metadata", None)
+        cached = CachedInstruction(
+            name=content.name,
+            agent_id=agent_id,
+            model=model,
+            expires_at=time.monotonic() + self.ttl,
+            token_count=getattr(usage, "total_token_count", None) or token_count
+        )
+        self._handles[key] = cached
+        self.created += 1
+        logger.info(f"🗂️ Cached instruction for {agent_id}: {cached.name} ({cached.token_count} tokens)")
+        return cached
+
+    def _skip(self, key: str, agent_id: str, model: str, token_count: Optional[int], min_tokens: int) -> None:
+        """Remember an instruction too small to cache (no further API calls for it)"""
+        self._skipped[key] = SkippedInstruction(agent_id, model, token_count or 0, min_tokens)
+        logger.info(
+            f"🗂️ Instruction for {agent_id} not cached: "
+            f"{'< ' + str(min_tokens) if token_count is None else token_count} tokens, "
+            f"{model} needs {min_tokens}"
+        )
+
+    async def chat_config(self, agent_id: str, instruction: str, model: str) -> Dict[str, Any]:
+        """generate_content config referencing the cached instruction (or inline)"""
+        name = await self.handle(agent_id, instruction, model)
+        if name:
+            return {"cached_content": name}
+        return {"system_instruction": instruction}
+
+    def record_usage(self, agent_id: str, config: Dict[str, Any], usage: Any) -> None:
+        """Count prompt tokens that were served from the cached instruction"""
+        name = config.get("cached_content")
+        if not name or usage is None:
+            return
+        saved = getattr(usage, "cached_content_token_count", None) or 0
+        for cached in self._handles.values():
+            if cached.name == name:
+                cached.requests += 1
+                cached.tokens_saved += saved
+                break
+        INSTRUCTION_TOKENS_SAVED.labels(agent_id).inc(saved)
+
+    async def _refresh_loop(self) -> None:
+        interval = max(1.0, self.refresh_margin / 2)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() + self.refresh_margin
+            for key, cached in list(self._handles.items()):
+                if cached.expires_at <= deadline:
+                    await self._refresh(key, cached)
+
+    async def _refresh(self, key: str, cached: CachedInstruction) -> None:
+        """Extend a cache entry's TTL; drop it (inline fallback) on failure"""
+        try:
+            client = gemini_clients.get(CHAT_API_VERSION)
+            await client.aio.caches.update(name=cached.name, config={"ttl": f"{self.ttl}s"})
+            cached.expires_at = time.monotonic() + self.ttl
+            self.refreshed += 1
+            logger.debug("Refreshed cached instruction %s", cached.name)
+        except Exception as e:
+            self.failures += 1
+            self._handles.pop(key, None)
+            logger.warning(f"⚠️ Could not refresh cached instruction {cached.name}: {e}")
+
+    async def aclose(self) -> None:
+        """Stop refreshing and delete the cache entries we created"""
+        if self._refresher:
+            self._refresher.cancel()
+            self._refresher = None
+        for cached in list(self._handles.values()):
+            try:
+                client = gemini_clients.get(CHAT_API_VERSION)
+                await client.aio.caches.delete(name=cached.name)
+            except Exception as e:
+                logger.debug("Cached instruction delete failed for %s: %s", cached.name, e)
+        self._handles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "created": self.created,
+            "refreshed": self.refreshed,
+            "failures": self.failures,
+            "tokens_saved": sum(cached.tokens_saved for cached in self._handles.values()),
+            "skipped": [
+                {
+                    "agent": skipped.agent_id,
+                    "reason": "below_model_minimum",
+                    "instruction_tokens": skipped.token_count or None,
+                    "min_tokens": skipped.min_tokens
+                }
+                for skipped in self._skipped.values()
+            ],
+            "entries": [
+                {
+                    "agent": cached.agent_id,
+                    "name": cached.name,
+                    "instruction_tokens": cached.token_count,
+                    "requests": cached.requests,
+                    "tokens_saved": cached.tokens_saved,
+                    "expires_in": round(cached.expires_at - time.monotonic(), 1)
+                }
+                for cached in self._handles.values()
+            ]
+        }
+
+
+# Singleton instruction cache (started/closed by the FastAPI lifespan)
+instruction_cache = InstructionCacheManager()
@@ -0,0 +1,172 @@
+"""
+Axiom RESET - Logging
+Non-blocking log handlers and sampled logging for the streaming hot path
+
+`setup_logging()` installs a QueueHandler on the root logger; a
+QueueListener thread does the formatting and the console/file I/O, so a
+slow terminal or disk never blocks the event loop.
+
+`StreamLogger` replaces per-chunk log lines in the voice bridge: every
+chunk only bumps counters, one summary line (chunks/s, KB/s per
+direction) is written per interval, and per-chunk DEBUG lines are
+sampled (every Nth chunk) with lazy %-formatting.
+
+Uvicorn's access and connection lines include the request's query
+string; `RedactQueryFilter` masks credential parameters (the voice
+`?resume=` token) before they are written.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "")
+
+# Stream summaries: seconds between lines; DEBUG sample rate (1 = every chunk)
+VOICE_LOG_SUMMARY_SECONDS = float(os.getenv("VOICE_LOG_SUMMARY_SECONDS", 10))
+VOICE_LOG_SAMPLE_EVERY = int(os.getenv("VOICE_LOG_SAMPLE_EVERY", 100))
+
+# Query parameters that carry credentials, masked in server request logs
+REDACTED_QUERY_PARAMS = ("resume",)
+REQUEST_LOGGERS = ("uvicorn.access", "uvicorn.error")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RedactQueryFilter(logging.Filter):
+    """Replace the values of credential query parameters in log records"""
+
+    def __init__(self, params: Sequence[str] = REDACTED_QUERY_PARAMS):
+        super().__init__()
+        self._pattern = re.compile(r"([?&](?:%s)=)[^&\s\"]*" % "|".join(map(re.escape, params)))
+
+    def _redact(self, value: Any) -> Any:
+        return self._pattern.sub(r"\1[redacted]", value) if isinstance(value, str) else value
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(self._redact(arg) for arg in record.args)
+        record.msg = self._redact(record.msg)
+        return True
+
+
+def setup_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE) -> None:
+    """Route all logging through a queue drained by a background thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    redact = RedactQueryFilter()
+    for name in REQUEST_LOGGERS:
+        logging.getLogger(name).addFilter(redact)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class StreamLogger:
+    """
+    Aggregated per-session logging for audio chunk loops
+
+    Example:
+        ```python
+        stream_log = StreamLogger(logger, "sofra")
+        stream_log.chunk("upstream", len(frame))   # per chunk: counters only
+        stream_log.close()                         # final summary
+        ```
+    """
+
+    __slots__ = (
+        "logger", "label", "interval", "sample_every",
+        "_debug", "_info", "_totals", "_window", "_window_started"
+    )
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        interval: float = VOICE_LOG_SUMMARY_SECONDS,
+        sample_every: int = VOICE_LOG_SAMPLE_EVERY
+    ):
+        self.logger = logger
+        self.label = label
+        self.interval = interval
+        self.sample_every = max(1, sample_every)
+        # Level checks once per session, not per chunk
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        self._info = logger.isEnabledFor(logging.INFO) and interval > 0
+        # direction -> [chunks, bytes]
+        self._totals: Dict[str, List[int]] = {}
+        self._window: Dict[str, List[int]] = {}
+        self._window_started = time.monotonic()
+
+    def chunk(self, direction: str, size: int) -> None:
+        """Count one chunk; logs only on sample / summary boundaries"""
+        counts = self._window.get(direction)
+        if counts is None:
+            counts = self._window[direction] = [0, 0]
+        counts[0] += 1
+        counts[1] += size
+        if self._debug and counts[0] % self.sample_every == 0:
+            self.logger.debug("🎧 %s %s chunk #%d: %d bytes", self.label, direction, counts[0], size)
+        if self._info and not counts[0] & 15 and time.monotonic() - self._window_started >= self.interval:
+            self._summary("📈")
+
+    def _summary(self, icon: str) -> None:
+        now = time.monotonic()
+        elapsed = max(now - self._window_started, 1e-9)
+        parts = []
+        for direction, (chunks, size) in self._window.items():
+            parts.append(f"{direction} {chunks / elapsed:.1f} chunks/s {size / elapsed / 1024:.1f} KB/s")
+            totals = self._totals.setdefault(direction, [0, 0])
+            totals[0] += chunks
+            totals[1] += size
+        if parts:
+            self.logger.info("%s %s stream: %s", icon, self.label, ", ".join(parts))
+        self._window.clear()
+        self._window_started = now
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """Chunks and bytes per direction for the whole session"""
+        totals: Dict[str, Dict[str, int]] = {}
+        for counters in (self._totals, self._window):
+            for direction, (chunks, size) in counters.items():
+                entry = totals.setdefault(direction, {"chunks": 0, "bytes": 0})
+                entry["chunks"] += chunks
+                entry["bytes"] += size
+        return totals
+
+    def close(self) -> None:
+        """Log the remaining window as a final summary"""
+        if self._info and self._window:
+            self._summary("📊")
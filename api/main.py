@@ -4,42 +4,97 @@ Main entry point for the agent API with Voice Bridge
 """
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import os
+import json
 import logging
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Setup logging (queue-based: console/file I/O runs off the event loop)
+from api.logging_config import setup_logging
+setup_logging()
 logger = logging.getLogger("AxiomAPI")
 
 # Import Voice Bridge
-from api.websocket_handler import VoiceBridge, get_agent_config, AGENT_CONFIGS
+from api.websocket_handler import VoiceBridge, get_agent_config, active_bridges
+from api.agent_registry import agent_registry
+from api.clients import gemini_clients, CHAT_API_VERSION, CHAT_MODEL_ID
+from api.session_pool import live_pools
+from api.chat_cache import chat_cache, instruction_hash, normalize_arabic
+from api.singleflight import SingleFlight
+from api.batching import ChatBatcher
+from api.admission import AdmissionRejected, chat_admission, voice_admission
+from api.instruction_cache import instruction_cache
+from api.resilience import chat_resilience, live_breakers
+from api.resumption import voice_sessions
+from api.tool_dispatch import tool_dispatch
+from api.metrics import (
+    registry,
+    CONTENT_TYPE_LATEST,
+    CHAT_LATENCY,
+    CHAT_REQUESTS,
+    CHAT_TIME_TO_FIRST_TOKEN
+)
+
+
+def _apply_weights(snapshot) -> None:
+    """Fair-queuing weights for the upstream admission controllers"""
+    weights = {agent_id: config.weight for agent_id, config in snapshot.configs.items()}
+    chat_admission.set_weights(weights)
+    voice_admission.set_weights(weights)
+
+
+async def _reconfigure_pools(snapshot) -> None:
+    """Re-warm pools whose agent config was replaced"""
+    await live_pools.reconfigure(snapshot.configs.values())
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown events"""
     logger.info("🚀 Axiom RESET API Starting...")
-    logger.info(f"📦 Registered Agents: {list(AGENT_CONFIGS.keys())}")
+    configs = agent_registry.snapshot.configs
+    logger.info(f"📦 Registered Agents: {list(configs)} (registry v{agent_registry.version})")
     
     # Check for API key
-    if not os.getenv("GOOGLE_API_KEY"):
+    if gemini_clients.backend == "fake":
+        logger.info("🧪 GEMINI_BACKEND=fake - using the local fake Gemini Live backend")
+    elif not os.getenv("GOOGLE_API_KEY"):
         logger.warning("⚠️ GOOGLE_API_KEY not set - Voice features will not work")
     else:
         logger.info("✅ Google API Key configured")
     
+    # Shared Gemini clients (one HTTP pool for every session)
+    gemini_clients.start()
+    
+    # Fair-queuing weights for the upstream admission controllers
+    _apply_weights(agent_registry.snapshot)
+    
+    # Pre-warmed Gemini Live sessions (VOICE_POOL_MIN_SIZE > 0)
+    live_pools.start(configs.values())
+    
+    # Agent definition hot reload: new configs reach admission weights and warm pools
+    agent_registry.subscribe(_apply_weights)
+    agent_registry.subscribe(_reconfigure_pools)
+    agent_registry.start()
+    
+    # Agent instructions uploaded once to Gemini cached content (opt-in)
+    instruction_cache.start()
+    
     yield
     
     logger.info("👋 Axiom RESET API Shutting down...")
+    await agent_registry.aclose()
+    await live_pools.aclose()
+    await instruction_cache.aclose()
+    await gemini_clients.aclose()
 
 
 app = FastAPI(
@@ -81,29 +136,104 @@ async def root():
         "name": "Axiom RESET API",
         "version": "1.0.0",
         "status": "operational",
-        "voice_enabled": bool(os.getenv("GOOGLE_API_KEY")),
-        "agents": list(AGENT_CONFIGS.keys())
+        "voice_enabled": bool(os.getenv("GOOGLE_API_KEY")) or gemini_clients.backend == "fake",
+        "agents": list(agent_registry.snapshot.configs)
     }
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    return {"status": "healthy"}
+    return {"status": "healthy", "gemini_clients": gemini_clients.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics (voice sessions, bytes, latencies, tools, chat)"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/chat/cache")
+async def chat_cache_stats():
+    """Chat response cache and request coalescing counters"""
+    return {
+        **chat_cache.stats(),
+        "singleflight": chat_flights.stats(),
+        "batching": chat_batcher.stats(),
+        "resilience": chat_resilience.stats()
+    }
+
+
+@app.get("/chat/instructions")
+async def instruction_cache_stats():
+    """Cached agent instructions and prompt tokens saved per entry"""
+    return instruction_cache.stats()
+
+
+@app.get("/upstream/admission")
+async def upstream_admission_stats():
+    """Upstream slots in use and queue depth per agent (chat and voice)"""
+    return {"chat": chat_admission.stats(), "voice": voice_admission.stats()}
+
+
+@app.get("/upstream/circuits")
+async def upstream_circuit_stats():
+    """Circuit breaker state per Live model and API version"""
+    return live_breakers.stats()
+
+
+@app.get("/voice/resume")
+async def voice_resume_stats():
+    """Parked voice sessions, buffered output per session and resume outcomes"""
+    return voice_sessions.stats()
+
+
+@app.get("/registry")
+async def agent_registry_stats():
+    """Agent config registry: snapshot version and per-agent definition versions"""
+    return agent_registry.stats()
+
+
+@app.post("/registry/reload")
+async def reload_agent_registry():
+    """Re-read the agent definition files now (the watcher does this on change)"""
+    changed = await agent_registry.reload()
+    return {"changed": changed, **agent_registry.stats()}
+
+
+@app.get("/voice/tools")
+async def voice_tool_stats():
+    """Tool routes, declarations and call counts per agent"""
+    return tool_dispatch.stats()
+
+
+@app.get("/voice/pool")
+async def voice_pool_stats():
+    """Warm session pool state and warm vs cold connect timings"""
+    return live_pools.stats()
+
+
+@app.get("/voice/sessions")
+async def voice_session_stats():
+    """Per-connection streaming stats for open voice sessions"""
+    sessions = [bridge.stats() for bridge in list(active_bridges)]
+    return {"sessions": sessions, "total": len(sessions)}
 
 
 @app.get("/agents")
 async def list_agents():
     """List all available agents"""
     agents = []
-    for agent_id, config in AGENT_CONFIGS.items():
+    snapshot = agent_registry.snapshot
+    for agent_id, config in snapshot.configs.items():
         agents.append({
             "id": agent_id,
             "name": agent_id.capitalize(),
             "voice_enabled": True,
-            "tools_count": len(config.tools)
+            "tools_count": len(config.tools),
+            "version": config.version
         })
-    return {"agents": agents, "total": len(agents)}
+    return {"agents": agents, "total": len(agents), "registry_version": snapshot.version}
 
 
 @app.get("/agents/{agent_id}")
@@ -118,10 +248,45 @@ async def get_agent(agent_id: str):
         "name": agent_id.capitalize(),
         "instruction_preview": config.instruction[:200] + "...",
         "tools": [t.get("name", "unknown") for t in config.tools],
-        "voice_name": config.voice_name
+        "voice_name": config.voice_name,
+        "version": config.version
     }
 
 
+# Shown to users when the upstream admission queue rejects a request
+BUSY_MESSAGE = "الخدمة مشغولة حالياً، حاول بعد قليل."
+
+
+# Identical chat requests in flight share one Gemini call
+chat_flights = SingleFlight("chat")
+
+
+async def _generate_reply(config, text: str) -> str:
+    """One generate_content call for a chat message (cached on success)"""
+    chat_config = await instruction_cache.chat_config(config.agent_id, config.instruction, CHAT_MODEL_ID)
+    
+    async def attempt():
+        # Every attempt (retry or hedge) takes its own upstream slot
+        async with chat_admission.slot(config.agent_id):
+            async with gemini_clients.session(CHAT_API_VERSION) as client:
+                return await client.aio.models.generate_content(
+                    model=CHAT_MODEL_ID,
+                    contents=text,
+                    config=chat_config
+                )
+    
+    # Classified retries with jittered backoff, optional hedging (CHAT_RETRY_* / CHAT_HEDGE_*)
+    response = await chat_resilience.call(attempt)
+    
+    instruction_cache.record_usage(config.agent_id, chat_config, response.usage_metadata)
+    chat_cache.put(config.agent_id, config.instruction, text, response.text)
+    return response.text
+
+
+# Per-agent micro-batches with a global in-flight limit (CHAT_BATCH_WINDOW_MS)
+chat_batcher = ChatBatcher(_generate_reply)
+
+
 @app.post("/agents/{agent_id}/chat")
 async def chat_with_agent(agent_id: str, message: dict):
     """Send a text message to an agent (non-streaming)"""
@@ -131,31 +296,154 @@ async def chat_with_agent(agent_id: str, message: dict):
     
     # For text chat, we'll use the standard Gemini API
     # This is a simplified implementation
+    started = time.perf_counter()
+    text = message.get("text", "")
     try:
-        from google import genai
-        
-        client = genai.Client()
-        response = await client.aio.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=message.get("text", ""),
-            config={
-                "system_instruction": config.instruction
+        cached = chat_cache.get(config.agent_id, config.instruction, text)
+        if cached:
+            CHAT_REQUESTS.labels(config.agent_id, "success").inc()
+            return {
+                "agent": agent_id,
+                "response": cached[0],
+                "status": "success",
+                "cached": cached[1]
             }
-        )
         
+        flight_key = (config.agent_id, instruction_hash(config.instruction), normalize_arabic(text))
+        reply = await chat_flights.do(flight_key, lambda: chat_batcher.submit(config, text))
+        CHAT_REQUESTS.labels(config.agent_id, "success").inc()
         return {
             "agent": agent_id,
-            "response": response.text,
+            "response": reply,
             "status": "success"
         }
+    except AdmissionRejected as e:
+        CHAT_REQUESTS.labels(config.agent_id, "rejected").inc()
+        return JSONResponse(status_code=503, headers={"Retry-After": "1"}, content={
+            "agent": agent_id,
+            "response": BUSY_MESSAGE,
+            "status": "busy",
+            "error": e.reason
+        })
     except Exception as e:
         logger.error(f"Chat error: {e}")
+        CHAT_REQUESTS.labels(config.agent_id, "error").inc()
         return {
             "agent": agent_id,
             "response": "عذراً، حدث خطأ. حاول مرة أخرى.",
             "status": "error",
             "error": str(e)
         }
+    finally:
+        CHAT_LATENCY.labels(config.agent_id).observe(time.perf_counter() - started)
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _usage_dict(usage) -> dict:
+    """Token counts from a genai usage_metadata object"""
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None),
+        "cached_tokens": getattr(usage, "cached_content_token_count", None),
+        "response_tokens": getattr(usage, "candidates_token_count", None),
+        "total_tokens": getattr(usage, "total_token_count", None)
+    }
+
+
+@app.post("/agents/{agent_id}/chat/stream")
+async def chat_with_agent_stream(agent_id: str, message: dict):
+    """
+    Send a text message to an agent and stream the reply (Server-Sent Events)
+    
+    Events:
+    - token: {"text": "..."} - Next piece of the reply
+    - done: {"usage": {...}, "latency": {"time_to_first_token_ms", "total_ms"}}
+    - error: {"response": "...", "error": "..."} - Generation failed
+    """
+    config = get_agent_config(agent_id)
+    if not config:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    text = message.get("text", "")
+    
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_at = None
+        usage = None
+        cached = None
+        try:
+            cached = chat_cache.get(config.agent_id, config.instruction, text)
+            if cached:
+                first_token_at = time.perf_counter()
+                yield _sse("token", {"text": cached[0]})
+            else:
+                reply = []
+                chat_config = await instruction_cache.chat_config(
+                    config.agent_id, config.instruction, CHAT_MODEL_ID
+                )
+                async with chat_admission.slot(config.agent_id), \
+                        gemini_clients.session(CHAT_API_VERSION) as client:
+                    stream = await client.aio.models.generate_content_stream(
+                        model=CHAT_MODEL_ID,
+                        contents=text,
+                        config=chat_config
+                    )
+                    async for chunk in stream:
+                        if chunk.usage_metadata:
+                            usage = chunk.usage_metadata
+                        if not chunk.text:
+                            continue
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            CHAT_TIME_TO_FIRST_TOKEN.labels(config.agent_id).observe(first_token_at - started)
+                        reply.append(chunk.text)
+                        yield _sse("token", {"text": chunk.text})
+                instruction_cache.record_usage(config.agent_id, chat_config, usage)
+                chat_cache.put(config.agent_id, config.instruction, text, "".join(reply))
+            
+            total = time.perf_counter() - started
+            CHAT_REQUESTS.labels(config.agent_id, "success").inc()
+            CHAT_LATENCY.labels(config.agent_id).observe(total)
+            yield _sse("done", {
+                "agent": agent_id,
+                "status": "success",
+                "cached": cached[1] if cached else None,
+                "usage": _usage_dict(usage),
+                "latency": {
+                    "time_to_first_token_ms": (
+                        round((first_token_at - started) * 1000, 1) if first_token_at else None
+                    ),
+                    "total_ms": round(total * 1000, 1)
+                }
+            })
+        except AdmissionRejected as e:
+            CHAT_REQUESTS.labels(config.agent_id, "rejected").inc()
+            yield _sse("error", {
+                "agent": agent_id,
+                "response": BUSY_MESSAGE,
+                "status": "busy",
+                "error": e.reason
+            })
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            CHAT_REQUESTS.labels(config.agent_id, "error").inc()
+            yield _sse("error", {
+                "agent": agent_id,
+                "response": "عذراً، حدث خطأ. حاول مرة أخرى.",
+                "status": "error",
+                "error": str(e)
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -167,22 +455,40 @@ async def voice_endpoint(websocket: WebSocket, agent_id: str):
     """
     WebSocket endpoint for bidirectional voice streaming
     
+    Reconnect with the session token from the "connected" event within the
+    grace period to reattach to a dropped session: `X-Resume-Token` header,
+    or `?resume=<session_token>` for browsers (redacted from access logs).
+    
     Protocol:
-    - Client sends: audio chunks (binary PCM 16kHz) or JSON commands
-    - Server sends: audio response (binary) or JSON text/events
+    - Client sends: audio chunks (binary PCM16, 16kHz unless negotiated) or JSON commands
+    - Server sends: audio response (binary PCM16, 24kHz unless negotiated) or JSON text/events
     
     JSON Commands from Client:
+    - {"type": "audio_format", "input_rate": 48000, "output_rate": 48000} - Negotiate rates
     - {"type": "text_input", "content": "..."} - Send text instead of voice
     - {"type": "end_turn"} - Signal end of user turn
     - {"type": "stop"} - End session
     
     JSON Events from Server:
-    - {"type": "connected", "agent": "..."} - Connection established
+    - {"type": "connected", "agent": "...", "session_token": "..."} - Connection established
+    - {"type": "connected", "resumed": true, "replayed": 12, "missed": 0, ...} - Reattached;
+      buffered output follows
+    - {"type": "audio_format", ...} - Negotiated audio format
     - {"type": "text", "content": "..."} - Text response
     - {"type": "turn_complete"} - Agent finished speaking
     - {"type": "error", "content": "..."} - Error occurred
+    - {"type": "error", "error": "upstream_unavailable", "retry_after": 8.5, ...} - Upstream
+      circuit open; reconnect after retry_after seconds
     """
-    bridge = VoiceBridge(websocket, agent_id)
+    token = websocket.headers.get("x-resume-token") or websocket.query_params.get("resume")
+    if token:
+        detached = voice_sessions.resume(token, agent_id, websocket)
+        if detached is not None:
+            # The parked bridge serves this socket until it is done with it
+            await detached
+            return
+    
+    bridge = VoiceBridge(websocket, agent_id, resume_requested=bool(token))
     await bridge.start()
 
 
@@ -0,0 +1,291 @@
+"""
+Axiom RESET - Metrics
+Counters, gauges and histograms for the voice and chat hot paths,
+rendered in the Prometheus text exposition format on GET /metrics
+
+Recording is lock-free: every labelled series is a small object whose
+fields are plain Python numbers, updated from the event loop thread
+(the only thread that runs bridge and endpoint code). Hot paths resolve
+their series once with `.labels(...)` and then only do `+=` / a bisect
+per sample; formatting happens at scrape time.
+
+Example:
+    ```python
+    sent = VOICE_BYTES.labels("sofra", "out")
+    sent.inc(len(chunk))
+
+    with CHAT_LATENCY.labels("sofra").time():
+        ...
+    ```
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds (1 ms .. 30 s)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SERIES (one per label combination)
+# ═══════════════════════════════════════════════════════════════════
+
+class _CounterSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class _GaugeSeries:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Timer:
+    __slots__ = ("_series", "_started")
+
+    def __init__(self, series: "_HistogramSeries"):
+        self._series = series
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._started)
+        return False
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        """Context manager that observes the elapsed seconds"""
+        return _Timer(self)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════════════════════
+
+class Metric:
+    """A named metric family with a fixed set of label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Get (or create) the series for one label combination"""
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            series = self._series[key] = self._new_series()
+        return series
+
+    def _render_series(self, key: Tuple[str, ...], series) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(series.value)}"]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in list(self._series.items()):
+            lines.extend(self._render_series(key, series))
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled series"""
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled series"""
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe into the unlabelled series"""
+        self.labels().observe(value)
+
+    def _render_series(self, key: Tuple[str, ...], series: _HistogramSeries) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+        lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric family and renders the /metrics payload"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+registry = MetricsRegistry()
+
+# Prometheus text format content type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PLATFORM METRICS
+# ═══════════════════════════════════════════════════════════════════
+
+VOICE_ACTIVE_SESSIONS = registry.gauge(
+    "axiom_voice_active_sessions", "Open voice bridge sessions", ("agent",)
+)
+VOICE_SESSIONS = registry.counter(
+    "axiom_voice_sessions_total", "Voice sessions connected to Gemini Live", ("agent", "mode")
+)
+VOICE_CONNECT_ERRORS = registry.counter(
+    "axiom_voice_connect_errors_total", "Voice sessions that failed to connect upstream", ("agent",)
+)
+VOICE_BYTES = registry.counter(
+    "axiom_voice_bytes_total",
+    "Client WebSocket audio bytes (in = from client, out = to client)",
+    ("agent", "direction")
+)
+VOICE_SEND_LATENCY = registry.histogram(
+    "axiom_voice_send_seconds", "Duration of session.send() to Gemini Live", ("agent",)
+)
+VOICE_TIME_TO_CONNECTED = registry.histogram(
+    "axiom_voice_time_to_connected_seconds", "WebSocket accept to connected event", ("agent", "mode")
+)
+VOICE_TIME_TO_FIRST_AUDIO = registry.histogram(
+    "axiom_voice_time_to_first_audio_seconds", "WebSocket accept to first audio byte", ("agent", "mode")
+)
+TOOL_DURATION = registry.histogram(
+    "axiom_tool_duration_seconds", "Agent tool execution time", ("agent", "tool", "status")
+)
+CHAT_REQUESTS = registry.counter(
+    "axiom_chat_requests_total", "Text chat requests", ("agent", "status")
+)
+CHAT_LATENCY = registry.histogram(
+    "axiom_chat_latency_seconds", "Text chat request latency", ("agent",)
+)
+CHAT_TIME_TO_FIRST_TOKEN = registry.histogram(
+    "axiom_chat_time_to_first_token_seconds", "Streaming chat request to first token", ("agent",)
+)
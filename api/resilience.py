@@ -0,0 +1,519 @@
+"""
+Axiom RESET - Upstream Resilience
+Classified retries with jittered backoff, hedged requests and a retry
+budget for Gemini calls
+
+Errors are classified before anything is retried:
+    retryable   408 / 429 / 500 / 502 / 503 / 504, Live close codes
+                1011 / 1013, timeouts and dropped connections (including
+                httpx connect/read/pool timeouts and network errors)
+    fatal       everything else: bad requests, auth failures (401 / 403,
+                Live close code 1007 "API key not valid"), permanent
+                5xx (501 Not Implemented, 505, ...), admission rejections
+
+Retries back off exponentially with full jitter
+(sleep = uniform(0, min(max_delay, base_delay * 2^attempt))) so clients
+that failed together do not retry together.
+
+Hedging (opt-in) starts a second copy of a call that is still running
+after the recent p95 latency and returns whichever answers first; the
+loser is cancelled. Hedges only cut the tail caused by a slow upstream
+replica, so they are sized off observed latency rather than a fixed
+timeout.
+
+Every retry and hedge spends a token from a RetryBudget that original
+calls refill (`ratio` tokens per call, plus a small per-second floor),
+so during an outage extra traffic is capped at roughly `ratio` of normal
+traffic instead of multiplying it.
+
+Live connects sit behind a CircuitBreaker per (model, API version):
+after a run of consecutive connect failures it opens and new voice
+sessions are refused at once (with a retry-after hint) instead of each
+spending a socket and an upstream handshake to learn the same thing.
+After the open period one probe connect is let through (half-open); its
+outcome closes the circuit or reopens it for twice as long.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+from api.admission import AdmissionRejected
+from api.metrics import registry
+
+logger = logging.getLogger("AxiomResilience")
+
+T = TypeVar("T")
+
+CHAT_RETRY_MAX_ATTEMPTS = int(os.getenv("CHAT_RETRY_MAX_ATTEMPTS", 3))
+CHAT_RETRY_BASE_DELAY = float(os.getenv("CHAT_RETRY_BASE_DELAY", 0.2))
+CHAT_RETRY_MAX_DELAY = float(os.getenv("CHAT_RETRY_MAX_DELAY", 2.0))
+CHAT_RETRY_BUDGET_RATIO = float(os.getenv("CHAT_RETRY_BUDGET_RATIO", 0.1))
+CHAT_RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("CHAT_RETRY_BUDGET_MIN_PER_SECOND", 1))
+CHAT_HEDGE_ENABLED = os.getenv("CHAT_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+CHAT_HEDGE_QUANTILE = float(os.getenv("CHAT_HEDGE_QUANTILE", 0.95))
+CHAT_HEDGE_MIN_DELAY = float(os.getenv("CHAT_HEDGE_MIN_DELAY", 0.05))
+
+UPSTREAM_ATTEMPTS = registry.counter(
+    "axiom_upstream_attempts_total",
+    "Upstream calls by kind (first, retry, hedge) and outcome",
+    ("caller", "kind", "outcome")
+)
+UPSTREAM_RETRY_BUDGET_EXHAUSTED = registry.counter(
+    "axiom_upstream_retry_budget_exhausted_total",
+    "Retries or hedges skipped because the retry budget was empty",
+    ("caller", "kind")
+)
+
+VOICE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("VOICE_CIRCUIT_FAILURE_THRESHOLD", 5))
+VOICE_CIRCUIT_OPEN_SECONDS = float(os.getenv("VOICE_CIRCUIT_OPEN_SECONDS", 10))
+VOICE_CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("VOICE_CIRCUIT_MAX_OPEN_SECONDS", 120))
+VOICE_CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("VOICE_CIRCUIT_HALF_OPEN_PROBES", 1))
+
+CIRCUIT_STATE = registry.gauge(
+    "axiom_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("breaker",)
+)
+CIRCUIT_TRANSITIONS = registry.counter(
+    "axiom_circuit_transitions_total", "Circuit breaker state changes", ("breaker", "state")
+)
+CIRCUIT_REJECTED = registry.counter(
+    "axiom_circuit_rejected_total", "Calls refused while a circuit was open", ("breaker",)
+)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ERROR CLASSIFICATION
+# ═══════════════════════════════════════════════════════════════════
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_CLOSE_CODES = frozenset({1001, 1006, 1011, 1012, 1013, 1014})
+# Transport failures of the shared httpx pool (the genai client does no retries of its own):
+# connect/read/write/pool timeouts, refused or reset connections, servers dropping mid-response.
+# Not TransportError as a whole: UnsupportedProtocol / ProxyError / LocalProtocolError are bugs.
+RETRYABLE_TRANSPORT_ERRORS = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+
+# "503 UNAVAILABLE ..." (genai APIError) or "received 1007 (...)" (Live websocket)
+_STATUS_IN_MESSAGE = re.compile(r"^\s*(\d{3})\b|received (\d{4})\b")
+
+
+def error_code(exc: BaseException) -> Optional[int]:
+    """HTTP status or websocket close code carried by an upstream error"""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    match = _STATUS_IN_MESSAGE.search(str(exc))
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for transient upstream failures worth another attempt"""
+    if isinstance(exc, AdmissionRejected):
+        return False
+    if isinstance(exc, RETRYABLE_TRANSPORT_ERRORS):
+        return True
+    code = error_code(exc)
+    if code is None:
+        return False
+    if code >= 1000:
+        return code in RETRYABLE_CLOSE_CODES
+    return code in RETRYABLE_STATUS
+
+
+# ═══════════════════════════════════════════════════════════════════
+# RETRY BUDGET / LATENCY TRACKING
+# ═══════════════════════════════════════════════════════════════════
+
+class RetryBudget:
+    """
+    Token bucket shared by retries and hedges
+
+    Each original call deposits `ratio` tokens; each retry or hedge
+    withdraws one. A floor of `min_per_second` tokens keeps low-traffic
+    callers able to retry at all.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, max_tokens: Optional[float] = None):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens if max_tokens is not None else max(10.0, min_per_second * 10)
+        self.tokens = self.max_tokens
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LatencyTracker:
+    """Recent successful call latencies; quantiles recomputed every few samples"""
+
+    def __init__(self, window: int = 500, min_samples: int = 20, recompute_every: int = 10):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.recompute_every = recompute_every
+        self._since_recompute = 0
+        self._cached: Dict[float, float] = {}
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_recompute += 1
+        if self._since_recompute >= self.recompute_every:
+            self._cached.clear()
+            self._since_recompute = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency at quantile q, or None until enough samples exist"""
+        if len(self._samples) < self.min_samples:
+            return None
+        value = self._cached.get(q)
+        if value is None:
+            ordered = sorted(self._samples)
+            value = self._cached[q] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return value
+
+
+# ═══════════════════════════════════════════════════════════════════
+# RESILIENT CALLER
+# ═══════════════════════════════════════════════════════════════════
+
+class ResilientCaller:
+    """
+    Example:
+        ```python
+        chat_resilience = ResilientCaller.from_env("chat", "CHAT")
+        response = await chat_resilience.call(lambda: client.aio.models.generate_content(...))
+        ```
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        budget: RetryBudget,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.05
+    ):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "ResilientCaller":
+        """Settings from <PREFIX>_RETRY_* and <PREFIX>_HEDGE_* variables"""
+        return cls(
+            name,
+            max_attempts=int(os.getenv(f"{prefix}_RETRY_MAX_ATTEMPTS", CHAT_RETRY_MAX_ATTEMPTS)),
+            base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", CHAT_RETRY_BASE_DELAY)),
+            max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", CHAT_RETRY_MAX_DELAY)),
+            budget=RetryBudget(
+                ratio=float(os.getenv(f"{prefix}_RETRY_BUDGET_RATIO", CHAT_RETRY_BUDGET_RATIO)),
+                min_per_second=float(
+                    os.getenv(f"{prefix}_RETRY_BUDGET_MIN_PER_SECOND", CHAT_RETRY_BUDGET_MIN_PER_SECOND)
+                )
+            ),
+            hedge=os.getenv(f"{prefix}_HEDGE_ENABLED", str(CHAT_HEDGE_ENABLED)).lower() in ("1", "true", "yes"),
+            hedge_quantile=float(os.getenv(f"{prefix}_HEDGE_QUANTILE", CHAT_HEDGE_QUANTILE)),
+            hedge_min_delay=float(os.getenv(f"{prefix}_HEDGE_MIN_DELAY", CHAT_HEDGE_MIN_DELAY))
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` with classified retries (and hedging when enabled)"""
+        self.calls += 1
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            kind = "first" if attempt == 0 else "retry"
+            try:
+                return await self._attempt(fn, kind)
+            except Exception as e:
+                attempt += 1
+                if not is_retryable(e) or attempt >= self.max_attempts:
+                    self.failures += 1
+                    raise
+                if not self.budget.withdraw():
+                    self.budget_exhausted += 1
+                    UPSTREAM_RETRY_BUDGET_EXHAUSTED.labels(self.name, "retry").inc()
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.warning(f"🔁 {self.name}: retry {attempt} in {delay * 1000:.0f}ms after {e}")
+                await asyncio.sleep(delay)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        quantile = self.latency.quantile(self.hedge_quantile)
+        if quantile is None:
+            return None
+        return max(quantile, self.hedge_min_delay)
+
+    async def _timed(self, fn: Callable[[], Awaitable[T]], kind: str) -> T:
+        started = time.perf_counter()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            UPSTREAM_ATTEMPTS.labels(self.name, kind, "cancelled").inc()
+            raise
+        except Exception:
+            UPSTREAM_ATTEMPTS.labels(self.name, kind, "error").inc()
+            raise
+        self.latency.observe(time.perf_counter() - started)
+        UPSTREAM_ATTEMPTS.labels(self.name, kind, "success").inc()
+        return result
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], kind: str) -> T:
+        hedge_after = self._hedge_delay()
+        if hedge_after is None:
+            return await self._timed(fn, kind)
+
+        primary = asyncio.create_task(self._timed(fn, kind))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                if self.budget.withdraw():
+                    self.hedges += 1
+                    tasks.add(asyncio.create_task(self._timed(fn, "hedge")))
+                else:
+                    self.budget_exhausted += 1
+                    UPSTREAM_RETRY_BUDGET_EXHAUSTED.labels(self.name, "hedge").inc()
+
+            # First success wins; an error only counts once every copy has failed
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        p50 = self.latency.quantile(0.5)
+        p95 = self.latency.quantile(self.hedge_quantile)
+        return {
+            "max_attempts": self.max_attempts,
+            "hedge": self.hedge,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "failures": self.failures,
+            "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "hedge_after_ms": round(max(p95, self.hedge_min_delay) * 1000, 1) if p95 is not None else None
+        }
+
+
+# Singleton for the text chat path (CHAT_RETRY_* / CHAT_HEDGE_*)
+chat_resilience = ResilientCaller.from_env("chat", "CHAT")
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════════════════
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while a circuit is open"""
+
+    def __init__(self, breaker: str, retry_after: float):
+        self.breaker = breaker
+        self.retry_after = retry_after
+        super().__init__(f"{breaker} circuit open, retry in {retry_after:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Example:
+        ```python
+        breaker = live_breakers.get(LIVE_MODEL_ID, LIVE_API_VERSION)
+        async with breaker.guard():
+            session = await stack.enter_async_context(client.aio.live.connect(...))
+        ```
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = VOICE_CIRCUIT_FAILURE_THRESHOLD,
+        open_seconds: float = VOICE_CIRCUIT_OPEN_SECONDS,
+        max_open_seconds: float = VOICE_CIRCUIT_MAX_OPEN_SECONDS,
+        half_open_probes: int = VOICE_CIRCUIT_HALF_OPEN_PROBES
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._open_for = open_seconds
+        self._opened_until = 0.0
+        self._probes = 0
+        self._gauge = CIRCUIT_STATE.labels(name)
+        self._rejected = CIRCUIT_REJECTED.labels(name)
+        self.rejected = 0
+        self.opened = 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        self._gauge.set(self._STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+        logger.warning(f"⚡ {self.name} circuit {state}")
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 when closed)"""
+        if self.state == self.OPEN:
+            return max(0.0, self._opened_until - time.monotonic())
+        if self.state == self.HALF_OPEN and self._probes >= self.half_open_probes:
+            return 1.0
+        return 0.0
+
+    def check(self) -> None:
+        """Raise CircuitOpen if a call would be refused right now"""
+        if self.state == self.OPEN and time.monotonic() >= self._opened_until:
+            self._transition(self.HALF_OPEN)
+        wait = self.retry_after()
+        if wait > 0:
+            self.rejected += 1
+            self._rejected.inc()
+            raise CircuitOpen(self.name, wait)
+
+    def _acquire(self) -> bool:
+        """Admit one call; True when it is a half-open probe"""
+        self.check()
+        if self.state == self.HALF_OPEN:
+            self._probes += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._open_for = self.open_seconds
+        self._transition(self.CLOSED)
+
+    def record_failure(self, exc: BaseException) -> None:
+        self.consecutive_failures += 1
+        self.last_error = str(exc)[:200]
+        if self.state == self.HALF_OPEN:
+            # Probe failed: back off harder before the next one
+            self._open_for = min(self._open_for * 2, self.max_open_seconds)
+            self._open()
+        elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_until = time.monotonic() + self._open_for
+        self.opened += 1
+        self._transition(self.OPEN)
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run one upstream call under the breaker (raises CircuitOpen when open)"""
+        probe = self._acquire()
+        try:
+            yield
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        else:
+            self.record_success()
+        finally:
+            if probe:
+                self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": round(self.retry_after(), 1),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error
+        }
+
+
+class CircuitBreakers:
+    """One breaker per (model, API version), created on first use"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, model: str, api_version: str) -> CircuitBreaker:
+        key = (model, api_version)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(f"{self.prefix}:{model}@{api_version}")
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {breaker.name: breaker.stats() for breaker in self._breakers.values()}
+
+
+# Singleton breakers for Gemini Live connects (VOICE_CIRCUIT_*)
+live_breakers = CircuitBreakers("live")
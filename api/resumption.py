@@ -0,0 +1,200 @@
+"""
+Axiom RESET - Voice Session Resumption
+Keeps a Gemini Live session alive for a grace period after its client
+WebSocket drops, so a reconnecting client picks up the same conversation
+
+When a client disappears without a clean close (no "stop", close code
+other than 1000 / 1001), the bridge parks instead of tearing down: the Live
+session, its admission slot and the upstream tasks stay up, and model
+output that can no longer be delivered goes into a bounded ring buffer.
+The client received a session token in its "connected" event; reopening
+/ws/voice/{agent_id} with the token within the grace period reattaches
+the socket to the parked bridge, which replays the buffered audio/text
+and carries on. Tokens are single-use: every resume issues a fresh token
+in its "connected" event, which the client presents on its next reconnect.
+An unknown, spent or expired token gets a fresh session ("resumed": false).
+
+The token is a bearer credential for the conversation. Clients that can
+set headers send it as `X-Resume-Token`; browsers (which cannot) use
+`?resume=<token>`, which is redacted from the server's access logs
+(api/logging_config.py).
+
+The ring buffer is capped in bytes (oldest messages are evicted and
+counted as missed), which bounds the memory a parked session can pin:
+roughly the buffer cap plus the bridge's own state.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from api.metrics import registry
+
+logger = logging.getLogger("AxiomResume")
+
+VOICE_RESUME_GRACE_SECONDS = float(os.getenv("VOICE_RESUME_GRACE_SECONDS", 15))  # 0 = off
+VOICE_RESUME_BUFFER_KB = int(os.getenv("VOICE_RESUME_BUFFER_KB", 256))
+VOICE_RESUME_MAX_PARKED = int(os.getenv("VOICE_RESUME_MAX_PARKED", 200))
+
+VOICE_PARKED_SESSIONS = registry.gauge(
+    "axiom_voice_parked_sessions", "Live sessions kept alive waiting for their client to reconnect"
+)
+VOICE_PARKED_BYTES = registry.gauge(
+    "axiom_voice_parked_buffer_bytes", "Model output buffered for parked sessions"
+)
+VOICE_RESUMES = registry.counter(
+    "axiom_voice_resumes_total",
+    "Parked session outcomes (resumed, expired, upstream_closed) and unknown tokens",
+    ("agent", "outcome")
+)
+VOICE_RESUME_LATENCY = registry.histogram(
+    "axiom_voice_resume_seconds", "Reconnect with a token -> session reattached", ("agent",)
+)
+
+
+class OutputRingBuffer:
+    """Model output held for a parked session, capped in bytes (oldest evicted)"""
+
+    def __init__(self, max_bytes: int = VOICE_RESUME_BUFFER_KB * 1024):
+        self.max_bytes = max_bytes
+        self._items: Deque[Any] = deque()
+        self._sizes: Deque[int] = deque()
+        self.bytes = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _size(message: Any) -> int:
+        if isinstance(message, (bytes, bytearray)):
+            return len(message)
+        return len(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+    def append(self, message: Any) -> None:
+        size = self._size(message)
+        self._items.append(message)
+        self._sizes.append(size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._items:
+            self._items.popleft()
+            self.bytes -= self._sizes.popleft()
+            self.dropped += 1
+
+    def drain(self) -> List[Any]:
+        """Everything buffered, oldest first (buffer left empty)"""
+        items = list(self._items)
+        self._items.clear()
+        self._sizes.clear()
+        self.bytes = 0
+        return items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"messages": len(self._items), "bytes": self.bytes, "dropped": self.dropped}
+
+
+class SessionTable:
+    """
+    Parked voice bridges by session token
+
+    Example:
+        ```python
+        detached = voice_sessions.resume(token, agent_id, websocket)
+        if detached is not None:
+            await detached  # the parked bridge now serves this socket
+        ```
+    """
+
+    def __init__(
+        self,
+        grace: float = VOICE_RESUME_GRACE_SECONDS,
+        buffer_bytes: int = VOICE_RESUME_BUFFER_KB * 1024,
+        max_parked: int = VOICE_RESUME_MAX_PARKED
+    ):
+        self.grace = grace
+        self.buffer_bytes = buffer_bytes
+        self.max_parked = max_parked
+        self._parked: Dict[str, Any] = {}
+        self.parked_total = 0
+        self.outcomes: Dict[str, int] = {}
+        self._latencies: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def enabled(self) -> bool:
+        return self.grace > 0
+
+    def new_token(self) -> str:
+        return secrets.token_urlsafe(18)
+
+    def can_park(self) -> bool:
+        return self.enabled and len(self._parked) < self.max_parked
+
+    def park(self, bridge: Any) -> None:
+        self._parked[bridge.session_token] = bridge
+        self.parked_total += 1
+        self._update_gauges()
+
+    def unpark(self, bridge: Any) -> None:
+        if self._parked.get(bridge.session_token) is bridge:
+            del self._parked[bridge.session_token]
+        self._update_gauges()
+
+    def record(self, agent_id: str, outcome: str, latency: Optional[float] = None) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        VOICE_RESUMES.labels(agent_id, outcome).inc()
+        if latency is not None:
+            self._latencies.append(latency)
+            VOICE_RESUME_LATENCY.labels(agent_id).observe(latency)
+
+    def resume(self, token: str, agent_id: str, websocket: Any) -> Optional[asyncio.Future]:
+        """Hand a reconnecting socket to its parked bridge (None if the token is unknown)"""
+        bridge = self._parked.get(token)
+        if bridge is None or bridge.agent_id != agent_id.lower():  # bridge ids are lowercase
+            self.record(agent_id.lower(), "unknown_token")
+            return None
+        del self._parked[token]
+        self._update_gauges()
+        return bridge.hand_over(websocket)
+
+    def buffered_bytes(self) -> int:
+        return sum(bridge.resume_buffer.bytes for bridge in self._parked.values())
+
+    def _update_gauges(self) -> None:
+        VOICE_PARKED_SESSIONS.set(len(self._parked))
+        VOICE_PARKED_BYTES.set(self.buffered_bytes())
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+
+        def pick(q: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+        return {
+            "enabled": self.enabled,
+            "grace_seconds": self.grace,
+            "buffer_bytes_max": self.buffer_bytes,
+            "parked": len(self._parked),
+            "parked_total": self.parked_total,
+            "buffered_bytes": self.buffered_bytes(),
+            "outcomes": dict(self.outcomes),
+            "resume_latency_ms": {"p50": pick(0.5), "p95": pick(0.95)},
+            "sessions": [
+                {
+                    "agent": bridge.agent_id,
+                    "parked_for": round(time.monotonic() - bridge.parked_at, 1),
+                    **bridge.resume_buffer.stats()
+                }
+                for bridge in self._parked.values()
+            ]
+        }
+
+
+# Singleton session table (VOICE_RESUME_*)
+voice_sessions = SessionTable()
@@ -0,0 +1,369 @@
+"""
+Axiom RESET - Live Session Pool
+Pre-warmed Gemini Live sessions so callers skip the upstream handshake
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from api.clients import gemini_clients, LIVE_API_VERSION, LIVE_MODEL_ID
+from api.resilience import live_breakers
+
+logger = logging.getLogger("AxiomPool")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CONNECT TIMINGS (warm vs cold)
+# ═══════════════════════════════════════════════════════════════════
+
+class LatencySamples:
+    """Bounded window of latency samples with percentile summaries"""
+
+    def __init__(self, maxlen: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=maxlen)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 2)
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "max_ms": ms(max(self._samples) if self._samples else None)
+        }
+
+
+class ConnectTimings:
+    """Time-to-connected and time-to-first-audio per session mode"""
+
+    MODES = ("warm", "cold")
+
+    def __init__(self):
+        self.to_connected = {mode: LatencySamples() for mode in self.MODES}
+        self.to_first_audio = {mode: LatencySamples() for mode in self.MODES}
+
+    def record_connected(self, mode: str, seconds: float) -> None:
+        self.to_connected[mode].add(seconds)
+
+    def record_first_audio(self, mode: str, seconds: float) -> None:
+        self.to_first_audio[mode].add(seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            mode: {
+                "time_to_connected": self.to_connected[mode].summary(),
+                "time_to_first_audio": self.to_first_audio[mode].summary()
+            }
+            for mode in self.MODES
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# POOLED SESSIONS
+# ═══════════════════════════════════════════════════════════════════
+
+@dataclass
+class PooledSession:
+    """
+    A connected, configured Live session waiting for a caller
+
+    Liveness is tracked here rather than read from SDK internals: while
+    idle, a watcher task reads the session. An idle session has nothing
+    to say, so the read ending (upstream closed), failing, or yielding
+    anything (e.g. a go_away notice) marks the session closed. The
+    watcher is stopped with `detach()` before the session is handed out.
+    """
+    agent_id: str
+    session: Any
+    stack: AsyncExitStack
+    created_at: float = field(default_factory=time.monotonic)
+    closed: bool = False
+    _watcher: Optional[asyncio.Task] = None
+
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    def is_open(self) -> bool:
+        """Whether the upstream session is still usable"""
+        return not self.closed
+
+    def watch(self) -> None:
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch_upstream())
+
+    async def _watch_upstream(self) -> None:
+        try:
+            async for _ in self.session.receive():
+                logger.debug("Idle pooled session for %s received a message, retiring it", self.agent_id)
+                break
+        except Exception as e:
+            logger.debug("Idle pooled session for %s failed: %s", self.agent_id, e)
+        self.closed = True
+
+    async def detach(self) -> None:
+        """Stop watching so the caller owns the session's receive stream"""
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None and not watcher.done():
+            watcher.cancel()
+            try:
+                await watcher
+            except asyncio.CancelledError:
+                pass
+
+    async def aclose(self) -> None:
+        self.closed = True
+        await self.detach()
+        try:
+            await self.stack.aclose()
+        except Exception as e:
+            logger.debug("Pooled session close error for %s: %s", self.agent_id, e)
+
+
+class LiveSessionPool:
+    """
+    Pool of warm Live sessions for a single agent
+
+    A background maintainer keeps at least `min_size` idle sessions
+    (never more than `max_size` including in-flight connects), drops
+    sessions idle for longer than `idle_ttl` and sessions whose upstream
+    socket has closed. Sessions are single-use: a Live session carries
+    conversation state, so it is handed to one caller and never returned.
+    """
+
+    def __init__(
+        self,
+        agent_config,
+        min_size: int,
+        max_size: int,
+        idle_ttl: float,
+        health_interval: float
+    ):
+        self.agent_config = agent_config
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.idle_ttl = idle_ttl
+        self.health_interval = health_interval
+        self._idle: Deque[PooledSession] = deque()
+        self._connecting = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.failures = 0
+
+    @property
+    def agent_id(self) -> str:
+        return self.agent_config.agent_id
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+
+    def acquire(self) -> Optional[PooledSession]:
+        """Take a healthy warm session, or None if the pool is empty"""
+        while self._idle:
+            pooled = self._idle.popleft()
+            if pooled.age() < self.idle_ttl and pooled.is_open():
+                self.hits += 1
+                self._wakeup.set()
+                return pooled
+            self.expired += 1
+            asyncio.create_task(pooled.aclose())
+        self.misses += 1
+        self._wakeup.set()
+        return None
+
+    async def _connect(self) -> None:
+        stack = AsyncExitStack()
+        try:
+            client = await stack.enter_async_context(
+                gemini_clients.session(LIVE_API_VERSION)
+            )
+            async with live_breakers.get(LIVE_MODEL_ID, LIVE_API_VERSION).guard():
+                session = await stack.enter_async_context(
+                    client.aio.live.connect(
+                        model=LIVE_MODEL_ID,
+                        config=self.agent_config.to_live_config()
+                    )
+                )
+        except BaseException as e:
+            # Also on cancellation (pool closed or reconfigured mid-connect):
+            # close the half-open session and return the client refcount
+            await stack.aclose()
+            if not isinstance(e, Exception):
+                raise
+            self.failures += 1
+            logger.warning(f"⚠️ Warm session connect failed for {self.agent_id}: {e}")
+            return
+        finally:
+            self._connecting -= 1
+        pooled = PooledSession(self.agent_id, session, stack)
+        pooled.watch()
+        self._idle.append(pooled)
+
+    def _evict_unhealthy(self) -> None:
+        healthy: Deque[PooledSession] = deque()
+        for pooled in self._idle:
+            if pooled.age() < self.idle_ttl and pooled.is_open():
+                healthy.append(pooled)
+            else:
+                self.expired += 1
+                asyncio.create_task(pooled.aclose())
+        self._idle = healthy
+
+    async def _maintain(self) -> None:
+        backoff = 1.0
+        while True:
+            self._evict_unhealthy()
+            missing = min(
+                self.min_size - len(self._idle) - self._connecting,
+                self.max_size - len(self._idle) - self._connecting
+            )
+            if missing > 0:
+                failures_before = self.failures
+                self._connecting += missing
+                await asyncio.gather(*(self._connect() for _ in range(missing)))
+                if self.failures > failures_before:
+                    # Upstream is refusing connects: back off instead of spinning
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 60.0)
+                else:
+                    backoff = 1.0
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.health_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._idle:
+            await self._idle.popleft().aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "idle": len(self._idle),
+            "connecting": self._connecting,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "connect_failures": self.failures
+        }
+
+
+class LiveSessionPools:
+    """
+    Per-agent warm session pools for the Voice Bridge
+
+    Disabled unless VOICE_POOL_MIN_SIZE > 0. Pool sizes, idle expiry and
+    the health-check interval are read from the environment:
+
+        VOICE_POOL_MIN_SIZE          warm sessions kept per agent (default 0)
+        VOICE_POOL_MAX_SIZE          idle + connecting cap per agent (default 4)
+        VOICE_POOL_IDLE_TTL          seconds before a warm session expires (default 300)
+        VOICE_POOL_HEALTH_INTERVAL   seconds between health sweeps (default 15)
+    """
+
+    def __init__(self):
+        self.min_size = _env_int("VOICE_POOL_MIN_SIZE", 0)
+        self.max_size = _env_int("VOICE_POOL_MAX_SIZE", 4)
+        self.idle_ttl = _env_float("VOICE_POOL_IDLE_TTL", 300.0)
+        self.health_interval = _env_float("VOICE_POOL_HEALTH_INTERVAL", 15.0)
+        self._pools: Dict[str, LiveSessionPool] = {}
+        self.timings = ConnectTimings()
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_size > 0
+
+    def start(self, agent_configs: Iterable) -> None:
+        """Create a pool per agent and start background refills"""
+        if not self.enabled:
+            return
+        for config in agent_configs:
+            if config.agent_id in self._pools:
+                continue
+            pool = LiveSessionPool(
+                config,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                idle_ttl=self.idle_ttl,
+                health_interval=self.health_interval
+            )
+            self._pools[config.agent_id] = pool
+            pool.start()
+        logger.info(
+            f"🔥 Live session pools warming: {list(self._pools)} "
+            f"(min={self.min_size}, max={self.max_size})"
+        )
+
+    async def reconfigure(self, agent_configs: Iterable) -> None:
+        """
+        Follow an agent registry swap: pools warmed with a replaced or
+        removed config are closed (their idle sessions carry the old
+        instruction/tools) and pools for the current configs started
+        """
+        if not self.enabled:
+            return
+        configs = {config.agent_id: config for config in agent_configs}
+        stale = [
+            self._pools.pop(agent_id)
+            for agent_id, pool in list(self._pools.items())
+            if configs.get(agent_id) is not pool.agent_config
+        ]
+        self.start(configs.values())
+        await asyncio.gather(*(pool.aclose() for pool in stale))
+
+    def acquire(self, agent_id: str) -> Optional[PooledSession]:
+        pool = self._pools.get(agent_id)
+        return pool.acquire() if pool else None
+
+    async def aclose(self) -> None:
+        pools: List[LiveSessionPool] = list(self._pools.values())
+        self._pools.clear()
+        await asyncio.gather(*(pool.aclose() for pool in pools))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pools": {agent_id: pool.stats() for agent_id, pool in self._pools.items()},
+            "timings": self.timings.summary()
+        }
+
+
+# Singleton pool manager (started/stopped by the FastAPI lifespan)
+live_pools = LiveSessionPools()
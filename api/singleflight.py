@@ -0,0 +1,96 @@
+"""
+Axiom RESET - Single-flight Request Coalescing
+Concurrent identical requests share one upstream call
+
+The first caller for a key (the leader) starts the upstream call as its
+own task; callers arriving while it is in flight (followers) await the
+same task. Every caller waits through `asyncio.shield`, so a caller that
+goes away (client disconnect cancels its request) only withdraws itself:
+the upstream call keeps running for the others and is cancelled only
+when no caller is left waiting. A cancelled or finished call is
+unregistered at once, so a caller arriving after that starts a fresh
+call instead of joining one that is going away.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from api.metrics import registry
+
+SINGLEFLIGHT_CALLS = registry.counter(
+    "axiom_singleflight_calls_total",
+    "Coalesced calls by role (leader = upstream call, follower = shared result)",
+    ("group", "role")
+)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Example:
+        ```python
+        reply = await chat_flights.do(key, lambda: generate(config, text))
+        ```
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn()` once per key at a time; concurrent callers share its result"""
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            flight = _Flight(asyncio.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.leaders += 1
+            SINGLEFLIGHT_CALLS.labels(self.group, "leader").inc()
+        else:
+            self.followers += 1
+            SINGLEFLIGHT_CALLS.labels(self.group, "follower").inc()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                # Last interested caller left: stop the upstream call
+                flight.task.cancel()
+                self._forget(key, flight)
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a call for `key` is in flight (a new caller would follow it)"""
+        return key in self._flights
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.followers
+        return {
+            "in_flight": self.in_flight,
+            "upstream_calls": self.leaders,
+            "coalesced": self.followers,
+            "collapsed_ratio": round(self.followers / total, 3) if total else 0,
+            "abandoned": self.abandoned
+        }
@@ -0,0 +1,158 @@
+"""
+Axiom RESET - Tool Result Cache
+Reuses the results of idempotent ADK tools (restaurant search, menus,
+place details) across calls and sessions
+
+Opt-in per tool with `ADKTool(cache=ToolCachePolicy(ttl, key_fields,
+max_entries))`; tools marked `mutating=True` (orders, reservations) can
+never carry a policy. Each cached tool gets its own TTL + LRU table.
+
+Keys are a hash of the canonicalized arguments: only the policy's key
+fields, None values dropped, dict keys sorted, strings stripped and
+floats rounded (integral floats become ints), so `{"a": 1, "b": 2.0}`
+and `{"b": 2.0000000001, "a": 1.0}` share an entry. Concurrent misses
+for the same key share one handler call (SingleFlight), so an expired
+popular entry is recomputed once, not once per session. Only successful
+results (no "error" key) are stored.
+
+    VOICE_TOOL_CACHE_ENABLED=true     off = every call runs its handler
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from agents.core.base_agent import ToolCachePolicy
+from api.metrics import registry
+from api.singleflight import SingleFlight
+
+VOICE_TOOL_CACHE_ENABLED = os.getenv("VOICE_TOOL_CACHE_ENABLED", "true").lower() == "true"
+
+# Decimal places kept when hashing float arguments (~0.1 m for coordinates)
+FLOAT_PRECISION = 6
+
+TOOL_CACHE_LOOKUPS = registry.counter(
+    "axiom_tool_cache_lookups_total",
+    "Tool result cache lookups (hit, miss, coalesced = waited on an in-flight miss)",
+    ("agent", "tool", "result")
+)
+TOOL_CACHE_ENTRIES = registry.gauge(
+    "axiom_tool_cache_entries", "Cached tool results", ("agent", "tool")
+)
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        value = round(value, FLOAT_PRECISION)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, Mapping):
+        return {str(k): _canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def canonical_key(args: Mapping[str, Any], key_fields: Optional[Tuple[str, ...]] = None) -> str:
+    """Stable hash of the arguments that identify a tool result"""
+    if key_fields is not None:
+        args = {name: args.get(name) for name in key_fields}
+    payload = json.dumps(
+        _canonical(args), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ToolResultCache:
+    """
+    Example:
+        ```python
+        cache = ToolResultCache("sofra", "get_menu", get_menu_tool.cache)
+        result = await cache.get_or_run(args, lambda: invoke(handler, **args))
+        ```
+    """
+
+    def __init__(self, agent_id: str, tool: str, policy: ToolCachePolicy):
+        self.agent_id = agent_id
+        self.tool = tool
+        self.policy = policy
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._flights = SingleFlight(f"tool:{tool}")
+        self._lookups = {
+            result: TOOL_CACHE_LOOKUPS.labels(agent_id, tool, result)
+            for result in ("hit", "miss", "coalesced")
+        }
+        self._entries_gauge = TOOL_CACHE_ENTRIES.labels(agent_id, tool)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, result
+
+    def _put(self, key: str, result: Any) -> None:
+        if isinstance(result, dict) and "error" in result:
+            return
+        self._entries[key] = (time.monotonic() + self.policy.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries_gauge.set(len(self._entries))
+
+    async def get_or_run(self, args: Mapping[str, Any], run: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached result for these arguments, or run the handler once and store it"""
+        key = canonical_key(args, self.policy.key_fields)
+        found, result = self._get(key)
+        if found:
+            self.hits += 1
+            self._lookups["hit"].inc()
+            return result
+
+        async def fill() -> Any:
+            value = await run()
+            self._put(key, value)
+            return value
+
+        if key in self._flights:
+            self.coalesced += 1
+            self._lookups["coalesced"].inc()
+        else:
+            self.misses += 1
+            self._lookups["miss"].inc()
+        return await self._flights.do(key, fill)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._entries_gauge.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "ttl": self.policy.ttl,
+            "entries": len(self._entries),
+            "max_entries": self.policy.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
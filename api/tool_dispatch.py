@@ -0,0 +1,325 @@
+"""
+Axiom RESET - Tool Dispatch
+Routes Gemini Live function calls to the ADK tool handlers of each agent
+
+Built from the agents in the ADK AgentRegistry (agents/*/agent.py,
+loaded through each definition's `adk_module`, see api/agent_registry.py):
+for every agent with a matching AgentConfig the table holds
+
+    - the Gemini function declarations (AxiomBaseAgent.get_tool_declarations()),
+      which the agent registry publishes as AgentConfig.tools (in a new
+      config, never by editing a published one) for the Live connect config
+    - a route per tool: name -> (handler, argument validator), the
+      validator compiled ahead of time from the tool's JSON `parameters`
+
+so a function call costs one dict lookup and one validator call. Routes
+cover every tool with a handler; only tools whose Google Cloud service is
+configured are declared to the model (see ADKTool.is_available). Bad
+arguments are answered with an `{"error": ...}` the model can correct,
+without reaching the handler. Tools with a cache policy go through
+their ToolResultCache (api/tool_cache.py); the table keeps those by
+(agent, tool, policy), so a rebuilt dispatcher keeps the cached results
+and counters of every tool whose policy did not change.
+
+The validators cover the JSON Schema subset used by ADK tool
+declarations: type, properties, required, enum and array items. An
+object with declared properties rejects any other field (unless it sets
+`additionalProperties`), so a handler is never called with an argument
+it does not take; the error names the unexpected and allowed fields. Numbers
+in Live function call args arrive as floats (protobuf Struct), so
+integral floats are accepted for "integer" and passed on as int.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from agents.core.base_agent import ADKTool, AgentRegistry, AxiomBaseAgent, ToolCachePolicy, ToolSnapshot
+from api.tool_cache import VOICE_TOOL_CACHE_ENABLED, ToolResultCache
+from api.tool_executor import invoke
+
+logger = logging.getLogger("AxiomTools")
+
+
+class ToolArgumentError(ValueError):
+    """Function call arguments do not match the tool's parameters schema"""
+
+    def __init__(self, message: str, **details: Any):
+        super().__init__(message)
+        self.details = details  # extra fields for the model's error response
+
+
+Validator = Callable[[Any, str], Any]
+CacheKey = Tuple[str, str, ToolCachePolicy]
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": _is_integer,
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "object": lambda value: isinstance(value, Mapping),
+}
+
+
+def compile_validator(schema: Mapping[str, Any]) -> Validator:
+    """
+    Turn a JSON schema into a function `validate(value, path) -> value`
+    that raises ToolArgumentError on the first mismatch
+
+    Example:
+        ```python
+        validate = compile_validator(track_order_tool.parameters)
+        args = validate({"order_id": "AX-1"}, "args")
+        ```
+    """
+    type_name = schema.get("type")
+    checks: List[Validator] = []
+
+    if type_name is not None:
+        type_check = _TYPE_CHECKS.get(type_name)
+        if type_check is None:
+            raise ValueError(f"Unsupported schema type: {type_name}")
+
+        def check_type(value: Any, path: str) -> Any:
+            if not type_check(value):
+                raise ToolArgumentError(f"{path}: expected {type_name}, got {type(value).__name__}")
+            return int(value) if type_name == "integer" else value
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+
+        def check_enum(value: Any, path: str) -> Any:
+            if value not in allowed:
+                raise ToolArgumentError(f"{path}: must be one of {sorted(allowed)}")
+            return value
+
+        checks.append(check_enum)
+
+    if type_name == "object":
+        required = tuple(schema.get("required", ()))
+        properties = {
+            name: compile_validator(subschema)
+            for name, subschema in schema.get("properties", {}).items()
+        }
+        closed = "properties" in schema and not schema.get("additionalProperties", False)
+
+        def check_object(value: Mapping[str, Any], path: str) -> Dict[str, Any]:
+            for name in required:
+                if name not in value:
+                    raise ToolArgumentError(f"{path}: missing required field '{name}'")
+            if closed:
+                unexpected = sorted(name for name in value if name not in properties)
+                if unexpected:
+                    raise ToolArgumentError(
+                        f"{path}: unexpected field(s) {unexpected}",
+                        unexpected=unexpected,
+                        allowed=sorted(properties)
+                    )
+            result = dict(value)
+            for name, item in value.items():
+                validate = properties.get(name)
+                if validate is not None and item is not None:
+                    result[name] = validate(item, f"{path}.{name}")
+            return result
+
+        checks.append(check_object)
+
+    if type_name == "array" and "items" in schema:
+        validate_item = compile_validator(schema["items"])
+
+        def check_array(value: Sequence[Any], path: str) -> List[Any]:
+            return [validate_item(item, f"{path}[{index}]") for index, item in enumerate(value)]
+
+        checks.append(check_array)
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value: Any, path: str) -> Any:
+        for check in checks:
+            value = check(value, path)
+        return value
+
+    return validate
+
+
+class ToolDispatcher:
+    """
+    One agent's tool routes and Gemini function declarations
+
+    Example:
+        ```python
+        dispatcher = ToolDispatcher("sofra", sofra_agent.tools, sofra_agent.tool_snapshot())
+        result = await dispatcher.dispatch(function_call)
+        ```
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        tools: Iterable[ADKTool],
+        snapshot: Optional[ToolSnapshot] = None,
+        caches: Optional[Dict[CacheKey, ToolResultCache]] = None
+    ):
+        self.agent_id = agent_id
+        self.snapshot = snapshot
+        self.declarations: Tuple[Mapping[str, Any], ...] = snapshot.declarations if snapshot else ()
+        self._caches = caches if caches is not None else {}
+        self._routes: Dict[str, Tuple[Callable[..., Any], Validator, Optional[ToolResultCache]]] = {
+            tool.name: (
+                tool.handler,
+                compile_validator(tool.parameters or {"type": "object", "properties": {}}),
+                self._cache(tool)
+            )
+            for tool in tools
+            if tool.handler is not None
+        }
+        self.calls: Dict[str, int] = {}
+        self.invalid = 0
+        self.unknown = 0
+
+    def _cache(self, tool: ADKTool) -> Optional[ToolResultCache]:
+        """The tool's result cache, shared with earlier dispatchers under the same policy"""
+        if tool.cache is None or not VOICE_TOOL_CACHE_ENABLED:
+            return None
+        key = (self.agent_id, tool.name, tool.cache)
+        cache = self._caches.get(key)
+        if cache is None:
+            cache = self._caches[key] = ToolResultCache(self.agent_id, tool.name, tool.cache)
+        return cache
+
+    @property
+    def tool_names(self) -> List[str]:
+        return list(self._routes)
+
+    @property
+    def cache_keys(self) -> Set[CacheKey]:
+        return {(self.agent_id, name, cache.policy) for name, (_, _, cache) in self._routes.items() if cache}
+
+    async def dispatch(self, function_call: Any) -> Any:
+        """Validate the call's arguments and run its handler"""
+        name = function_call.name
+        route = self._routes.get(name)
+        if route is None:
+            self.unknown += 1
+            return {"error": f"Tool {name} not implemented"}
+        handler, validate, cache = route
+        try:
+            args = validate(function_call.args or {}, "args")
+        except ToolArgumentError as e:
+            self.invalid += 1
+            logger.warning(f"⚠️ Invalid arguments for {name} ({self.agent_id}): {e}")
+            return {"error": f"Invalid arguments for {name}: {e}", **e.details}
+        self.calls[name] = self.calls.get(name, 0) + 1
+        logger.info(f"🔧 Executing tool: {name} with args: {args}")
+        if cache is not None:
+            return await cache.get_or_run(args, lambda: invoke(handler, **args))
+        return await invoke(handler, **args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.snapshot.version if self.snapshot else None,
+            "tools": self.tool_names,
+            "declared": [declaration["name"] for declaration in self.declarations],
+            "calls": dict(self.calls),
+            "invalid_args": self.invalid,
+            "unknown_tools": self.unknown,
+            "cache": {name: cache.stats() for name, (_, _, cache) in self._routes.items() if cache is not None}
+        }
+
+
+class ToolDispatchTable:
+    """
+    Tool dispatchers for every configured agent
+
+    Kept in step with the agent registry: `sync()` (on every registry
+    load) builds dispatchers for new agents and agents whose ToolSnapshot
+    changed; `get()` catches a change between loads
+    (AxiomBaseAgent.reload_tools() / google_cloud.reload()) with one
+    identity comparison, rebuilds, and tells subscribers so the registry
+    publishes configs with the new declarations.
+
+    Example:
+        ```python
+        tool_dispatch.sync(["sofra"])
+        tool_dispatch.subscribe(lambda agent_id: ...)  # tools changed outside sync()
+        declarations = tool_dispatch.declarations("sofra")
+        ```
+    """
+
+    def __init__(self):
+        self._dispatchers: Dict[str, ToolDispatcher] = {}
+        self._caches: Dict[CacheKey, ToolResultCache] = {}  # outlive dispatcher rebuilds
+        self._subscribers: List[Callable[[str], None]] = []
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(agent_id)` when `get()` rebuilds a dispatcher for changed tools"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def sync(self, agent_ids: Iterable[str]) -> None:
+        """Build dispatchers for these agents (new ones or changed tools), drop the rest"""
+        agent_ids = set(agent_ids)
+        for agent_id in set(self._dispatchers) - agent_ids:
+            del self._dispatchers[agent_id]
+            self._drop_caches(agent_id, keep=set())
+        for agent_id in agent_ids:
+            agent = AgentRegistry.get(agent_id)
+            if agent is not None and not self._current(agent_id, agent):
+                self._build(agent_id, agent)
+
+    def _current(self, agent_id: str, agent: AxiomBaseAgent) -> bool:
+        dispatcher = self._dispatchers.get(agent_id)
+        return dispatcher is not None and agent.tool_snapshot() is dispatcher.snapshot
+
+    def _build(self, agent_id: str, agent: AxiomBaseAgent) -> ToolDispatcher:
+        dispatcher = ToolDispatcher(agent_id, agent.tools, agent.tool_snapshot(), self._caches)
+        self._dispatchers[agent_id] = dispatcher
+        self._drop_caches(agent_id, keep=dispatcher.cache_keys)
+        logger.info(
+            f"🔧 Tools for {agent_id} (v{dispatcher.snapshot.version}): "
+            f"{len(dispatcher.tool_names)} routes, {len(dispatcher.declarations)} declared"
+        )
+        return dispatcher
+
+    def _drop_caches(self, agent_id: str, keep: Set[CacheKey]) -> None:
+        """Forget the caches of removed tools and replaced policies"""
+        for key in [key for key in self._caches if key[0] == agent_id and key not in keep]:
+            del self._caches[key]
+
+    def declarations(self, agent_id: str) -> Tuple[Mapping[str, Any], ...]:
+        """The agent's Gemini function declarations as of the last build"""
+        dispatcher = self._dispatchers.get(agent_id.lower())
+        return dispatcher.declarations if dispatcher else ()
+
+    def get(self, agent_id: str) -> ToolDispatcher:
+        """The agent's current dispatcher (an empty one for agents without ADK tools)"""
+        agent_id = agent_id.lower()
+        dispatcher = self._dispatchers.get(agent_id)
+        if dispatcher is None:
+            return ToolDispatcher(agent_id, ())
+        agent = AgentRegistry.get(agent_id)
+        if agent is not None and not self._current(agent_id, agent):
+            dispatcher = self._build(agent_id, agent)
+            for callback in self._subscribers:
+                try:
+                    callback(agent_id)
+                except Exception as e:
+                    logger.error(f"❌ Tool dispatch subscriber failed: {e}")
+        return dispatcher
+
+    def stats(self) -> Dict[str, Any]:
+        return {agent_id: dispatcher.stats() for agent_id, dispatcher in self._dispatchers.items()}
+
+
+# Singleton dispatch table (synced by the agent registry, api/agent_registry.py)
+tool_dispatch = ToolDispatchTable()
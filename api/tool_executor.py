@@ -0,0 +1,138 @@
+"""
+Axiom RESET - Tool Execution Engine
+Runs the function calls of one Gemini Live tool_call concurrently
+
+A tool_call message can carry several function calls. The executor runs
+them side by side, each under its own timeout, and returns one
+FunctionResponse per call (in call order) so the bridge answers with a
+single batched tool response. A call that raises or times out gets an
+`{"error": ...}` response instead of failing the batch.
+
+Handlers may be sync or async. Coroutine functions run on the event
+loop; plain functions (e.g. the FunctionTool functions in
+agents/sofra/tools/) run on a shared thread pool so a slow or blocking
+tool never stalls audio streaming.
+
+Timeouts:
+    VOICE_TOOL_TIMEOUT=10                                default per call (seconds)
+    VOICE_TOOL_TIMEOUTS="search_restaurants=5,place_order=20"   per-tool overrides
+    VOICE_TOOL_THREADS=8                                 thread pool size for sync handlers
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from api.metrics import TOOL_DURATION
+
+logger = logging.getLogger("AxiomTools")
+
+VOICE_TOOL_TIMEOUT = float(os.getenv("VOICE_TOOL_TIMEOUT", 10))
+VOICE_TOOL_THREADS = int(os.getenv("VOICE_TOOL_THREADS", 8))
+
+
+def _parse_timeouts(raw: str) -> Dict[str, float]:
+    """"name=seconds,name=seconds" -> {name: seconds}"""
+    timeouts: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, seconds = part.partition("=")
+        if name.strip() and seconds.strip():
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+VOICE_TOOL_TIMEOUTS = _parse_timeouts(os.getenv("VOICE_TOOL_TIMEOUTS", ""))
+
+# Shared by every session: sync tool handlers run here, off the event loop
+tool_threads = ThreadPoolExecutor(max_workers=VOICE_TOOL_THREADS, thread_name_prefix="axiom-tool")
+
+
+async def invoke(handler: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call a sync or async handler without blocking the event loop"""
+    if inspect.iscoroutinefunction(handler):
+        return await handler(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(tool_threads, functools.partial(handler, *args, **kwargs))
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class ToolExecutor:
+    """
+    Example:
+        ```python
+        executor = ToolExecutor("sofra", bridge._execute_tool)
+        responses = await executor.execute(response.tool_call.function_calls)
+        await session.send(input=responses)  # one batched tool response
+        ```
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        handler: Callable[[Any], Any],
+        default_timeout: float = VOICE_TOOL_TIMEOUT,
+        timeouts: Optional[Mapping[str, float]] = None
+    ):
+        self.agent_id = agent_id
+        self.handler = handler
+        self.default_timeout = default_timeout
+        self.timeouts = dict(VOICE_TOOL_TIMEOUTS if timeouts is None else timeouts)
+        self.batches = 0
+        self.calls = 0
+        self.errors = 0
+        self.timed_out = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    async def execute(self, function_calls: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Run every call concurrently; FunctionResponse dicts in call order"""
+        self.batches += 1
+        return list(await asyncio.gather(*(self._run(call) for call in function_calls)))
+
+    async def _run(self, function_call: Any) -> Dict[str, Any]:
+        name = function_call.name
+        timeout = self.timeout_for(name)
+        started = time.perf_counter()
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            result = await asyncio.wait_for(invoke(self.handler, function_call), timeout)
+            status = "error" if isinstance(result, dict) and "error" in result else "ok"
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            status = "timeout"
+            logger.warning(f"⏱️ Tool {name} timed out after {timeout}s for {self.agent_id}")
+            result = {"error": f"Tool {name} timed out after {timeout}s"}
+        except Exception as e:
+            status = "error"
+            logger.error(f"❌ Tool {name} failed for {self.agent_id}: {e}")
+            result = {"error": str(e)}
+        finally:
+            self.in_flight -= 1
+        if status != "ok":
+            self.errors += 1
+        TOOL_DURATION.labels(self.agent_id, name, status).observe(time.perf_counter() - started)
+        if not isinstance(result, dict):
+            result = {"result": result}
+        return {"id": function_call.id, "name": name, "response": result}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timed_out": self.timed_out,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight
+        }
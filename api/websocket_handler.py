@@ -6,112 +6,66 @@ Bi-directional bridge connecting Client WebSocket to Google's Gemini Live API
 import asyncio
 import json
 import logging
+import os
+import time
+from collections import deque
+from contextlib import AsyncExitStack
 from fastapi import WebSocket, WebSocketDisconnect
-from google import genai
-from typing import Optional, Dict, Any
-
-logger = logging.getLogger("AxiomVoice")
-logging.basicConfig(level=logging.INFO)
-
-
-class AgentConfig:
-    """Agent configuration for Gemini Live API"""
-    
-    def __init__(
-        self,
-        agent_id: str,
-        instruction: str,
-        tools: list = None,
-        voice_name: str = "Kore"
-    ):
-        self.agent_id = agent_id
-        self.instruction = instruction
-        self.tools = tools or []
-        self.voice_name = voice_name
+from typing import Optional, Dict, Any, Deque, List, Tuple, Set
 
+from api.audio import (
+    AudioFormat,
+    FrameCoalescer,
+    StreamingResampler,
+    VoiceActivityGate,
+    UPSTREAM_MIME_TYPE,
+    UPSTREAM_SAMPLE_RATE,
+    DOWNSTREAM_SAMPLE_RATE
+)
+from api.codecs import AudioCodec, create_codec
+from api.flow import BoundedStreamQueue, OverflowPolicy, QueueOverflow
+from api.clients import gemini_clients, LIVE_API_VERSION, LIVE_MODEL_ID
+from api.session_pool import live_pools
+from api.admission import AdmissionRejected, voice_admission
+from api.resilience import CircuitOpen, live_breakers
+from api.resumption import OutputRingBuffer, voice_sessions
+from api.agent_registry import AgentConfig, agent_registry
+from api.tool_dispatch import tool_dispatch
+from api.tool_executor import ToolExecutor
+from api.logging_config import StreamLogger
+from api.metrics import (
+    VOICE_ACTIVE_SESSIONS,
+    VOICE_BYTES,
+    VOICE_CONNECT_ERRORS,
+    VOICE_SEND_LATENCY,
+    VOICE_SESSIONS,
+    VOICE_TIME_TO_CONNECTED,
+    VOICE_TIME_TO_FIRST_AUDIO
+)
 
-# Agent configurations registry
-AGENT_CONFIGS: Dict[str, AgentConfig] = {
-    "sofra": AgentConfig(
-        agent_id="sofra",
-        instruction="""
-أنت سفرة، وكيل ذكاء اصطناعي متخصص في المطاعم والطعام من منصة Axiom RESET.
-
-## مهامك:
-- مساعدة العملاء في اختيار المطاعم والأطباق
-- تنفيذ طلبات الطعام
-- حجز الطاولات
-- تتبع حالة الطلبات
+logger = logging.getLogger("AxiomVoice")
 
-## أسلوبك:
-- تحدث بالعربية مع لمسة مصرية ودية
-- كن مختصراً ومفيداً وحماسياً
-- اسأل أسئلة توضيحية عند الحاجة
-- أكد تنفيذ الطلبات بوضوح
+# Upstream audio frame window (ms); 0 sends every client chunk as-is
+VOICE_COALESCE_MS = int(os.getenv("VOICE_COALESCE_MS", 100))
 
-## المطاعم المتاحة (للمحاكاة):
-- بيتزا هت: بيتزا إيطالية، توصيل 30-45 دقيقة
-- ماكدونالدز: برجر أمريكي، توصيل 20-30 دقيقة
-- الشرقاوي: أكل مصري، توصيل 40 دقيقة
+# Bounded queues between the bridge tasks (size in messages + overflow policy)
+VOICE_UPSTREAM_QUEUE_SIZE = int(os.getenv("VOICE_UPSTREAM_QUEUE_SIZE", 50))
+VOICE_UPSTREAM_OVERFLOW = os.getenv("VOICE_UPSTREAM_OVERFLOW", OverflowPolicy.BLOCK.value)
+VOICE_DOWNSTREAM_QUEUE_SIZE = int(os.getenv("VOICE_DOWNSTREAM_QUEUE_SIZE", 100))
+VOICE_DOWNSTREAM_OVERFLOW = os.getenv("VOICE_DOWNSTREAM_OVERFLOW", OverflowPolicy.DROP_OLDEST.value)
 
-ابدأ بتحية العميل واسأله عن ما يشتهيه اليوم.
-""",
-        tools=[]  # Tools disabled for now - Gemini Live uses function calls differently
-    ),
-    "tajer": AgentConfig(
-        agent_id="tajer",
-        instruction="""
-أنت تاجر، وكيل ذكاء اصطناعي متخصص في العقارات من منصة Axiom RESET.
+# Client closes that end the session; any other drop parks it for resumption
+# (1000 normal closure, 1001 going away: tab closed, page navigated)
+CLEAN_CLOSE_CODES = frozenset({1000, 1001})
 
-## مهامك:
-- مساعدة العملاء في البحث عن العقارات
-- تقديم معلومات عن الأسعار والمواقع
-- ترتيب معاينات العقارات
-- المساعدة في إجراءات الشراء والإيجار
-"""
-    ),
-    "drmoe": AgentConfig(
-        agent_id="drmoe",
-        instruction="""
-أنت د. مو، وكيل ذكاء اصطناعي متخصص في الصيدلة والصحة من منصة Axiom RESET.
-
-## مهامك:
-- تقديم معلومات عن الأدوية
-- التحقق من التفاعلات الدوائية
-- المساعدة في طلب الأدوية
-- تقديم نصائح صحية عامة
-"""
-    ),
-    "tirs": AgentConfig(
-        agent_id="tirs",
-        instruction="""
-أنت ترس، وكيل ذكاء اصطناعي متخصص في الصناعة والتجارة B2B من منصة Axiom RESET.
 
-## مهامك:
-- مساعدة الشركات في طلب المواد الخام
-- إدارة سلاسل التوريد
-- تقديم عروض أسعار
-- تتبع الشحنات
-"""
-    ),
-    "ostaz": AgentConfig(
-        agent_id="ostaz",
-        instruction="""
-أنت أستاذ، وكيل ذكاء اصطناعي متخصص في التعليم من منصة Axiom RESET.
-
-## مهامك:
-- تقديم دروس خصوصية
-- شرح المفاهيم الصعبة
-- المساعدة في الواجبات
-- تقييم مستوى الطالب
-"""
-    )
-}
+def get_agent_config(agent_id: str) -> Optional[AgentConfig]:
+    """Get the current configuration of an agent by ID (api/agent_registry.py)"""
+    return agent_registry.get(agent_id)
 
 
-def get_agent_config(agent_id: str) -> Optional[AgentConfig]:
-    """Get agent configuration by ID"""
-    return AGENT_CONFIGS.get(agent_id.lower())
+# Bridges with an open client connection (for per-connection stats)
+active_bridges: Set["VoiceBridge"] = set()
 
 
 class VoiceBridge:
@@ -120,21 +74,110 @@ class VoiceBridge:
     to Google's Gemini Live API WebSocket.
     
     This enables real-time voice conversations with AI agents.
+    
+    If the client drops without a clean close, the Gemini session is
+    parked for a grace period (api/resumption.py) and a client that
+    reconnects with the session token is reattached to it.
     """
     
-    def __init__(self, client_ws: WebSocket, agent_id: str):
+    def __init__(self, client_ws: WebSocket, agent_id: str, resume_requested: bool = False):
         self.client_ws = client_ws
-        self.agent_id = agent_id
-        self.client = genai.Client(http_options={'api_version': 'v1alpha'})
-        self.model_id = "gemini-2.0-flash-exp"  # Multimodal Live API model
+        self.agent_id = agent_id.lower()  # registry ids, metric labels and resume checks
+        self.resume_requested = resume_requested  # reconnect with a token that could not be resumed
+        self.api_version = LIVE_API_VERSION
+        self.model_id = LIVE_MODEL_ID
         self.is_connected = False
+        self.session_mode = "cold"  # "warm" when served from the session pool
+        self._started_at = 0.0
+        self._first_audio_sent = False
+        self.coalescer = FrameCoalescer(window_ms=VOICE_COALESCE_MS)
+        self.audio_format = AudioFormat()
+        self.inbound_resampler: Optional[StreamingResampler] = None
+        self.outbound_resampler: Optional[StreamingResampler] = None
+        self.vad: Optional[VoiceActivityGate] = None
+        self.uplink_codec: Optional[AudioCodec] = None    # decodes client audio
+        self.downlink_codec: Optional[AudioCodec] = None  # encodes model audio
+        self.stream_log = StreamLogger(logger, self.agent_id)
+        self.upstream_queue = BoundedStreamQueue(
+            f"{self.agent_id}:upstream",
+            maxsize=VOICE_UPSTREAM_QUEUE_SIZE,
+            policy=VOICE_UPSTREAM_OVERFLOW
+        )
+        self.downstream_queue = BoundedStreamQueue(
+            f"{self.agent_id}:downstream",
+            maxsize=VOICE_DOWNSTREAM_QUEUE_SIZE,
+            policy=VOICE_DOWNSTREAM_OVERFLOW
+        )
+        
+        # Tool calls run concurrently, off the receive loop
+        self.agent_version: Optional[str] = None  # AgentConfig.version this session runs on
+        self.tools: Optional[ToolExecutor] = None  # bound to the agent's dispatcher in start()
+        self._tool_tasks: Set[asyncio.Task] = set()
+        
+        # Resumption state
+        self.session_token: Optional[str] = None
+        self.client_dropped = False
+        self.parked = False
+        self.parked_at = 0.0
+        self.resumes = 0
+        self.resume_buffer = OutputRingBuffer(voice_sessions.buffer_bytes)
+        self._replay: Deque[Any] = deque()  # sent to the client before the downstream queue
+        self._resume_future: Optional[asyncio.Future] = None
+        self._detached: Optional[asyncio.Future] = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-connection streaming stats"""
+        return {
+            "agent": self.agent_id,
+            "agent_version": self.agent_version,
+            "mode": self.session_mode,
+            "parked": self.parked,
+            "resumes": self.resumes,
+            "audio_format": self.audio_format.to_message(),
+            "resampling": {
+                "inbound": self.inbound_resampler.stats() if self.inbound_resampler else None,
+                "outbound": self.outbound_resampler.stats() if self.outbound_resampler else None
+            },
+            "codec": {
+                "uplink": self.uplink_codec.stats() if self.uplink_codec else None,
+                "downlink": self.downlink_codec.stats() if self.downlink_codec else None
+            },
+            "vad": self.vad.stats() if self.vad else None,
+            "upstream_audio": self.coalescer.stats(),
+            "upstream_queue": self.upstream_queue.stats(),
+            "downstream_queue": self.downstream_queue.stats(),
+            "tools": self.tools.stats() if self.tools else None
+        }
+    
+    async def _open_session(self, stack: AsyncExitStack, agent_config: AgentConfig) -> Tuple[Any, str]:
+        """Get a Live session: a warm one from the pool, or connect a new one"""
+        pooled = live_pools.acquire(agent_config.agent_id)
+        if pooled is not None:
+            stack.push_async_callback(pooled.aclose)
+            await pooled.detach()
+            return pooled.session, "warm"
+        
+        client = await stack.enter_async_context(
+            gemini_clients.session(self.api_version)
+        )
+        async with live_breakers.get(self.model_id, self.api_version).guard():
+            session = await stack.enter_async_context(
+                client.aio.live.connect(
+                    model=self.model_id,
+                    config=agent_config.to_live_config()
+                )
+            )
+        return session, "cold"
     
     async def start(self):
         """Start the voice bridge"""
+        self._started_at = time.perf_counter()
         await self.client_ws.accept()
         self.is_connected = True
         
-        # 1. Retrieve Agent Configuration
+        # 1. Retrieve Agent Configuration (this session keeps this version across reloads)
+        # Dispatcher first: if the agent's tools changed it publishes the config that declares them
+        dispatcher = tool_dispatch.get(self.agent_id)
         agent_config = get_agent_config(self.agent_id)
         
         if not agent_config:
@@ -146,192 +189,438 @@ class VoiceBridge:
             return
         
         logger.info(f"🎤 Starting Voice Bridge for Agent: {self.agent_id}")
+        self.agent_version = agent_config.version
+        self.tools = ToolExecutor(self.agent_id, dispatcher.dispatch)
+        active_bridges.add(self)
+        
+        # Metric series for this session's hot paths (resolved once)
+        self._bytes_in = VOICE_BYTES.labels(self.agent_id, "in")
+        self._bytes_out = VOICE_BYTES.labels(self.agent_id, "out")
+        self._send_latency = VOICE_SEND_LATENCY.labels(self.agent_id)
+        active_gauge = VOICE_ACTIVE_SESSIONS.labels(self.agent_id)
+        active_gauge.inc()
+        if agent_config.vad:
+            self.vad = VoiceActivityGate(agent_config.vad)
         
         try:
-            # 2. Connect to Gemini Live API
-            # Build config - only include tools if they exist and are properly formatted
-            live_config = {
-                "system_instruction": agent_config.instruction,
-                "generation_config": {
-                    "response_modalities": ["AUDIO"],
-                    "speech_config": {
-                        "voice_config": {
-                            "prebuilt_voice_config": {
-                                "voice_name": agent_config.voice_name
-                            }
-                        }
-                    }
-                }
-            }
-            
-            async with self.client.aio.live.connect(
-                model=self.model_id,
-                config=live_config
-            ) as session:
+            # 2. Connect to Gemini Live API (or take a pre-warmed session)
+            async with AsyncExitStack() as stack:
+                # Refuse at once while the upstream circuit is open
+                live_breakers.get(self.model_id, self.api_version).check()
+                # Fair-queued Live session slot, held until the session ends
+                await stack.enter_async_context(voice_admission.slot(agent_config.agent_id))
+                session, self.session_mode = await self._open_session(stack, agent_config)
                 
-                logger.info(f"✅ Connected to Gemini Live for Agent: {self.agent_id}")
+                logger.info(f"✅ Connected to Gemini Live for Agent: {self.agent_id} ({self.session_mode})")
                 
                 # Send connection confirmation to client
-                await self.client_ws.send_json({
+                connected = {
                     "type": "connected",
                     "agent": self.agent_id,
                     "message": f"متصل بـ {self.agent_id}"
-                })
+                }
+                if voice_sessions.enabled:
+                    self.session_token = voice_sessions.new_token()
+                    connected["session_token"] = self.session_token
+                    connected["resume_grace"] = voice_sessions.grace
+                if self.resume_requested:
+                    connected["resumed"] = False
+                await self.client_ws.send_json(connected)
+                time_to_connected = time.perf_counter() - self._started_at
+                live_pools.timings.record_connected(self.session_mode, time_to_connected)
+                VOICE_SESSIONS.labels(self.agent_id, self.session_mode).inc()
+                VOICE_TIME_TO_CONNECTED.labels(self.agent_id, self.session_mode).observe(time_to_connected)
                 
                 # 3. Parallel Task Management
-                client_to_gemini = asyncio.create_task(
-                    self._forward_client_to_gemini(session)
-                )
-                gemini_to_client = asyncio.create_task(
-                    self._forward_gemini_to_client(session)
-                )
+                # Readers feed bounded queues; pumps drain them to the other side.
+                # The upstream half outlives a dropped client while the session is parked.
+                upstream = [
+                    asyncio.create_task(self._pump_to_gemini(session)),
+                    asyncio.create_task(self._forward_gemini_to_client(session))
+                ]
                 
                 try:
-                    await asyncio.gather(client_to_gemini, gemini_to_client)
-                except WebSocketDisconnect:
-                    logger.info(f"🔌 Client disconnected from {self.agent_id}")
-                except Exception as e:
-                    logger.error(f"❌ Bridge error: {e}")
+                    while True:
+                        await self._serve_client(upstream)
+                        if not self._can_park(upstream) or not await self._park(upstream):
+                            break
                 finally:
-                    client_to_gemini.cancel()
-                    gemini_to_client.cancel()
+                    self.is_connected = False
+                    pending = [*upstream, *self._tool_tasks]
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
                     
+        except AdmissionRejected as e:
+            logger.warning(f"🚦 Voice session for {self.agent_id} rejected: {e.reason}")
+            await self._close_with_error("الخدمة مشغولة حالياً، حاول بعد قليل.", code=1013)
+        except CircuitOpen as e:
+            logger.warning(f"⚡ Voice session for {self.agent_id} refused: {e}")
+            await self._close_with_error(
+                "الخدمة غير متاحة مؤقتاً، حاول بعد قليل.",
+                code=1013,
+                error="upstream_unavailable",
+                retry_after=round(e.retry_after, 1)
+            )
         except Exception as e:
             logger.error(f"❌ Failed to connect to Gemini Live: {e}")
+            VOICE_CONNECT_ERRORS.labels(self.agent_id).inc()
+            await self._close_with_error(f"فشل الاتصال: {str(e)}", code=1011)
+        finally:
+            self._release_client()
+            active_gauge.dec()
+            active_bridges.discard(self)
+            self.stream_log.close()
+            logger.info("📊 Voice session stats for %s: %s", self.agent_id, self.stats())
+    
+    async def _serve_client(self, upstream: List[asyncio.Task]):
+        """Run the client-side tasks until the client leaves or the session ends"""
+        self.client_dropped = False
+        tasks = [
+            asyncio.create_task(self._forward_client_to_gemini()),
+            asyncio.create_task(self._pump_to_client())
+        ]
+        try:
+            done, _ = await asyncio.wait([*tasks, *upstream], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception():
+                    raise task.exception()
+        except WebSocketDisconnect:
+            logger.info(f"🔌 Client disconnected from {self.agent_id}")
+            self.is_connected = False
+        except QueueOverflow as e:
+            logger.warning(f"⚠️ Disconnecting {self.agent_id}: {e}")
+            self.is_connected = False
+            await self._close_with_error("الاتصال بطيء جداً", code=1013)
+        except Exception as e:
+            logger.error(f"❌ Bridge error: {e}")
+            self.is_connected = False
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _can_park(self, upstream: List[asyncio.Task]) -> bool:
+        return (
+            self.is_connected
+            and self.client_dropped
+            and self.session_token is not None
+            and voice_sessions.can_park()
+            and not any(task.done() for task in upstream)
+        )
+    
+    async def _park(self, upstream: List[asyncio.Task]) -> bool:
+        """Keep the Live session up for the grace period; True once a client resumed it"""
+        self._release_client()
+        self.parked = True
+        self.parked_at = time.monotonic()
+        # Output the dropped client never got comes first on replay
+        while self._replay:
+            self.resume_buffer.append(self._replay.popleft())
+        self._resume_future = asyncio.get_running_loop().create_future()
+        voice_sessions.park(self)
+        buffering = asyncio.create_task(self._buffer_output())
+        logger.info(f"🅿️ Parked voice session for {self.agent_id} ({voice_sessions.grace:.0f}s grace)")
+        try:
+            await asyncio.wait(
+                [self._resume_future, *upstream],
+                timeout=voice_sessions.grace,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            buffering.cancel()
+            await asyncio.gather(buffering, return_exceptions=True)
+            voice_sessions.unpark(self)
+            self.parked = False
+        
+        if not self._resume_future.done():
+            self._resume_future.cancel()
+            outcome = "upstream_closed" if any(task.done() for task in upstream) else "expired"
+            voice_sessions.record(self.agent_id, outcome)
+            logger.info(f"🅿️ Parked session for {self.agent_id} ended ({outcome})")
+            return False
+        
+        websocket, self._detached, reconnected_at = self._resume_future.result()
+        self.client_ws = websocket
+        try:
+            await websocket.accept()
+        except Exception as e:
+            logger.warning(f"⚠️ Resumed client for {self.agent_id} vanished before accept: {e}")
+            return False
+        missed = self.resume_buffer.dropped
+        replay = self.resume_buffer.drain()
+        self.resume_buffer.dropped = 0
+        # The presented token is spent; the next drop parks under a fresh one
+        self.session_token = voice_sessions.new_token()
+        self._replay.append({
+            "type": "connected",
+            "agent": self.agent_id,
+            "message": f"متصل بـ {self.agent_id}",
+            "session_token": self.session_token,
+            "resume_grace": voice_sessions.grace,
+            "resumed": True,
+            "replayed": len(replay),
+            "missed": missed
+        })
+        self._replay.extend(replay)
+        self.resumes += 1
+        voice_sessions.record(self.agent_id, "resumed", time.perf_counter() - reconnected_at)
+        logger.info(
+            f"▶️ Resumed voice session for {self.agent_id} "
+            f"(parked {time.monotonic() - self.parked_at:.1f}s, replaying {len(replay)}, missed {missed})"
+        )
+        return True
+    
+    def hand_over(self, websocket: WebSocket) -> asyncio.Future:
+        """Give a parked bridge its reconnected client; resolves when the bridge is done with it"""
+        detached = asyncio.get_running_loop().create_future()
+        self._resume_future.set_result((websocket, detached, time.perf_counter()))
+        return detached
+    
+    def _release_client(self):
+        """Let a resumed connection's handler return (its socket is no longer used)"""
+        if self._detached is not None and not self._detached.done():
+            self._detached.set_result(None)
+        self._detached = None
+    
+    async def _buffer_output(self):
+        """While parked: move model output into the bounded resume buffer"""
+        while True:
+            self.resume_buffer.append(await self.downstream_queue.get())
+    
+    async def _close_with_error(self, content: str, code: int, **details: Any):
+        """Send an error event (plus any structured details) and close the client socket (best effort)"""
+        try:
             await self.client_ws.send_json({
                 "type": "error",
-                "content": f"فشل الاتصال: {str(e)}"
+                "content": content,
+                **details
             })
-            await self.client_ws.close(code=1011)
+            await self.client_ws.close(code=code)
+        except Exception:
+            pass
     
-    async def _forward_client_to_gemini(self, session):
-        """Forward audio/text from client to Gemini"""
+    async def _queue_audio(self, frame: Optional[bytes]):
+        """Queue one coalesced PCM frame for upstream"""
+        if not frame:
+            return
+        await self.upstream_queue.put(
+            {"input": {"data": frame, "mime_type": UPSTREAM_MIME_TYPE}, "end_of_turn": False},
+            droppable=True
+        )
+    
+    async def _queue_upstream(self, input: Any, end_of_turn: bool):
+        """Queue a non-audio upstream message (text, turn end, tool response)"""
+        await self.upstream_queue.put(
+            {"input": input, "end_of_turn": end_of_turn},
+            droppable=False
+        )
+    
+    async def _negotiate_audio_format(self, data: Dict[str, Any]):
+        """Apply a client `audio_format` message and acknowledge it"""
+        try:
+            fmt = AudioFormat.from_message(data)
+            uplink_codec = create_codec(fmt.encoding, fmt.input_rate)
+            downlink_codec = create_codec(fmt.encoding, fmt.output_rate)
+        except ValueError as e:
+            await self.downstream_queue.put({
+                "type": "error",
+                "content": f"صيغة صوت غير مدعومة: {e}"
+            }, droppable=False)
+            return
+        
+        # Audio already buffered at the old rate goes out first
+        await self._queue_audio(self.coalescer.flush())
+        self.audio_format = fmt
+        self.uplink_codec = uplink_codec if fmt.encoding != "pcm16" else None
+        self.downlink_codec = downlink_codec if fmt.encoding != "pcm16" else None
+        self.inbound_resampler = StreamingResampler(fmt.input_rate, UPSTREAM_SAMPLE_RATE)
+        self.outbound_resampler = StreamingResampler(DOWNSTREAM_SAMPLE_RATE, fmt.output_rate)
+        if self.inbound_resampler.passthrough:
+            self.inbound_resampler = None
+        if self.outbound_resampler.passthrough:
+            self.outbound_resampler = None
+        await self.downstream_queue.put(fmt.to_message(), droppable=False)
+        logger.info(
+            f"🎚️ Audio format for {self.agent_id}: "
+            f"in={fmt.input_rate}Hz out={fmt.output_rate}Hz codec={fmt.encoding}"
+        )
+    
+    async def _forward_client_to_gemini(self):
+        """Read audio/text from the client into the upstream queue"""
         try:
             while self.is_connected:
-                message = await self.client_ws.receive()
+                # Flush a partial window if no audio arrives within one window
+                timeout = self.coalescer.window_seconds if self.coalescer.pending else None
+                try:
+                    message = await asyncio.wait_for(self.client_ws.receive(), timeout)
+                except asyncio.TimeoutError:
+                    await self._queue_audio(self.coalescer.flush())
+                    continue
+                
+                if message.get("type") == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code") or 1000)
                 
-                if "bytes" in message:
-                    # Send Audio Chunk (PCM 16kHz) to Gemini
-                    await session.send(
-                        input={"data": message["bytes"], "mime_type": "audio/pcm"},
-                        end_of_turn=False
-                    )
-                    logger.debug(f"📤 Sent {len(message['bytes'])} bytes to Gemini")
+                if message.get("bytes") is not None:
+                    audio = message["bytes"]
+                    self._bytes_in.inc(len(audio))
+                    if self.uplink_codec:
+                        audio = await self.uplink_codec.decode_async(audio)
+                    if self.inbound_resampler:
+                        audio = self.inbound_resampler.process(audio)
+                    end_of_speech = False
+                    if self.vad:
+                        # Drop silence; optionally end the turn when speech stops
+                        audio, end_of_speech = self.vad.process(audio)
+                    # Coalesce Audio Chunks (PCM 16kHz) into upstream frames
+                    if audio:
+                        for frame in self.coalescer.push(audio):
+                            await self._queue_audio(frame)
+                    if end_of_speech:
+                        await self._queue_audio(self.coalescer.flush())
+                        await self._queue_upstream("", end_of_turn=True)
                 
-                elif "text" in message:
+                elif message.get("text") is not None:
                     data = json.loads(message["text"])
                     
+                    if data.get("type") in ("text_input", "end_turn"):
+                        # Audio must reach Gemini before the turn ends
+                        await self._queue_audio(self.coalescer.flush())
+                        if self.vad:
+                            self.vad.reset_turn()
+                    
                     if data.get("type") == "text_input":
                         # Send text message
-                        await session.send(
-                            input=data.get("content", ""),
-                            end_of_turn=True
-                        )
+                        await self._queue_upstream(data.get("content", ""), end_of_turn=True)
                         logger.info(f"📤 Sent text: {data.get('content', '')[:50]}...")
                     
                     elif data.get("type") == "end_turn":
                         # Signal end of user turn
-                        await session.send(input="", end_of_turn=True)
+                        await self._queue_upstream("", end_of_turn=True)
+                    
+                    elif data.get("type") == "audio_format":
+                        # Negotiate client capture/playback rates
+                        await self._negotiate_audio_format(data)
                     
                     elif data.get("type") == "stop":
                         # Stop the session
                         self.is_connected = False
                         break
                         
-        except WebSocketDisconnect:
-            self.is_connected = False
+        except WebSocketDisconnect as e:
+            if e.code in CLEAN_CLOSE_CODES:
+                self.is_connected = False
+            else:
+                # Dropped without a clean close: the session may be resumed
+                self.client_dropped = True
+        except QueueOverflow:
+            raise
         except Exception as e:
             logger.error(f"❌ Error forwarding to Gemini: {e}")
             self.is_connected = False
     
+    async def _pump_to_gemini(self, session):
+        """Drain the upstream queue into the Gemini session"""
+        while True:
+            message = await self.upstream_queue.get()
+            started = time.perf_counter()
+            await session.send(**message)
+            self._send_latency.observe(time.perf_counter() - started)
+            payload = message["input"]
+            if isinstance(payload, dict) and "data" in payload:
+                self.coalescer.record_send(len(payload["data"]))
+                self.stream_log.chunk("upstream", len(payload["data"]))
+    
+    async def _receive_turns(self, session):
+        """Yield Gemini responses across turns (session.receive() stops at each turn_complete)"""
+        while self.is_connected:
+            received = False
+            async for response in session.receive():
+                received = True
+                yield response
+            if not received:
+                # Upstream closed the session
+                return
+    
     async def _forward_gemini_to_client(self, session):
-        """Forward audio/text from Gemini to client"""
+        """Read audio/text/events from Gemini into the downstream queue"""
         try:
-            async for response in session.receive():
+            async for response in self._receive_turns(session):
                 if not self.is_connected:
                     break
                 
                 # Handle Audio Response
                 if response.data:
-                    await self.client_ws.send_bytes(response.data)
-                    logger.debug(f"📥 Sent {len(response.data)} bytes to client")
+                    audio = response.data
+                    if self.outbound_resampler:
+                        audio = self.outbound_resampler.process(audio)
+                    if self.downlink_codec:
+                        for packet in await self.downlink_codec.encode_async(audio):
+                            await self.downstream_queue.put(packet, droppable=True)
+                    else:
+                        await self.downstream_queue.put(audio, droppable=True)
                 
                 # Handle Text Response
                 if response.text:
-                    await self.client_ws.send_json({
+                    await self.downstream_queue.put({
                         "type": "text",
                         "content": response.text
-                    })
+                    }, droppable=False)
                     logger.info(f"📥 Text response: {response.text[:50]}...")
                 
-                # Handle Tool Calls
-                if hasattr(response, 'tool_calls') and response.tool_calls:
-                    for tool_call in response.tool_calls:
-                        result = await self._execute_tool(tool_call)
-                        # Send tool result back to session
-                        await session.send(
-                            input={"tool_response": result},
-                            end_of_turn=False
-                        )
+                # Handle Tool Calls (in the background: audio keeps flowing meanwhile)
+                tool_call = getattr(response, 'tool_call', None)
+                if tool_call and tool_call.function_calls:
+                    task = asyncio.create_task(self._run_tools(tool_call.function_calls))
+                    self._tool_tasks.add(task)
+                    task.add_done_callback(self._tool_tasks.discard)
                 
                 # Handle End of Response
                 if hasattr(response, 'server_content') and response.server_content:
                     if response.server_content.turn_complete:
-                        await self.client_ws.send_json({
+                        if self.downlink_codec:
+                            # The reply's tail still sitting in a partial frame
+                            for packet in self.downlink_codec.flush():
+                                await self.downstream_queue.put(packet, droppable=True)
+                        await self.downstream_queue.put({
                             "type": "turn_complete"
-                        })
+                        }, droppable=False)
                         
+        except QueueOverflow:
+            raise
         except Exception as e:
             logger.error(f"❌ Error forwarding from Gemini: {e}")
             self.is_connected = False
     
-    async def _execute_tool(self, tool_call) -> dict:
-        """Execute a tool call and return the result"""
-        tool_name = tool_call.name
-        tool_args = tool_call.args
-        
-        logger.info(f"🔧 Executing tool: {tool_name} with args: {tool_args}")
-        
-        # Tool implementations (mock data for now)
-        if tool_name == "search_restaurants":
-            return {
-                "restaurants": [
-                    {
-                        "id": "rest_001",
-                        "name": "بيتزا هت",
-                        "cuisine": "إيطالي",
-                        "rating": 4.5,
-                        "delivery_time": "30-45 دقيقة"
-                    },
-                    {
-                        "id": "rest_002",
-                        "name": "ماكدونالدز",
-                        "cuisine": "أمريكي",
-                        "rating": 4.2,
-                        "delivery_time": "20-30 دقيقة"
-                    }
-                ]
-            }
-        
-        elif tool_name == "place_order":
-            return {
-                "order_id": "ORD-2024-001",
-                "status": "confirmed",
-                "estimated_delivery": "45 دقيقة",
-                "total": 85.00
-            }
-        
-        elif tool_name == "get_menu":
-            return {
-                "categories": [
-                    {
-                        "name": "بيتزا",
-                        "items": [
-                            {"name": "بيبروني", "price": 45},
-                            {"name": "مارغريتا", "price": 35}
-                        ]
-                    }
-                ]
-            }
-        
-        return {"error": f"Tool {tool_name} not implemented"}
+    async def _run_tools(self, function_calls):
+        """Run one tool_call's function calls concurrently and answer with a single tool response"""
+        responses = await self.tools.execute(function_calls)
+        try:
+            await self._queue_upstream(responses, end_of_turn=False)
+        except Exception as e:
+            logger.error(f"❌ Could not send tool responses for {self.agent_id}: {e}")
+    
+    async def _pump_to_client(self):
+        """Drain the replay backlog, then the downstream queue, into the client WebSocket"""
+        while True:
+            message = self._replay.popleft() if self._replay else await self.downstream_queue.get()
+            try:
+                if isinstance(message, bytes):
+                    await self.client_ws.send_bytes(message)
+                else:
+                    await self.client_ws.send_json(message)
+            except Exception:
+                # Client went away mid-send: keep the message for a resumed connection
+                self._replay.appendleft(message)
+                self.client_dropped = True
+                return
+            if isinstance(message, bytes):
+                self._bytes_out.inc(len(message))
+                self.stream_log.chunk("downstream", len(message))
+                if not self._first_audio_sent:
+                    self._first_audio_sent = True
+                    time_to_first_audio = time.perf_counter() - self._started_at
+                    live_pools.timings.record_first_audio(self.session_mode, time_to_first_audio)
+                    VOICE_TIME_TO_FIRST_AUDIO.labels(
+                        self.agent_id, self.session_mode
+                    ).observe(time_to_first_audio)
@@ -0,0 +1,147 @@
+"""
+Axiom RESET - Chat Resilience Benchmark
+Tail latency and error rate of POST /agents/{id}/chat against a flaky,
+occasionally slow fake upstream, with and without retries and hedging
+
+Runs in-process against the FastAPI app (GEMINI_BACKEND=fake, response
+cache off, every message unique so nothing is coalesced). The same load
+is replayed under three settings of the chat ResilientCaller:
+
+    none            one attempt, errors reach the user
+    retry           classified retries with jittered backoff
+    retry+hedge     retries plus a hedged copy after the recent p95
+
+Reported per mode: p50 / p95 / p99 latency, error rate, and upstream
+calls per request (the extra load retries and hedges cost).
+
+Usage:
+    python -m bench.chat_resilience
+    python -m bench.chat_resilience --requests 1000 --concurrency 32 --slow-rate 0.03
+    python -m bench.chat_resilience --failure-rate 0.5      # outage: retry budget caps amplification
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from bench.voice_load import percentiles
+
+MODES = {
+    "none": {"max_attempts": 1, "hedge": False},
+    "retry": {"max_attempts": 3, "hedge": False},
+    "retry+hedge": {"max_attempts": 3, "hedge": True},
+}
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+    from api import main as api_main
+    from api.clients import gemini_clients, CHAT_API_VERSION
+    from api.resilience import ResilientCaller, RetryBudget
+
+    # Fresh caller per mode (budget, latency window, counters)
+    caller = api_main.chat_resilience = ResilientCaller(
+        "chat",
+        base_delay=args.base_delay,
+        max_delay=2.0,
+        budget=RetryBudget(args.budget_ratio, min_per_second=1),
+        **MODES[mode]
+    )
+    models = gemini_clients.get(CHAT_API_VERSION).aio.models
+    calls_before = models.calls
+
+    latencies: List[float] = []
+    errors = 0
+    sent = 0
+    counter = iter(range(args.warmup + args.requests))
+    transport = httpx.ASGITransport(app=api_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def worker():
+            nonlocal errors, sent
+            for index in counter:
+                started = time.perf_counter()
+                response = await client.post(f"/agents/{args.agent}/chat", json={"text": f"طلب رقم {index}"})
+                elapsed = time.perf_counter() - started
+                if index < args.warmup:
+                    continue
+                sent += 1
+                latencies.append(elapsed)
+                if response.status_code != 200 or response.json().get("status") != "success":
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    stats = caller.stats()
+    return {
+        "mode": mode,
+        "requests": sent,
+        "error_rate": round(errors / sent, 4) if sent else None,
+        "latency": percentiles(latencies),
+        "upstream_calls_per_request": round((models.calls - calls_before) / (sent + args.warmup), 3),
+        "retries": stats["retries"],
+        "hedges": stats["hedges"],
+        "hedge_wins": stats["hedge_wins"],
+        "budget_exhausted": stats["budget_exhausted"]
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from api.clients import gemini_clients
+
+    gemini_clients.start()
+    try:
+        return [await run_mode(mode, args) for mode in args.modes]
+    finally:
+        await gemini_clients.aclose()
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print("=" * 78)
+    print(f"{'mode':<13} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>8} {'calls/req':>10} {'hedge wins':>11}")
+    for row in results:
+        latency = row["latency"]
+        print(f"{row['mode']:<13} {row['requests']:>6} {latency['p50_ms']:>8} {latency['p95_ms']:>8} "
+              f"{latency['p99_ms']:>8} {row['error_rate'] * 100:>7.2f}% {row['upstream_calls_per_request']:>10} "
+              f"{row['hedge_wins']:>5}/{row['hedges']:<5}")
+    print("=" * 78)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chat p99 with and without retries/hedging")
+    parser.add_argument("--agent", default="sofra")
+    parser.add_argument("--requests", type=int, default=600, help="measured requests per mode")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per mode (fills the p95 window)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--latency", type=float, default=0.1, help="fake upstream latency")
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="share of slow upstream calls")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="extra latency of a slow call")
+    parser.add_argument("--failure-rate", type=float, default=0.03, help="share of upstream 503s")
+    parser.add_argument("--base-delay", type=float, default=0.05, help="retry backoff base")
+    parser.add_argument("--budget-ratio", type=float, default=0.1, help="retry budget tokens per call")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    # Must be set before api.main is imported (settings are read at import)
+    os.environ["GEMINI_BACKEND"] = "fake"
+    os.environ["CHAT_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["FAKE_LIVE_CHAT_LATENCY"] = str(args.latency)
+    os.environ["FAKE_LIVE_CHAT_TOKEN_DELAY"] = "0"
+    os.environ["FAKE_LIVE_CHAT_SLOW_RATE"] = str(args.slow_rate)
+    os.environ["FAKE_LIVE_CHAT_SLOW_LATENCY"] = str(args.slow_latency)
+    os.environ["FAKE_LIVE_CHAT_FAILURE_RATE"] = str(args.failure_rate)
+    os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Axiom RESET - Logging Overhead Micro-benchmark
+Per-chunk cost of hot-path logging in the voice bridge, before and after
+
+    before   logger.debug(f"📤 Sent {len(data)} bytes to Gemini") per chunk,
+             root logger with a FileHandler (logging.basicConfig style)
+    after    StreamLogger.chunk() per chunk (api/logging_config.py),
+             root logger with a QueueHandler drained by a listener thread
+
+The baseline row is the loop and call overhead alone. Each variant runs
+with the logger at INFO (DEBUG off, production) and at DEBUG (every chunk
+is eligible for a log line).
+
+Usage:
+    python -m bench.log_overhead
+    python -m bench.log_overhead --chunks 500000
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from api.logging_config import LOG_FORMAT, StreamLogger
+
+CHUNK = b"\x00" * 3200  # 100 ms of PCM16 16 kHz
+
+
+def _file_handler(path: str) -> logging.Handler:
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _measure(chunks: int, body: Callable[[], None]) -> float:
+    """Nanoseconds per call"""
+    started = time.perf_counter()
+    for _ in range(chunks):
+        body()
+    return (time.perf_counter() - started) / chunks * 1e9
+
+
+def run(chunks: int) -> List[Tuple[str, str, float]]:
+    data = CHUNK
+
+    def baseline():
+        len(data)
+
+    results = [("baseline", "-", _measure(chunks, baseline))]
+    with tempfile.TemporaryDirectory() as tmp:
+        for level in (logging.INFO, logging.DEBUG):
+            level_name = logging.getLevelName(level)
+
+            # Before: f-string per chunk, synchronous file handler
+            logger = logging.getLogger(f"bench.before.{level_name}")
+            logger.propagate = False
+            handler = _file_handler(os.path.join(tmp, f"before-{level_name}.log"))
+            logger.addHandler(handler)
+            logger.setLevel(level)
+
+            def before():
+                logger.debug(f"📤 Sent {len(data)} bytes to Gemini")
+
+            results.append(("before", level_name, _measure(chunks, before)))
+            handler.close()
+
+            # After: counters per chunk, sampled lazy DEBUG lines via a queue
+            logger = logging.getLogger(f"bench.after.{level_name}")
+            logger.propagate = False
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            file_handler = _file_handler(os.path.join(tmp, f"after-{level_name}.log"))
+            listener = logging.handlers.QueueListener(log_queue, file_handler)
+            logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            logger.setLevel(level)
+            listener.start()
+            stream_log = StreamLogger(logger, "bench")
+
+            def after():
+                stream_log.chunk("upstream", len(data))
+
+            results.append(("after", level_name, _measure(chunks, after)))
+            listener.stop()
+            file_handler.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-chunk logging overhead")
+    parser.add_argument("--chunks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print("=" * 56)
+    print(f"🪵 Hot-path logging cost ({args.chunks:,} chunks)")
+    for variant, level, ns in run(args.chunks):
+        print(f"  {variant:<8} level={level:<6} {ns:>10.1f} ns/chunk")
+    print("=" * 56)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Axiom RESET - Voice Load Generator
+Headless N-session load test for /ws/voice with latency percentiles
+
+By default the tool starts its own uvicorn worker in a subprocess with
+GEMINI_BACKEND=fake (api/fake_live.py), so it runs offline and without an
+API key. Any FAKE_LIVE_* variable in the environment (send latency, chunk
+size, failure modes, ...) is passed through to the worker. Each simulated caller streams
+PCM16 16 kHz audio at real-time pacing, ends its turn, waits for the
+scripted reply and repeats until the test duration is over.
+
+Reported per run:
+    - time-to-connected        (WebSocket open -> "connected" event)
+    - time-to-first-audio      (end_turn -> first audio byte of the reply)
+    - inter-chunk gap / jitter (arrival spacing of reply audio chunks)
+    - server CPU and RSS per session (sampled from /proc or psutil)
+
+Usage:
+    python -m bench.voice_load --sessions 50 --duration 30
+    python -m bench.voice_load --sessions 200 --ramp 10 --json results.json
+    python -m bench.voice_load --url ws://localhost:8000 --sessions 5   # existing server
+    python -m bench.voice_load --pcm recording.raw                      # replay 16 kHz PCM16
+    python -m bench.voice_load --tool-every 2                           # tool call every 2nd turn
+    FAKE_LIVE_SEND_LATENCY=0.05 python -m bench.voice_load              # slow upstream (backpressure)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_RATE = 16000
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SERVER UNDER TEST
+# ═══════════════════════════════════════════════════════════════════
+
+def serve(port: int) -> None:
+    """Run one uvicorn worker (backend chosen by GEMINI_BACKEND)"""
+    import logging
+    import uvicorn
+    from api.main import app
+
+    # Per-session INFO logs would dominate the worker's CPU profile
+    logging.getLogger().setLevel(logging.WARNING)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", ws="websockets")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+class ProcessSampler:
+    """CPU seconds and RSS of the server process"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._proc = psutil.Process(pid) if psutil else None
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def cpu_seconds(self) -> float:
+        if self._proc:
+            times = self._proc.cpu_times()
+            return times.user + times.system
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks
+
+    def rss_bytes(self) -> int:
+        if self._proc:
+            return self._proc.memory_info().rss
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * self._page
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SIMULATED CALLERS
+# ═══════════════════════════════════════════════════════════════════
+
+def synthetic_pcm(seconds: float) -> bytes:
+    """Voice-like test signal: 300 Hz tone with a 4 Hz syllable envelope"""
+    count = int(seconds * SAMPLE_RATE)
+    samples = (
+        int(6000 * abs(math.sin(2 * math.pi * 4 * i / SAMPLE_RATE))
+            * math.sin(2 * math.pi * 300 * i / SAMPLE_RATE))
+        for i in range(count)
+    )
+    return struct.pack(f"<{count}h", *samples)
+
+
+@dataclass
+class SessionResult:
+    connected_s: Optional[float] = None
+    first_audio_s: List[float] = field(default_factory=list)
+    gaps_s: List[float] = field(default_factory=list)
+    turns: int = 0
+    audio_bytes: int = 0
+    error: Optional[str] = None
+
+
+async def run_session(
+    url: str,
+    pcm: bytes,
+    chunk_ms: int,
+    turn_seconds: float,
+    duration: float,
+    start_delay: float,
+    result: SessionResult
+) -> None:
+    """One caller: connect, then talk/listen in turns until `duration` is over"""
+    import websockets
+
+    await asyncio.sleep(start_delay)
+    chunk_bytes = int(SAMPLE_RATE * chunk_ms / 1000) * 2
+    turn_chunks = max(1, int(turn_seconds * 1000 / chunk_ms))
+    turn_done = asyncio.Event()
+    state = {"end_turn_at": None, "last_audio_at": None}
+
+    async def receiver(ws) -> None:
+        async for message in ws:
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                result.audio_bytes += len(message)
+                if state["end_turn_at"] is not None:
+                    result.first_audio_s.append(now - state["end_turn_at"])
+                    state["end_turn_at"] = None
+                elif state["last_audio_at"] is not None:
+                    result.gaps_s.append(now - state["last_audio_at"])
+                state["last_audio_at"] = now
+                continue
+            event = json.loads(message)
+            if event.get("type") == "turn_complete":
+                state["last_audio_at"] = None
+                turn_done.set()
+            elif event.get("type") == "error":
+                result.error = event.get("content")
+
+    try:
+        opened = time.perf_counter()
+        async with websockets.connect(url, max_size=None) as ws:
+            event = json.loads(await ws.recv())
+            if event.get("type") != "connected":
+                result.error = event.get("content", str(event))
+                return
+            result.connected_s = time.perf_counter() - opened
+            listener = asyncio.create_task(receiver(ws))
+            ends_at = time.perf_counter() + duration
+            offset = 0
+            try:
+                while time.perf_counter() < ends_at and not listener.done():
+                    # Talk: real-time paced chunks
+                    started = time.perf_counter()
+                    for index in range(turn_chunks):
+                        chunk = pcm[offset:offset + chunk_bytes]
+                        if len(chunk) < chunk_bytes:
+                            offset = 0
+                            chunk = pcm[:chunk_bytes]
+                        offset += chunk_bytes
+                        await ws.send(chunk)
+                        next_at = started + (index + 1) * chunk_ms / 1000
+                        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+                    # Listen: wait for the full reply
+                    turn_done.clear()
+                    state["end_turn_at"] = time.perf_counter()
+                    await ws.send(json.dumps({"type": "end_turn"}))
+                    await asyncio.wait_for(turn_done.wait(), timeout=30)
+                    result.turns += 1
+                await ws.send(json.dumps({"type": "stop"}))
+            finally:
+                listener.cancel()
+    except Exception as e:
+        result.error = result.error or f"{type(e).__name__}: {e}"
+
+
+# ═══════════════════════════════════════════════════════════════════
+# REPORTING
+# ═══════════════════════════════════════════════════════════════════
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def jitter_ms(gaps: List[float]) -> Optional[float]:
+    """Mean absolute difference between successive inter-chunk gaps (RFC 3550 style)"""
+    if len(gaps) < 2:
+        return None
+    return round(statistics.fmean(abs(b - a) for a, b in zip(gaps, gaps[1:])) * 1000, 3)
+
+
+def summarize(results: List[SessionResult], wall: float, server: Dict[str, Any]) -> Dict[str, Any]:
+    ok = [r for r in results if r.connected_s is not None and not r.error]
+    gaps = [g for r in results for g in r.gaps_s]
+    return {
+        "sessions": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "errors": sorted({r.error for r in results if r.error})[:5],
+        "turns": sum(r.turns for r in results),
+        "wall_seconds": round(wall, 2),
+        "time_to_connected": percentiles([r.connected_s for r in results if r.connected_s is not None]),
+        "time_to_first_audio": percentiles([v for r in results for v in r.first_audio_s]),
+        "inter_chunk_gap": percentiles(gaps),
+        "inter_chunk_jitter_ms": jitter_ms(gaps),
+        "server": server
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("=" * 64)
+    print(f"🎧 Voice load: {report['succeeded']}/{report['sessions']} sessions ok, "
+          f"{report['turns']} turns in {report['wall_seconds']}s")
+    for key in ("time_to_connected", "time_to_first_audio", "inter_chunk_gap"):
+        stats = report[key]
+        print(f"  {key:<22} n={stats['count']:<6} p50={stats['p50_ms']}ms "
+              f"p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+    print(f"  inter_chunk_jitter     {report['inter_chunk_jitter_ms']}ms")
+    server = report["server"]
+    if server:
+        print(f"  server cpu/session     {server['cpu_percent_per_session']}% of one core")
+        print(f"  server rss/session     {server['rss_kb_per_session']} KB "
+              f"(peak {server['rss_peak_mb']} MB)")
+    for error in report["errors"]:
+        print(f"  ❌ {error}")
+    print("=" * 64)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# MAIN
+# ═══════════════════════════════════════════════════════════════════
+
+async def run_load(args, url: str, sampler: Optional[ProcessSampler]) -> Dict[str, Any]:
+    if args.pcm:
+        with open(args.pcm, "rb") as f:
+            pcm = f.read()
+    else:
+        pcm = synthetic_pcm(args.turn_seconds)
+
+    results = [SessionResult() for _ in range(args.sessions)]
+    cpu_before = sampler.cpu_seconds() if sampler else 0.0
+    rss_before = sampler.rss_bytes() if sampler else 0
+    rss_peak = rss_before
+
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(run_session(
+            f"{url}/ws/voice/{args.agent}",
+            pcm,
+            args.chunk_ms,
+            args.turn_seconds,
+            args.duration,
+            args.ramp * index / max(1, args.sessions),
+            results[index]
+        ))
+        for index in range(args.sessions)
+    ]
+    while not all(task.done() for task in tasks):
+        await asyncio.sleep(0.5)
+        if sampler:
+            rss_peak = max(rss_peak, sampler.rss_bytes())
+    wall = time.perf_counter() - started
+
+    server: Dict[str, Any] = {}
+    if sampler:
+        cpu = sampler.cpu_seconds() - cpu_before
+        server = {
+            "cpu_seconds": round(cpu, 2),
+            "cpu_percent_per_session": round(cpu / wall / args.sessions * 100, 3),
+            "rss_kb_per_session": round((rss_peak - rss_before) / args.sessions / 1024, 1),
+            "rss_peak_mb": round(rss_peak / 1024 / 1024, 1)
+        }
+    return summarize(results, wall, server)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless load test for /ws/voice")
+    parser.add_argument("--agent", default="sofra")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent callers")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per caller")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds to start all callers")
+    parser.add_argument("--chunk-ms", type=int, default=64, help="client chunk size (64 ms = 1024 frames)")
+    parser.add_argument("--turn-seconds", type=float, default=2.0, help="speech per user turn")
+    parser.add_argument("--pcm", help="raw PCM16 16 kHz mono file to replay")
+    parser.add_argument("--url", help="target server (ws://host:port); default: spawn a local fake-upstream worker")
+    parser.add_argument("--reply-seconds", type=float, default=2.0, help="fake model reply length")
+    parser.add_argument("--first-audio-delay", type=float, default=0.2, help="fake model think time")
+    parser.add_argument("--tool-every", type=int, default=0, help="fake model calls a tool every Nth turn")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    server_proc = None
+    sampler = None
+    url = args.url
+    if not url:
+        port = _free_port()
+        env = dict(os.environ)
+        env["GEMINI_BACKEND"] = "fake"
+        env["FAKE_LIVE_REPLY_SECONDS"] = str(args.reply_seconds)
+        env["FAKE_LIVE_FIRST_AUDIO_DELAY"] = str(args.first_audio_delay)
+        env["FAKE_LIVE_TOOL_EVERY"] = str(args.tool_every)
+        server_proc = subprocess.Popen(
+            [sys.executable, "-m", "bench.voice_load", "--serve", "--port", str(port)],
+            env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        _wait_for_port(port)
+        sampler = ProcessSampler(server_proc.pid)
+        url = f"ws://127.0.0.1:{port}"
+
+    try:
+        report = asyncio.run(run_load(args, url, sampler))
+    finally:
+        if server_proc:
+            server_proc.terminate()
+            server_proc.wait(timeout=10)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Axiom RESET - Voice Resumption Benchmark
+Reconnect latency and memory cost of parked voice sessions
+
+Starts a fake-upstream uvicorn worker (see bench/voice_load.py), then:
+
+    1. opens N sessions and measures time-to-connected (fresh handshake)
+    2. asks each for a reply and drops the socket abruptly mid-reply
+       (TCP abort, no close frame), so the server parks the session
+    3. waits --parked-seconds while the replies buffer server-side, and
+       samples server RSS and /voice/resume (buffered bytes per session)
+    4. reconnects every session with its resume token and measures
+       time-to-connected (resumed) and how much output was replayed
+
+Usage:
+    python -m bench.voice_resume --sessions 50
+    python -m bench.voice_resume --sessions 200 --parked-seconds 5 --json resume.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict
+
+from bench.voice_load import ProcessSampler, _free_port, _wait_for_port, percentiles
+
+
+async def open_session(url: str) -> Dict[str, Any]:
+    """Connect, start a reply, then drop the socket without a close frame"""
+    import websockets
+
+    started = time.perf_counter()
+    ws = await websockets.connect(url, max_size=None)
+    event = json.loads(await ws.recv())
+    connected_s = time.perf_counter() - started
+    await ws.send(json.dumps({"type": "text_input", "content": "أهلاً"}))
+    # Take the first bit of the reply, then vanish like a phone losing signal
+    await ws.recv()
+    ws.transport.abort()
+    return {"token": event.get("session_token"), "connected_s": connected_s}
+
+
+async def resume_session(url: str, token: str) -> Dict[str, Any]:
+    """Reconnect with the token and read the replayed output up to turn_complete"""
+    import websockets
+
+    started = time.perf_counter()
+    async with websockets.connect(url, additional_headers={"X-Resume-Token": token}, max_size=None) as ws:
+        event = json.loads(await ws.recv())
+        connected_s = time.perf_counter() - started
+        audio_bytes = 0
+        while True:
+            message = await asyncio.wait_for(ws.recv(), timeout=30)
+            if isinstance(message, bytes):
+                audio_bytes += len(message)
+            elif json.loads(message).get("type") == "turn_complete":
+                break
+        await ws.send(json.dumps({"type": "stop"}))
+    return {
+        "resumed": event.get("resumed", False),
+        "connected_s": connected_s,
+        "replayed": event.get("replayed", 0),
+        "missed": event.get("missed", 0),
+        "audio_bytes": audio_bytes
+    }
+
+
+def _get_json(http_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(http_url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+async def run(args: argparse.Namespace, port: int, sampler: ProcessSampler) -> Dict[str, Any]:
+    url = f"ws://127.0.0.1:{port}/ws/voice/{args.agent}"
+    http = f"http://127.0.0.1:{port}"
+
+    rss_idle = sampler.rss_bytes()
+    opened = await asyncio.gather(*(open_session(url) for _ in range(args.sessions)))
+    await asyncio.sleep(args.parked_seconds)
+    rss_parked = sampler.rss_bytes()
+    parked = _get_json(f"{http}/voice/resume")
+
+    resumed = await asyncio.gather(
+        *(resume_session(url, session["token"]) for session in opened), return_exceptions=True
+    )
+    ok = [r for r in resumed if isinstance(r, dict) and r["resumed"]]
+    errors = [str(r) for r in resumed if isinstance(r, Exception)]
+    count = max(parked["parked"], 1)
+    return {
+        "sessions": args.sessions,
+        "parked": parked["parked"],
+        "resumed": len(ok),
+        "errors": errors[:5],
+        "fresh_connect": percentiles([s["connected_s"] for s in opened]),
+        "resume_connect": percentiles([r["connected_s"] for r in ok]),
+        "replayed_messages_avg": round(sum(r["replayed"] for r in ok) / len(ok), 1) if ok else None,
+        "missed_messages": sum(r["missed"] for r in ok),
+        "buffered_kb_per_parked": round(parked["buffered_bytes"] / count / 1024, 1),
+        "rss_kb_per_parked": round((rss_parked - rss_idle) / count / 1024, 1),
+        "server_resume_latency_ms": _get_json(f"{http}/voice/resume")["resume_latency_ms"]
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("=" * 64)
+    print(f"🅿️ Voice resume: {report['resumed']}/{report['sessions']} sessions resumed "
+          f"({report['parked']} parked)")
+    for key in ("fresh_connect", "resume_connect"):
+        stats = report[key]
+        print(f"  {key:<22} n={stats['count']:<6} p50={stats['p50_ms']}ms "
+              f"p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms")
+    print(f"  replayed per session   {report['replayed_messages_avg']} messages "
+          f"({report['missed_messages']} evicted from full buffers)")
+    print(f"  buffered per parked    {report['buffered_kb_per_parked']} KB")
+    print(f"  server rss per parked  {report['rss_kb_per_parked']} KB")
+    if report["errors"]:
+        print(f"  errors                 {report['errors']}")
+    print("=" * 64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reconnect latency and memory of parked voice sessions")
+    parser.add_argument("--agent", default="sofra")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--parked-seconds", type=float, default=2.0, help="time between drop and reconnect")
+    parser.add_argument("--reply-seconds", type=float, default=2.0, help="fake model reply length")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    port = _free_port()
+    env = dict(os.environ)
+    env["GEMINI_BACKEND"] = "fake"
+    env["FAKE_LIVE_REPLY_SECONDS"] = str(args.reply_seconds)
+    env.setdefault("VOICE_RESUME_GRACE_SECONDS", str(max(15.0, args.parked_seconds * 3)))
+    env.setdefault("VOICE_RESUME_MAX_PARKED", str(args.sessions))
+    env.setdefault("VOICE_ADMISSION_MAX_CONCURRENCY", str(args.sessions * 2))
+    env.setdefault("VOICE_ADMISSION_MAX_PER_AGENT", str(args.sessions * 2))
+    server_proc = subprocess.Popen(
+        [sys.executable, "-m", "bench.voice_load", "--serve", "--port", str(port)],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    try:
+        _wait_for_port(port)
+        report = asyncio.run(run(args, port, ProcessSampler(server_proc.pid)))
+    finally:
+        server_proc.terminate()
+        server_proc.wait(timeout=10)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,12 @@ Axiom RESET - Voice Test Client
 اختبار التحدث مع الوكلاء من التيرمينال
 
 Usage:
-    python test_voice_client.py [agent_id]
+    python test_voice_client.py [agent_id] [encoding]
     
 Examples:
     python test_voice_client.py sofra
     python test_voice_client.py tajer
+    python test_voice_client.py sofra adpcm   # ضغط الصوت (pcm16 / mulaw / adpcm / opus)
 """
 
 import asyncio
@@ -16,16 +17,22 @@ import pyaudio
 import sys
 import json
 
+from api.codecs import create_codec
+
 # إعدادات الصوت (يجب أن تطابق إعدادات Gemini Live API)
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 CHUNK = 1024
 
-async def voice_chat(agent_id: str = "sofra"):
+async def voice_chat(agent_id: str = "sofra", encoding: str = "pcm16"):
     uri = f"ws://localhost:8000/ws/voice/{agent_id}"
     p = pyaudio.PyAudio()
     
+    # نفس الـ codec اللي على السيرفر (حالة مستقلة لكل اتجاه)
+    uplink_codec = create_codec(encoding, RATE)
+    downlink_codec = create_codec(encoding, RATE)
+    
     # فتح المايك للتسجيل
     input_stream = p.open(
         format=FORMAT,
@@ -49,6 +56,14 @@ async def voice_chat(agent_id: str = "sofra"):
     try:
         async with websockets.connect(uri) as websocket:
             print(f"✅ Connected to {agent_id}!")
+            
+            # السيرفر يحول الصوت لمعدل التشغيل بتاعنا (Gemini بيرد بـ 24kHz)
+            await websocket.send(json.dumps({
+                "type": "audio_format",
+                "input_rate": RATE,
+                "output_rate": RATE,
+                "encoding": encoding
+            }))
             print("🎤 Speak now (Press Ctrl+C to stop)...")
             print("-" * 40)
             
@@ -58,8 +73,9 @@ async def voice_chat(agent_id: str = "sofra"):
                     while True:
                         # قراءة البيانات من المايك
                         data = input_stream.read(CHUNK, exception_on_overflow=False)
-                        # إرسال البيانات الخام (PCM Int16)
-                        await websocket.send(data)
+                        # إرسال البيانات (PCM Int16 أو مضغوطة)
+                        for packet in uplink_codec.encode(data):
+                            await websocket.send(packet)
                         await asyncio.sleep(0.01)
                 except asyncio.CancelledError:
                     pass
@@ -72,7 +88,7 @@ async def voice_chat(agent_id: str = "sofra"):
                     async for message in websocket:
                         if isinstance(message, bytes):
                             # تشغيل الصوت الراجع
-                            output_stream.write(message)
+                            output_stream.write(downlink_codec.decode(message))
                             print(f"🔊 Audio: {len(message)} bytes", end="\r")
                         else:
                             # رسالة JSON
@@ -81,6 +97,11 @@ async def voice_chat(agent_id: str = "sofra"):
                                 print(f"✅ {data.get('message', 'Connected')}")
                             elif data.get("type") == "text":
                                 print(f"\n💬 {agent_id}: {data.get('content', '')}")
+                            elif data.get("type") == "audio_format":
+                                print(
+                                    f"🎚️ Audio: in={data.get('input_rate')}Hz "
+                                    f"out={data.get('output_rate')}Hz codec={data.get('encoding')}"
+                                )
                             elif data.get("type") == "turn_complete":
                                 print("\n--- انتهى الرد ---")
                             elif data.get("type") == "error":
@@ -108,6 +129,8 @@ async def voice_chat(agent_id: str = "sofra"):
         print(f"❌ Cannot connect to server. Make sure the server is running:")
         print(f"   uvicorn api.main:app --reload --host 0.0.0.0 --port 8000")
     finally:
+        if encoding != "pcm16":
+            print(f"\n📊 Codec CPU: mic={uplink_codec.stats()} speaker={downlink_codec.stats()}")
         input_stream.stop_stream()
         input_stream.close()
         output_stream.stop_stream()
@@ -117,12 +140,13 @@ async def voice_chat(agent_id: str = "sofra"):
 
 if __name__ == "__main__":
     agent = sys.argv[1] if len(sys.argv) > 1 else "sofra"
+    encoding = sys.argv[2] if len(sys.argv) > 2 else "pcm16"
     
     print("=" * 40)
     print(f"🎤 Axiom RESET Voice Test - {agent.upper()}")
     print("=" * 40)
     
     try:
-        asyncio.run(voice_chat(agent))
+        asyncio.run(voice_chat(agent, encoding))
     except KeyboardInterrupt:
         print("\n\n🛑 Session closed. مع السلامة!")
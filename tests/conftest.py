@@ -0,0 +1,33 @@
+"""
+Shared test setup: every test runs against the offline fake Gemini
+backend (api/fake_live.py). Settings are read at import time, so the
+environment is set here, before any `api` module is imported.
+"""
+
+import os
+
+os.environ["GEMINI_BACKEND"] = "fake"
+os.environ.setdefault("AGENT_CONFIG_WATCH_SECONDS", "0")
+os.environ.setdefault("VOICE_POOL_MIN_SIZE", "0")
+os.environ.setdefault("INSTRUCTION_CACHE_ENABLED", "false")
+os.environ.setdefault("CHAT_HEDGE_ENABLED", "false")
+
+import pytest
+
+from api.clients import CHAT_API_VERSION, LIVE_API_VERSION, gemini_clients
+from api.fake_live import FakeLiveClient, FakeLiveScript
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """Install a fake client with the given script for chat and Live calls (removed after the test)"""
+
+    def install(**script) -> FakeLiveClient:
+        client = FakeLiveClient(FakeLiveScript(**script))
+        for version in (CHAT_API_VERSION, LIVE_API_VERSION):
+            # setitem first, so teardown puts back whatever client was there before
+            monkeypatch.setitem(gemini_clients._clients, version, client)
+            gemini_clients.install(version, client)
+        return client
+
+    return install
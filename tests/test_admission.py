@@ -0,0 +1,120 @@
+"""AdmissionController: weighted fair queuing and queue deadlines"""
+
+import asyncio
+
+import pytest
+
+from api.admission import AdmissionController, AdmissionRejected
+
+
+def _controller(global_limit=1, per_agent_limit=1, queue_timeout=5.0, max_queue=100):
+    return AdmissionController(
+        "test", global_limit=global_limit, per_agent_limit=per_agent_limit,
+        queue_timeout=queue_timeout, max_queue=max_queue
+    )
+
+
+async def _hold(controller, agent_id, order, seconds=0.01):
+    async with controller.slot(agent_id):
+        order.append(agent_id)
+        await asyncio.sleep(seconds)
+
+
+def test_slots_alternate_between_busy_and_light_agents():
+    async def scenario():
+        controller, order = _controller(), []
+        tasks = [asyncio.create_task(_hold(controller, "busy", order)) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(_hold(controller, "light", order)) for _ in range(2)]
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    # The light agent's requests are served within the first few slots, not after the backlog
+    assert order.index("light") <= 2
+    assert [i for i, agent in enumerate(order) if agent == "light"][-1] <= 4
+
+
+def test_weights_split_contended_capacity():
+    async def scenario():
+        controller, order = _controller(), []
+        controller.set_weights({"heavy": 2.0, "normal": 1.0})
+        tasks = [
+            asyncio.create_task(_hold(controller, agent_id, order, 0.005))
+            for agent_id in ("heavy", "normal") for _ in range(12)
+        ]
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    first = order[1:13]  # skip the uncontended first grant
+    assert first.count("heavy") == pytest.approx(2 * first.count("normal"), abs=2)
+
+
+def test_queue_timeout_rejects():
+    async def scenario():
+        controller = _controller(queue_timeout=0.05)
+        holder = asyncio.create_task(_hold(controller, "sofra", [], 0.5))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("sofra")
+        holder.cancel()
+        return rejected.value, controller
+
+    rejected, controller = asyncio.run(scenario())
+    assert rejected.reason == "queue_timeout"
+    assert controller.stats()["agents"]["sofra"]["rejected"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        controller = _controller(max_queue=1)
+        holder = asyncio.create_task(_hold(controller, "sofra", [], 0.2))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(controller.acquire("sofra"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("sofra")
+        await asyncio.gather(holder, queued)
+        return rejected.value
+
+    assert asyncio.run(scenario()).reason == "queue_full"
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        controller = _controller()
+        holder = asyncio.create_task(_hold(controller, "sofra", [], 0.05))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(controller.acquire("sofra"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(holder, waiter, return_exceptions=True)
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.active == 0
+    assert controller.stats()["queued"] == 0
+
+
+def test_grant_racing_the_deadline_does_not_leak_a_slot(monkeypatch):
+    async def granted_then_timed_out(future, timeout):
+        # wait_for on Python 3.12+ can raise TimeoutError after the future resolved
+        controller.release("sofra")
+        assert future.done() and not future.cancelled()
+        raise asyncio.TimeoutError
+
+    controller = _controller()
+
+    async def scenario():
+        await controller.acquire("sofra")
+        monkeypatch.setattr(asyncio, "wait_for", granted_then_timed_out)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("sofra")
+        monkeypatch.undo()
+        # Full capacity is still available afterwards
+        await asyncio.wait_for(controller.acquire("sofra"), 0.1)
+        controller.release("sofra")
+
+    asyncio.run(scenario())
+    assert controller.active == 0
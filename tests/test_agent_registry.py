@@ -0,0 +1,131 @@
+"""Agent config registry: hot reload, copy-on-write snapshots and tool declarations"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents.core.base_agent import ADKTool, AgentRegistry
+from api.agent_registry import AgentConfigRegistry
+from api.tool_dispatch import ToolDispatchTable
+
+
+def _declaration(name):
+    return ({"name": name, "description": "", "parameters": {}},)
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    """An ADK agent "probe" whose tool snapshot the test can swap"""
+    tool = ADKTool(name="lookup", description="", description_ar="").set_handler(lambda: {})
+    agent = SimpleNamespace(
+        tools=[tool],
+        instruction="probe",
+        voice_name="Kore",
+        snapshot=SimpleNamespace(declarations=_declaration("lookup"), version=1)
+    )
+    agent.tool_snapshot = lambda: agent.snapshot
+    monkeypatch.setitem(AgentRegistry._agents, "probe", agent)
+    return agent
+
+
+@pytest.fixture
+def registry(tmp_path, probe):
+    (tmp_path / "probe.json").write_text(json.dumps({"instruction": "probe"}))
+    return AgentConfigRegistry(path=str(tmp_path), watch_interval=0, tools=ToolDispatchTable())
+
+
+def test_loaded_config_declares_the_agent_tools(registry):
+    assert [tool["name"] for tool in registry.get("probe").tools] == ["lookup"]
+
+
+def test_tool_change_publishes_a_new_config(registry, probe):
+    published = []
+    registry.subscribe(published.append)
+    before = registry.get("probe")
+
+    async def scenario():
+        probe.snapshot = SimpleNamespace(declarations=_declaration("lookup_v2"), version=2)
+        registry.tool_dispatch.get("probe")
+        await asyncio.sleep(0)  # subscribers are notified from a task
+
+    asyncio.run(scenario())
+    after = registry.get("probe")
+
+    assert after is not before
+    assert [tool["name"] for tool in before.tools] == ["lookup"]  # sessions on it are unaffected
+    assert [tool["name"] for tool in after.tools] == ["lookup_v2"]
+    assert after.version == before.version
+    assert [snapshot.configs["probe"] for snapshot in published] == [after]
+
+
+def test_unchanged_tools_keep_the_published_config(registry):
+    before = registry.get("probe")
+    registry.tool_dispatch.get("probe")
+    assert registry.load() is False
+    assert registry.get("probe") is before
+
+
+def test_edited_file_swaps_in_a_new_config(registry, tmp_path):
+    published = []
+    registry.subscribe(published.append)
+    before = registry.get("probe")
+    version = registry.version
+
+    (tmp_path / "probe.json").write_text(json.dumps({"instruction": "probe v2", "weight": 2}))
+    assert asyncio.run(registry.reload()) is True
+
+    after = registry.get("probe")
+    assert after is not before
+    assert (before.instruction, after.instruction) == ("probe", "probe v2")
+    assert after.weight == 2
+    assert after.version != before.version
+    assert registry.version == version + 1
+    assert [snapshot.version for snapshot in published] == [registry.version]
+
+
+def test_new_and_removed_files(registry, tmp_path):
+    (tmp_path / "helper.json").write_text(json.dumps({"instruction": "helper"}))
+    asyncio.run(registry.reload())
+    assert set(registry.snapshot.configs) == {"probe", "helper"}
+
+    (tmp_path / "helper.json").unlink()
+    asyncio.run(registry.reload())
+    assert set(registry.snapshot.configs) == {"probe"}
+
+
+def test_invalid_file_keeps_the_previous_version(registry, tmp_path):
+    before = registry.get("probe")
+    (tmp_path / "probe.json").write_text("{not json")
+
+    assert asyncio.run(registry.reload()) is False
+    assert registry.get("probe") is before
+    assert registry.invalid == 1
+    assert "probe.json" in registry.last_error
+
+
+def test_snapshot_is_read_only(registry):
+    with pytest.raises(TypeError):
+        registry.snapshot.configs["other"] = registry.get("probe")
+    with pytest.raises(AttributeError):
+        registry.get("probe").instruction = "edited"
+
+
+def test_watcher_picks_up_an_edit(tmp_path, probe):
+    (tmp_path / "probe.json").write_text(json.dumps({"instruction": "probe"}))
+    registry = AgentConfigRegistry(path=str(tmp_path), watch_interval=0.02, tools=ToolDispatchTable())
+
+    async def scenario():
+        registry.start()
+        try:
+            (tmp_path / "probe.json").write_text(json.dumps({"instruction": "watched edit"}))
+            for _ in range(100):
+                if registry.get("probe").instruction == "watched edit":
+                    return True
+                await asyncio.sleep(0.02)
+            return False
+        finally:
+            await registry.aclose()
+
+    assert asyncio.run(scenario())
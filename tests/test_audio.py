@@ -0,0 +1,110 @@
+"""Streaming resampler continuity and the voice activity gate"""
+
+import numpy as np
+import pytest
+
+from api.audio import StreamingResampler, VADConfig, VoiceActivityGate
+
+
+def _tone(seconds: float, rate: int, freq: float = 440.0, amplitude: float = 8000) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2").tobytes()
+
+
+def _silence(seconds: float, rate: int = 16000) -> bytes:
+    return bytes(int(seconds * rate) * 2)
+
+
+def _chunks(data: bytes, sizes):
+    """Split `data` into chunks cycling through `sizes` (odd sizes split samples)"""
+    out, position, index = [], 0, 0
+    while position < len(data):
+        size = sizes[index % len(sizes)]
+        out.append(data[position:position + size])
+        position += size
+        index += 1
+    return out
+
+
+@pytest.mark.parametrize("in_rate, out_rate", [(16000, 24000), (24000, 16000), (48000, 16000), (24000, 8000)])
+def test_resampling_in_chunks_matches_one_pass(in_rate, out_rate):
+    audio = _tone(0.5, in_rate)
+    whole = np.frombuffer(StreamingResampler(in_rate, out_rate).process(audio), dtype="<i2")
+
+    chunked = StreamingResampler(in_rate, out_rate)
+    pieces = b"".join(chunked.process(chunk) for chunk in _chunks(audio, [321, 640, 17, 1279, 2]))
+    pieces = np.frombuffer(pieces, dtype="<i2")
+
+    assert abs(len(pieces) - len(whole)) <= 1
+    n = min(len(pieces), len(whole))
+    # Same stream up to float rounding: no clicks or dropped samples at chunk boundaries
+    assert np.max(np.abs(pieces[:n].astype(int) - whole[:n])) <= 1
+    assert len(whole) == pytest.approx(len(audio) // 2 * out_rate / in_rate, abs=2)
+
+
+def test_downsampling_filters_content_above_the_new_nyquist():
+    resampler = StreamingResampler(48000, 16000)
+    passband = np.frombuffer(resampler.process(_tone(0.2, 48000, freq=1000)), dtype="<i2")
+    stopband = np.frombuffer(
+        StreamingResampler(48000, 16000).process(_tone(0.2, 48000, freq=12000)), dtype="<i2"
+    )
+    assert np.abs(stopband[100:]).max() < 0.1 * np.abs(passband[100:]).max()
+
+
+def test_passthrough_returns_the_input():
+    audio = _tone(0.1, 16000)
+    assert StreamingResampler(16000, 16000).process(audio) is audio
+
+
+def _gate(**overrides) -> VoiceActivityGate:
+    return VoiceActivityGate(VADConfig(**overrides), sample_rate=16000)
+
+
+def test_silence_is_dropped_and_speech_forwarded():
+    gate = _gate(pre_roll_ms=0, hangover_ms=0)
+
+    forwarded, _ = gate.process(_silence(0.2))
+    assert forwarded == b""
+    assert gate.frames_dropped == 10
+
+    speech = _tone(0.2, 16000)
+    forwarded, _ = gate.process(speech)
+    assert forwarded == speech
+    assert gate.frames_forwarded == 10
+
+
+def test_pre_roll_and_hangover_keep_the_edges_of_speech():
+    gate = _gate(pre_roll_ms=60, hangover_ms=100)
+    frame = gate.frame_bytes
+
+    gate.process(_silence(0.2))
+    forwarded, _ = gate.process(_tone(0.1, 16000))
+    assert len(forwarded) == 3 * frame + 5 * frame  # pre-roll, then the speech
+
+    forwarded, _ = gate.process(_silence(0.2))
+    assert len(forwarded) == 5 * frame  # hangover only
+
+
+def test_partial_frames_carry_over_between_chunks():
+    gate = _gate(pre_roll_ms=0, hangover_ms=0)
+    speech = _tone(0.1, 16000)
+    forwarded = b"".join(gate.process(chunk)[0] for chunk in _chunks(speech, [100, 333, 7]))
+    assert forwarded == speech
+
+
+def test_auto_end_turn_fires_once_after_the_silence_window():
+    gate = _gate(auto_end_turn=True, end_turn_silence_ms=200, hangover_ms=0, pre_roll_ms=0)
+    gate.process(_tone(0.1, 16000))
+
+    ends = [gate.process(_silence(0.02))[1] for _ in range(20)]
+
+    assert ends.count(True) == 1
+    assert ends.index(True) == 9  # 10th silent frame = 200 ms
+    assert gate.auto_end_turns == 1
+
+
+def test_client_end_turn_suppresses_the_auto_end():
+    gate = _gate(auto_end_turn=True, end_turn_silence_ms=100, hangover_ms=0)
+    gate.process(_tone(0.1, 16000))
+    gate.reset_turn()
+    assert not any(gate.process(_silence(0.02))[1] for _ in range(10))
@@ -0,0 +1,114 @@
+"""POST /agents/{agent_id}/chat under upstream admission control"""
+
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from api.admission import chat_admission
+from api.chat_cache import chat_cache
+from api.main import app, chat_batcher
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """Tight chat admission limits, restored after the test"""
+
+    def configure(global_limit: int, queue_timeout: float, max_queue: int = 1000) -> None:
+        monkeypatch.setattr(chat_admission, "global_limit", global_limit)
+        monkeypatch.setattr(chat_admission, "per_agent_limit", global_limit)
+        monkeypatch.setattr(chat_admission, "queue_timeout", queue_timeout)
+        monkeypatch.setattr(chat_admission, "max_queue", max_queue)
+
+    monkeypatch.setattr(chat_cache, "max_entries", 0)
+    return configure
+
+
+async def _post(client: httpx.AsyncClient, agent_id: str, text: str, finished: List[str]):
+    """POST a chat message; `finished` records the order responses come back in"""
+    response = await client.post(f"/agents/{agent_id}/chat", json={"text": text})
+    finished.append(agent_id if response.status_code == 200 else f"{agent_id}:{response.status_code}")
+    return response
+
+
+def _rejected(agent_id: str) -> int:
+    return chat_admission.stats()["agents"].get(agent_id, {}).get("rejected", 0)
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.parametrize("batch_window_ms", [0, 5])
+def test_light_agent_is_not_starved_by_busy_agent(fake_upstream, admission, monkeypatch, batch_window_ms):
+    fake_upstream(chat_latency=0.05, chat_token_delay=0)
+    admission(global_limit=2, queue_timeout=30)
+    monkeypatch.setattr(chat_batcher, "window", batch_window_ms / 1000)
+
+    finished: List[str] = []
+
+    async def scenario():
+        async with _client() as client:
+            busy = [
+                asyncio.create_task(_post(client, "sofra", f"طلب رقم {i}", finished))
+                for i in range(40)
+            ]
+            # tajer arrives once sofra has filled both slots and queued the rest
+            while chat_admission.stats()["queued"] < 30:
+                await asyncio.sleep(0.01)
+            light = await _post(client, "tajer", "عايز أبيع منتج", finished)
+            busy_results = await asyncio.gather(*busy)
+        return light, busy_results
+
+    light, busy_results = asyncio.run(scenario())
+
+    assert light.json()["status"] == "success"
+    assert all(response.json()["status"] == "success" for response in busy_results)
+    # Fair queuing serves tajer at the next free slot, ahead of sofra's backlog
+    assert finished.index("tajer") < 6
+    assert finished.count("sofra") == 40
+
+
+def test_queue_timeout_rejects_with_busy_response(fake_upstream, admission):
+    fake_upstream(chat_latency=0.5, chat_token_delay=0)
+    admission(global_limit=1, queue_timeout=0.05)
+
+    finished: List[str] = []
+
+    async def scenario():
+        async with _client() as client:
+            return await asyncio.gather(*(
+                _post(client, "sofra", f"سؤال {i}", finished) for i in range(3)
+            ))
+
+    rejected_before = _rejected("sofra")
+    results = asyncio.run(scenario())
+    statuses = sorted(response.status_code for response in results)
+    rejected = [response for response in results if response.status_code == 503]
+
+    assert statuses == [200, 503, 503]
+    for response in rejected:
+        body = response.json()
+        assert body["status"] == "busy"
+        assert body["error"] == "queue_timeout"
+        assert response.headers["Retry-After"] == "1"
+    # Rejected at the deadline, before the admitted call's upstream reply
+    assert finished == ["sofra:503", "sofra:503", "sofra"]
+    assert _rejected("sofra") - rejected_before == 2
+
+
+def test_full_queue_rejects_immediately(fake_upstream, admission):
+    fake_upstream(chat_latency=0.3, chat_token_delay=0)
+    admission(global_limit=1, queue_timeout=5, max_queue=1)
+
+    async def scenario():
+        async with _client() as client:
+            return await asyncio.gather(*(
+                _post(client, "sofra", f"سؤال {i}", []) for i in range(3)
+            ))
+
+    results = asyncio.run(scenario())
+    errors = sorted(response.json().get("error", "") for response in results)
+
+    assert errors == ["", "", "queue_full"]
@@ -0,0 +1,89 @@
+"""Chat response cache: Arabic normalization and the similar tier's guards"""
+
+import pytest
+
+from api.chat_cache import ResponseCache, normalize_arabic
+
+INSTRUCTION = "أنت صفرة، مساعد طلب الطعام"
+
+
+@pytest.mark.parametrize("text, normalized", [
+    # alef variants
+    ("أحمد", "احمد"),
+    ("إسلام", "اسلام"),
+    ("آكل", "اكل"),
+    ("ٱلمطعم", "المطعم"),
+    # alef maqsura -> ya, ta marbuta -> ha, hamza seats
+    ("مستشفى", "مستشفي"),
+    ("قهوة", "قهوه"),
+    ("سؤال", "سوال"),
+    ("مسائل", "مسايل"),
+    # tashkeel and tatweel
+    ("مُحَمَّد", "محمد"),
+    ("شكــــرا", "شكرا"),
+    # Arabic-Indic and Persian digits
+    ("طاولة ١٢", "طاوله 12"),
+    ("الساعة ۸", "الساعه 8"),
+    # punctuation, case and whitespace
+    ("مرحبا!!  يا   صديقي؟", "مرحبا يا صديقي"),
+    ("Menu, PLEASE", "menu please"),
+])
+def test_normalization(text, normalized):
+    assert normalize_arabic(text) == normalized
+
+
+def _cache(similarity: float = 0.3) -> ResponseCache:
+    # A low trigram threshold, so only the number / word guards keep these apart
+    return ResponseCache(max_entries=100, ttl=60, similarity=similarity)
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("أريد قهوة بالحليب", "اريد قهوه بالحليب"),
+    ("مُحَمَّد عايز المنيو", "محمد عايز المنيو!"),
+    ("طاولة رقم ١٢", "طاولة رقم 12"),
+])
+def test_spelling_variants_hit_exactly(stored, asked):
+    cache = _cache()
+    cache.put("sofra", INSTRUCTION, stored, "رد")
+    assert cache.get("sofra", INSTRUCTION, asked) == ("رد", "exact")
+
+
+@pytest.mark.parametrize("stored, asked", [
+    # a number differs
+    ("احجز طاولة الساعة 8 مساء", "احجز طاولة الساعة 9 مساء"),
+    ("عايز اطلب 2 بيتزا مارجريتا", "عايز اطلب 3 بيتزا مارجريتا"),
+    ("طاولة رقم ١٢ من فضلك", "طاولة رقم 13 من فضلك"),
+    ("احجز طاولة خمسة اشخاص", "احجز طاولة ستة اشخاص"),
+    ("احجز طاولة لاربعة اشخاص الساعة 8", "احجز طاولة لاربعة اشخاص"),
+    # a named entity differs
+    ("عايز اشوف منيو مطعم الشبراوي", "عايز اشوف منيو مطعم الطيب"),
+    ("اقرب فرع في المعادي", "اقرب فرع في الزمالك"),
+    ("اطلب وجبة كبيرة من مطعم كنتاكي", "اطلب وجبة كبيرة من مطعم هارديز"),
+])
+def test_near_duplicates_with_different_facts_do_not_hit(stored, asked):
+    cache = _cache()
+    cache.put("sofra", INSTRUCTION, stored, "رد")
+    assert cache.get("sofra", INSTRUCTION, asked) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("عايز اشوف المنيو بتاع مطعم الشبراوي", "عايز اشوف المنيوو بتاع مطعم الشبراوي"),
+    ("احجز طاولة الساعة 8 مساء", "احجز طاوله الساعة 8 مسائ"),
+])
+def test_typos_hit_the_similar_tier(stored, asked):
+    cache = _cache(similarity=0.6)
+    cache.put("sofra", INSTRUCTION, stored, "رد")
+    assert cache.get("sofra", INSTRUCTION, asked) == ("رد", "similar")
+
+
+def test_similar_tier_is_off_by_default():
+    cache = ResponseCache(max_entries=100, ttl=60)
+    cache.put("sofra", INSTRUCTION, "عايز اشوف المنيو", "رد")
+    assert cache.get("sofra", INSTRUCTION, "عايز اشوف المنيوو") is None
+
+
+def test_entries_are_per_agent_and_instruction():
+    cache = _cache()
+    cache.put("sofra", INSTRUCTION, "مرحبا", "رد")
+    assert cache.get("tajer", INSTRUCTION, "مرحبا") is None
+    assert cache.get("sofra", INSTRUCTION + " (v2)", "مرحبا") is None
@@ -0,0 +1,95 @@
+"""Transport codecs: round trips, framing carry-over and end-of-turn flush"""
+
+import math
+import struct
+
+import pytest
+
+from api.codecs import ImaAdpcmCodec, available_codecs, create_codec
+
+
+def _tone(samples: int, rate: int = 24000) -> bytes:
+    return struct.pack(
+        f"<{samples}h", *(int(8000 * math.sin(2 * math.pi * 440 * n / rate)) for n in range(samples))
+    )
+
+
+def _samples(pcm: bytes):
+    return struct.unpack(f"<{len(pcm) // 2}h", pcm)
+
+
+def _round_trip(name: str, pcm: bytes, chunk: int = 960) -> bytes:
+    encoder, decoder = create_codec(name, 24000), create_codec(name, 24000)
+    wire = []
+    for start in range(0, len(pcm), chunk):
+        wire.extend(encoder.encode(pcm[start:start + chunk]))
+    wire.extend(encoder.flush())
+    return b"".join(decoder.decode(message) for message in wire)
+
+
+@pytest.mark.parametrize("name, max_error", [("pcm16", 0), ("mulaw", 0.03), ("adpcm", 0.03)])
+def test_round_trip_stays_close_to_the_input(name, max_error):
+    pcm = _tone(4800)
+    decoded = _round_trip(name, pcm, chunk=998)  # odd-sample chunks exercise the carry-over
+
+    assert len(decoded) == len(pcm)
+    # ADPCM's step size adapts from its minimum over the first few ms
+    errors = [abs(a - b) for a, b in zip(_samples(pcm), _samples(decoded))][200:]
+    assert max(errors) <= max_error * 8000
+
+
+def test_adpcm_messages_decode_independently():
+    encoder = create_codec("adpcm", 24000)
+    pcm = _tone(4800)
+    wire = [message for start in range(0, len(pcm), 960) for message in encoder.encode(pcm[start:start + 960])]
+
+    in_order = create_codec("adpcm", 24000)
+    decoded = [in_order.decode(message) for message in wire]
+    # A message dropped downstream doesn't desync the next one (state rides in its header)
+    assert create_codec("adpcm", 24000).decode(wire[3]) == decoded[3]
+
+
+def test_unknown_codec_is_refused():
+    with pytest.raises(ValueError):
+        create_codec("flac", 24000)
+    assert {"pcm16", "mulaw", "adpcm"} <= set(available_codecs())
+
+
+def test_adpcm_flush_encodes_the_held_back_sample():
+    codec = ImaAdpcmCodec(24000)
+    wire = codec.encode(_tone(101))  # 50 whole bytes, one sample held back
+    assert len(codec.decode(wire[0])) == 100 * 2
+
+    tail = codec.flush()
+    assert len(tail) == 1
+    assert len(codec.decode(tail[0])) == 2 * 2  # the held sample plus one pad sample
+    assert codec.flush() == []
+
+
+def test_flush_is_a_no_op_for_unframed_codecs():
+    for name in ("pcm16", "mulaw"):
+        codec = create_codec(name, 24000)
+        codec.encode(_tone(101))
+        assert codec.flush() == []
+
+
+def test_opus_round_trip_and_bad_packets():
+    pytest.importorskip("opuslib")
+    pcm = _tone(4800)
+    assert len(_round_trip("opus", pcm)) == len(pcm)
+
+    decoder = create_codec("opus", 24000)
+    assert decoder.decode(b"\xff\xff\xff") == b""
+    assert decoder.dropped_packets == 1
+
+
+def test_opus_flush_pads_the_last_partial_frame():
+    pytest.importorskip("opuslib")
+    codec = create_codec("opus", 24000)
+    frame_samples = 24000 * 20 // 1000
+    assert len(codec.encode(_tone(frame_samples + 100))) == 1
+
+    tail = codec.flush()
+    assert len(tail) == 1
+    assert len(codec.decode(tail[0])) == frame_samples * 2
+    assert codec.flush() == []
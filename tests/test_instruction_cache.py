@@ -0,0 +1,62 @@
+"""Instruction context cache: token threshold and measured savings on the fake backend"""
+
+import asyncio
+
+from api.agent_registry import agent_registry
+from api.clients import CHAT_MODEL_ID
+from api.instruction_cache import InstructionCacheManager, min_cache_tokens
+
+LONG_INSTRUCTION = "أنت مساعد مطعم. " * 1500  # ~24k characters, ~6k fake tokens
+
+
+def test_model_minimums():
+    assert min_cache_tokens("gemini-2.5-flash") == 1024
+    assert min_cache_tokens("models/gemini-2.5-flash-lite") == 1024
+    assert min_cache_tokens("gemini-2.5-pro") == 4096
+    assert min_cache_tokens(CHAT_MODEL_ID) == 4096
+
+
+def test_shipped_instruction_is_sent_inline_and_reported(fake_upstream):
+    client = fake_upstream()
+    manager = InstructionCacheManager(enabled=True)
+    instruction = agent_registry.get("sofra").instruction
+
+    config = asyncio.run(manager.chat_config("sofra", instruction, CHAT_MODEL_ID))
+
+    assert config == {"system_instruction": instruction}
+    assert client.aio.caches.entries == {}
+    skipped = manager.stats()["skipped"]
+    assert [entry["agent"] for entry in skipped] == ["sofra"]
+    assert skipped[0]["reason"] == "below_model_minimum"
+    assert skipped[0]["min_tokens"] == 4096
+
+
+def test_large_instruction_is_cached_and_savings_are_measured(fake_upstream):
+    client = fake_upstream(chat_latency=0)
+    manager = InstructionCacheManager(enabled=True)
+
+    async def scenario():
+        prompts = []
+        for use_cache in (False, True, True):
+            config = (
+                await manager.chat_config("sofra", LONG_INSTRUCTION, CHAT_MODEL_ID)
+                if use_cache else {"system_instruction": LONG_INSTRUCTION}
+            )
+            response = await client.aio.models.generate_content(
+                model=CHAT_MODEL_ID, contents="المنيو", config=config
+            )
+            manager.record_usage("sofra", config, response.usage_metadata)
+            usage = response.usage_metadata
+            prompts.append(usage.prompt_token_count - (usage.cached_content_token_count or 0))
+        return prompts
+
+    inline, cached, _ = asyncio.run(scenario())
+    stats = manager.stats()
+    entry = stats["entries"][0]
+
+    assert len(client.aio.caches.entries) == 1  # uploaded once
+    assert stats["skipped"] == []
+    assert entry["instruction_tokens"] >= 4096
+    assert entry["requests"] == 2
+    assert stats["tokens_saved"] == entry["tokens_saved"] == 2 * entry["instruction_tokens"]
+    assert inline - cached == entry["instruction_tokens"]
@@ -0,0 +1,155 @@
+"""Upstream error classification and the Live connect circuit breaker"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from api.admission import AdmissionRejected
+from api import resilience
+from api.resilience import CircuitBreaker, CircuitOpen, is_retryable
+
+
+class UpstreamError(Exception):
+    def __init__(self, code: int):
+        self.code = code
+        super().__init__(f"{code} upstream error")
+
+
+@pytest.mark.parametrize("code", [408, 429, 500, 502, 503, 504, 1011, 1013])
+def test_transient_errors_are_retried(code):
+    assert is_retryable(UpstreamError(code))
+
+
+@pytest.mark.parametrize("code", [400, 401, 403, 404, 501, 505, 1007])
+def test_permanent_errors_are_not_retried(code):
+    assert not is_retryable(UpstreamError(code))
+
+
+def test_status_is_parsed_from_the_message():
+    assert is_retryable(Exception("503 UNAVAILABLE. The model is overloaded."))
+    assert not is_retryable(Exception("501 NOT_IMPLEMENTED"))
+
+
+@pytest.mark.parametrize("exc", [
+    asyncio.TimeoutError(),
+    ConnectionResetError(),
+    httpx.ConnectError("connection refused"),
+    httpx.ConnectTimeout("connect timed out"),
+    httpx.ReadTimeout("read timed out"),
+    httpx.WriteTimeout("write timed out"),
+    httpx.PoolTimeout("no connection available"),
+    httpx.ReadError("connection reset by peer"),
+    httpx.RemoteProtocolError("server disconnected without sending a response"),
+], ids=lambda exc: type(exc).__name__)
+def test_timeouts_and_dropped_connections_are_retried(exc):
+    assert is_retryable(exc)
+
+
+@pytest.mark.parametrize("exc", [
+    AdmissionRejected("chat", "sofra", "queue_timeout"),
+    httpx.UnsupportedProtocol("Request URL is missing a scheme"),
+    httpx.LocalProtocolError("illegal header"),
+    ValueError("bad request payload"),
+], ids=lambda exc: type(exc).__name__)
+def test_local_failures_are_not_retried(exc):
+    assert not is_retryable(exc)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    return clock
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", failure_threshold=3, open_seconds=5, max_open_seconds=20, half_open_probes=1)
+
+
+async def _call(breaker: CircuitBreaker, fail: bool) -> None:
+    async with breaker.guard():
+        if fail:
+            raise ConnectionError("connect failed")
+
+
+def _run(breaker: CircuitBreaker, fail: bool) -> str:
+    """Outcome of one guarded call: ok, failed or refused"""
+    try:
+        asyncio.run(_call(breaker, fail))
+    except CircuitOpen:
+        return "refused"
+    except ConnectionError:
+        return "failed"
+    return "ok"
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = _breaker()
+    assert [_run(breaker, fail=True) for _ in range(3)] == ["failed"] * 3
+    assert breaker.state == CircuitBreaker.OPEN
+    assert _run(breaker, fail=False) == "refused"
+    assert breaker.retry_after() == pytest.approx(5)
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = _breaker()
+    outcomes = [_run(breaker, fail) for fail in (True, True, False, True, True)]
+    assert outcomes == ["failed", "failed", "ok", "failed", "failed"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _run(breaker, fail=True)
+    clock.now += 5
+    breaker.check()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert _run(breaker, fail=False) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_with_doubled_backoff(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _run(breaker, fail=True)
+    opened_for = []
+    for _ in range(3):
+        clock.now += breaker.retry_after()
+        assert _run(breaker, fail=True) == "failed"  # the probe
+        assert breaker.state == CircuitBreaker.OPEN
+        opened_for.append(breaker.retry_after())
+    assert opened_for == [10, 20, 20]  # capped at max_open_seconds
+
+
+def test_only_one_probe_while_half_open(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        _run(breaker, fail=True)
+    clock.now += 5
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def probe():
+            async with breaker.guard():
+                await release.wait()
+
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpen):
+            breaker.check()
+        release.set()
+        await task
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,109 @@
+"""Voice session resumption: the replay buffer and park/resume over a real socket"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+import uvicorn
+import websockets
+
+from api.main import app
+from api.resumption import OutputRingBuffer, voice_sessions
+
+
+def test_ring_buffer_evicts_oldest_and_counts_missed():
+    buffer = OutputRingBuffer(max_bytes=10)
+    for chunk in (b"aaaa", b"bbbb", b"cccc"):
+        buffer.append(chunk)
+
+    assert buffer.dropped == 1
+    assert buffer.drain() == [b"bbbb", b"cccc"]
+    assert (len(buffer), buffer.bytes) == (0, 0)
+
+
+@pytest.fixture
+def server(fake_upstream):
+    """The app on a local port (parking needs a real socket drop, not the test client)"""
+    fake_upstream(reply_seconds=1.0, first_audio_delay=0, connect_latency=0, realtime=True)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        assert thread.is_alive(), "server failed to start"
+        threading.Event().wait(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"ws://127.0.0.1:{port}/ws/voice/sofra"
+    server.should_exit = True
+    thread.join(5)
+
+
+async def _read_turn(ws):
+    """(audio bytes, text events) up to turn_complete"""
+    audio, texts = 0, []
+    while True:
+        message = await asyncio.wait_for(ws.recv(), 5)
+        if isinstance(message, bytes):
+            audio += len(message)
+            continue
+        event = json.loads(message)
+        if event["type"] == "turn_complete":
+            return audio, texts
+        if event["type"] == "text":
+            texts.append(event["content"])
+
+
+async def _drop_mid_reply(url: str, headers=None) -> str:
+    """Start a reply, then vanish without a close frame; the session token"""
+    ws = await websockets.connect(url, additional_headers=headers or {})
+    token = json.loads(await ws.recv())["session_token"]
+    await ws.send(json.dumps({"type": "text_input", "content": "المنيو"}))
+    await ws.recv()
+    ws.transport.abort()
+    return token
+
+
+def test_dropped_client_resumes_with_the_missed_output(server):
+    async def scenario():
+        token = await _drop_mid_reply(server)
+        await asyncio.sleep(0.3)  # the model keeps talking into the resume buffer
+
+        async with websockets.connect(server, additional_headers={"X-Resume-Token": token}) as ws:
+            connected = json.loads(await ws.recv())
+            first_turn = await _read_turn(ws)
+            await ws.send(json.dumps({"type": "text_input", "content": "شكرا"}))
+            second_turn = await _read_turn(ws)
+            await ws.send(json.dumps({"type": "stop"}))
+        return token, connected, first_turn, second_turn
+
+    token, connected, (audio, _), (next_audio, next_texts) = asyncio.run(scenario())
+
+    assert connected["type"] == "connected"
+    assert connected["resumed"] is True
+    assert connected["replayed"] > 0
+    assert connected["missed"] == 0
+    assert connected["session_token"] != token  # single-use: a fresh one per resume
+    assert audio > 0
+    assert next_audio > 0 and next_texts  # the same Live session carries on
+    assert voice_sessions.outcomes.get("resumed", 0) >= 1
+
+
+def test_spent_token_starts_a_fresh_session(server):
+    async def scenario():
+        token = await _drop_mid_reply(server)
+        await asyncio.sleep(0.1)
+        fresh = await _drop_mid_reply(server, {"X-Resume-Token": token})  # resumes, drops again
+        await asyncio.sleep(0.1)
+
+        async with websockets.connect(server, additional_headers={"X-Resume-Token": token}) as ws:
+            spent = json.loads(await ws.recv())
+            await ws.send(json.dumps({"type": "stop"}))
+        async with websockets.connect(server, additional_headers={"X-Resume-Token": fresh}) as ws:
+            rotated = json.loads(await ws.recv())
+            await ws.send(json.dumps({"type": "stop"}))
+        return spent, rotated
+
+    spent, rotated = asyncio.run(scenario())
+
+    assert spent["resumed"] is False
+    assert rotated["resumed"] is True
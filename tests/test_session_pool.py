@@ -0,0 +1,73 @@
+"""Warm Live session pool: idle liveness tracking and connect cleanup"""
+
+import asyncio
+from contextlib import AsyncExitStack
+
+from api.agent_registry import agent_registry
+from api.clients import LIVE_API_VERSION, gemini_clients
+from api.fake_live import FakeLiveScript, FakeLiveSession
+from api.session_pool import LiveSessionPool, PooledSession
+
+
+def _pooled() -> PooledSession:
+    session = FakeLiveSession(FakeLiveScript(), b"")
+    pooled = PooledSession("sofra", session, AsyncExitStack())
+    pooled.watch()
+    return pooled
+
+
+def test_idle_session_stays_open():
+    async def scenario():
+        pooled = _pooled()
+        await asyncio.sleep(0.02)
+        is_open = pooled.is_open()
+        await pooled.aclose()
+        return is_open, pooled.is_open()
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_upstream_close_marks_session_dead():
+    async def scenario():
+        pooled = _pooled()
+        await asyncio.sleep(0)
+        await pooled.session.close()
+        await asyncio.sleep(0.01)
+        return pooled.is_open()
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_detached_session_is_handed_over_untouched():
+    async def scenario():
+        pooled = _pooled()
+        await asyncio.sleep(0)
+        await pooled.detach()
+        # The caller now owns the receive stream: a full turn reaches it
+        await pooled.session.send(input="مرحبا", end_of_turn=True)
+        responses = [response async for response in pooled.session.receive()]
+        return pooled.is_open(), responses
+
+    is_open, responses = asyncio.run(scenario())
+    assert is_open
+    assert responses[-1].server_content.turn_complete
+
+
+def test_closing_the_pool_mid_connect_releases_the_client(fake_upstream):
+    fake_upstream(connect_latency=5)
+
+    async def scenario():
+        pool = LiveSessionPool(
+            agent_registry.get("sofra"), min_size=1, max_size=1, idle_ttl=60, health_interval=60
+        )
+        pool.start()
+        await asyncio.sleep(0.05)
+        connecting = gemini_clients.active_sessions(LIVE_API_VERSION)
+        await pool.aclose()
+        return connecting, gemini_clients.active_sessions(LIVE_API_VERSION), pool
+
+    connecting, after_close, pool = asyncio.run(scenario())
+    assert connecting == 1
+    assert after_close == 0
+    assert pool.stats()["connecting"] == 0
+    assert pool.failures == 0
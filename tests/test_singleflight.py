@@ -0,0 +1,103 @@
+"""SingleFlight: sharing one upstream call between identical requests"""
+
+import asyncio
+
+import pytest
+
+from api.singleflight import SingleFlight
+
+
+class Upstream:
+    """Counts calls; each call waits `delay` and returns its call number"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        call = self.calls
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return call
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights, upstream = SingleFlight("test"), Upstream()
+        results = await asyncio.gather(*(flights.do("key", upstream) for _ in range(5)))
+        return results, upstream, flights
+
+    results, upstream, flights = asyncio.run(scenario())
+    assert results == [1] * 5
+    assert upstream.calls == 1
+    assert flights.stats()["coalesced"] == 4
+    assert flights.in_flight == 0
+
+
+def test_one_caller_leaving_does_not_cancel_the_others():
+    async def scenario():
+        flights, upstream = SingleFlight("test"), Upstream()
+        leaving = asyncio.create_task(flights.do("key", upstream))
+        staying = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        return await staying, leaving, upstream
+
+    result, leaving, upstream = asyncio.run(scenario())
+    assert result == 1
+    assert leaving.cancelled()
+    assert upstream.cancelled == 0
+
+
+def test_last_caller_leaving_cancels_the_call():
+    async def scenario():
+        flights, upstream = SingleFlight("test"), Upstream()
+        caller = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        return flights, upstream
+
+    flights, upstream = asyncio.run(scenario())
+    assert upstream.cancelled == 1
+    assert flights.stats()["abandoned"] == 1
+    assert "key" not in flights
+
+
+def test_caller_arriving_after_cancellation_starts_a_fresh_call():
+    async def scenario():
+        flights, upstream = SingleFlight("test"), Upstream()
+        abandoned = asyncio.create_task(flights.do("key", upstream))
+        await asyncio.sleep(0.01)
+        abandoned.cancel()
+        # Arrives before the cancelled call has finished unwinding
+        latecomer = asyncio.create_task(flights.do("key", upstream))
+        return await latecomer, upstream
+
+    result, upstream = asyncio.run(scenario())
+    assert result == 2
+    assert upstream.calls == 2
+
+
+def test_errors_reach_every_caller_and_clear_the_key():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("503 UNAVAILABLE")
+
+    async def scenario():
+        flights = SingleFlight("test")
+        results = await asyncio.gather(
+            *(flights.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        return results, flights
+
+    results, flights = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "key" not in flights
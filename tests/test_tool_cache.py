@@ -0,0 +1,106 @@
+"""Tool result cache: canonical keys, TTL and coalesced misses"""
+
+import asyncio
+
+import pytest
+
+from agents.core.base_agent import ToolCachePolicy
+from api import tool_cache
+from api.tool_cache import ToolResultCache, canonical_key
+
+
+@pytest.mark.parametrize("a, b", [
+    ({"a": 1, "b": 2.0}, {"b": 2.0000000001, "a": 1.0}),
+    ({"location": " القاهرة "}, {"location": "القاهرة"}),
+    ({"location": "القاهرة", "cuisine": None}, {"location": "القاهرة"}),
+    ({"filters": {"x": 1, "y": [1.0, "a "]}}, {"filters": {"y": [1, "a"], "x": 1.0}}),
+])
+def test_equivalent_arguments_share_a_key(a, b):
+    assert canonical_key(a) == canonical_key(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ({"location": "القاهرة"}, {"location": "الجيزة"}),
+    ({"radius_km": 5}, {"radius_km": 5.5}),
+    ({"lat": 30.0444}, {"lat": 30.0445}),
+    ({"a": True}, {"a": 1}),
+    ({"items": [1, 2]}, {"items": [2, 1]}),
+])
+def test_different_arguments_get_different_keys(a, b):
+    assert canonical_key(a) != canonical_key(b)
+
+
+def test_key_fields_ignore_other_arguments():
+    fields = ("location",)
+    assert canonical_key({"location": "x", "session": 1}, fields) == canonical_key({"location": "x"}, fields)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _run(cache: ToolResultCache, args, calls):
+    async def handler():
+        calls.append(args)
+        return {"result": len(calls)}
+
+    return asyncio.run(cache.get_or_run(args, handler))
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "monotonic", clock)
+    cache = ToolResultCache("sofra", "get_menu", ToolCachePolicy(ttl=60))
+    calls = []
+
+    assert _run(cache, {"restaurant_id": "1"}, calls) == {"result": 1}
+    clock.now += 59
+    assert _run(cache, {"restaurant_id": "1"}, calls) == {"result": 1}
+    clock.now += 2
+    assert _run(cache, {"restaurant_id": "1"}, calls) == {"result": 2}
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 2, 1)
+
+
+def test_errors_are_not_cached():
+    cache = ToolResultCache("sofra", "get_menu", ToolCachePolicy(ttl=60))
+    runs = []
+
+    async def failing():
+        runs.append(1)
+        return {"error": "not found"}
+
+    for _ in range(2):
+        asyncio.run(cache.get_or_run({"restaurant_id": "1"}, failing))
+    assert len(runs) == 2
+
+
+def test_lru_evicts_beyond_max_entries():
+    cache = ToolResultCache("sofra", "get_menu", ToolCachePolicy(ttl=60, max_entries=2))
+    calls = []
+    for restaurant in ("1", "2", "1", "3", "2"):
+        _run(cache, {"restaurant_id": restaurant}, calls)
+    # "2" was least recently used when "3" arrived
+    assert [args["restaurant_id"] for args in calls] == ["1", "2", "3", "2"]
+    assert cache.evictions == 2
+
+
+def test_concurrent_misses_share_one_handler_call():
+    cache = ToolResultCache("sofra", "get_menu", ToolCachePolicy(ttl=60))
+    runs = []
+
+    async def slow():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"menu": []}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_run({"restaurant_id": "1"}, slow) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(runs) == 1
+    assert results == [{"menu": []}] * 5
+    assert (cache.misses, cache.coalesced) == (1, 4)
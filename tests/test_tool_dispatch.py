@@ -0,0 +1,103 @@
+"""Tool dispatch: argument validation and result caches across rebuilds"""
+
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from agents.core.base_agent import ADKTool, AgentRegistry, ToolCachePolicy
+from api.tool_dispatch import ToolArgumentError, ToolDispatcher, ToolDispatchTable, compile_validator
+
+TRACK_ORDER = {
+    "type": "object",
+    "properties": {
+        "order_id": {"type": "string"},
+        "items": {"type": "integer"}
+    },
+    "required": ["order_id"]
+}
+
+
+def test_declared_fields_are_validated_and_coerced():
+    validate = compile_validator(TRACK_ORDER)
+    assert validate({"order_id": "AX-1", "items": 2.0}, "args") == {"order_id": "AX-1", "items": 2}
+
+
+@pytest.mark.parametrize("args, message", [
+    ({}, "missing required field 'order_id'"),
+    ({"order_id": 7}, "args.order_id: expected string"),
+    ({"order_id": "AX-1", "items": 1.5}, "args.items: expected integer"),
+    ({"order_id": "AX-1", "customer": "x"}, "unexpected field(s) ['customer']"),
+])
+def test_mismatches_are_rejected(args, message):
+    with pytest.raises(ToolArgumentError, match=re.escape(message)):
+        compile_validator(TRACK_ORDER)(args, "args")
+
+
+def test_additional_properties_opt_out_of_the_closed_object():
+    validate = compile_validator({**TRACK_ORDER, "additionalProperties": True})
+    assert validate({"order_id": "AX-1", "note": "x"}, "args")["note"] == "x"
+
+
+def _dispatcher(parameters):
+    calls = []
+    tool = ADKTool(
+        name="track_order", description="", description_ar="", parameters=parameters
+    ).set_handler(lambda **kwargs: calls.append(kwargs) or {"status": "ok"})
+    return ToolDispatcher("sofra", [tool]), calls
+
+
+def _call(dispatcher, **args):
+    return asyncio.run(dispatcher.dispatch(SimpleNamespace(name="track_order", args=args)))
+
+
+def test_unknown_argument_never_reaches_the_handler():
+    dispatcher, calls = _dispatcher(TRACK_ORDER)
+
+    result = _call(dispatcher, order_id="AX-1", customer="x")
+
+    assert calls == []
+    assert result["unexpected"] == ["customer"]
+    assert result["allowed"] == ["items", "order_id"]
+    assert result["error"].startswith("Invalid arguments for track_order")
+    assert dispatcher.invalid == 1
+
+
+def test_tool_without_parameters_takes_no_arguments():
+    dispatcher, calls = _dispatcher({})
+
+    assert _call(dispatcher) == {"status": "ok"}
+    assert _call(dispatcher, order_id="AX-1")["unexpected"] == ["order_id"]
+    assert calls == [{}]
+
+
+def test_rebuilt_dispatcher_keeps_the_tool_cache(monkeypatch):
+    runs = []
+    menu = ADKTool(
+        name="get_menu", description="", description_ar="",
+        parameters={"type": "object", "properties": {"restaurant_id": {"type": "string"}}},
+        cache=ToolCachePolicy(ttl=60)
+    ).set_handler(lambda restaurant_id: runs.append(restaurant_id) or {"menu": restaurant_id})
+    agent = SimpleNamespace(tools=[menu], snapshot=SimpleNamespace(declarations=(), version=1))
+    agent.tool_snapshot = lambda: agent.snapshot
+    monkeypatch.setitem(AgentRegistry._agents, "probe", agent)
+
+    table = ToolDispatchTable()
+    table.sync(["probe"])
+    call = SimpleNamespace(name="get_menu", args={"restaurant_id": "7"})
+    asyncio.run(table.get("probe").dispatch(call))
+
+    agent.snapshot = SimpleNamespace(declarations=(), version=2)  # tools reloaded
+    rebuilt = table.get("probe")
+    asyncio.run(rebuilt.dispatch(call))
+
+    assert rebuilt.snapshot.version == 2
+    assert runs == ["7"]
+    assert rebuilt.stats()["cache"]["get_menu"]["hits"] == 1
+
+    menu.cache = ToolCachePolicy(ttl=5)  # a new policy starts a new cache
+    agent.snapshot = SimpleNamespace(declarations=(), version=3)
+    asyncio.run(table.get("probe").dispatch(call))
+    assert runs == ["7", "7"]
+    assert len(table._caches) == 1
@@ -0,0 +1,133 @@
+"""/ws/voice/{agent_id}: the Gemini Live bridge turn loop on the fake backend"""
+
+import json
+import struct
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from api.main import app
+
+
+@pytest.fixture
+def voice(fake_upstream):
+    """Fast fake model: short burst replies, no think time"""
+    client = fake_upstream(
+        reply_seconds=0.2, first_audio_delay=0, connect_latency=0, realtime=False
+    )
+    return TestClient(app), client
+
+
+def _converse(client, path, conversation, timeout=10.0):
+    """
+    Run `conversation(ws)` on a socket to `path`, failing instead of hanging
+    if the bridge stops answering (e.g. after the first turn)
+    """
+    errors = []
+
+    def run():
+        try:
+            with client.websocket_connect(path) as ws:
+                conversation(ws)
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"no reply from the bridge within {timeout}s"
+    if errors:
+        raise errors[0]
+
+
+def _read_turn(ws):
+    """Collect one reply up to turn_complete: (texts, audio bytes)"""
+    texts, audio = [], 0
+    while True:
+        message = ws.receive()
+        if message.get("bytes") is not None:
+            audio += len(message["bytes"])
+            continue
+        event = json.loads(message["text"])
+        if event["type"] == "turn_complete":
+            return texts, audio
+        if event["type"] == "text":
+            texts.append(event["content"])
+        assert event["type"] != "error", event
+
+
+def _stop(ws):
+    ws.send_json({"type": "stop"})
+    # Let the bridge finish its teardown before the test client closes the socket
+    time.sleep(0.05)
+
+
+def test_every_turn_of_a_conversation_gets_a_reply(voice):
+    client, upstream = voice
+
+    def conversation(ws):
+        connected = ws.receive_json()
+        assert connected["type"] == "connected"
+        assert connected["agent"] == "sofra"
+
+        for turn in range(3):
+            ws.send_json({"type": "text_input", "content": f"سؤال {turn}"})
+            texts, audio = _read_turn(ws)
+            assert texts == [upstream.script.reply_text]
+            assert audio > 0
+        _stop(ws)
+
+    _converse(client, "/ws/voice/sofra", conversation)
+
+
+def test_audio_turns_reach_the_model(voice):
+    client, upstream = voice
+    silence = struct.pack("<160h", *([0] * 160))
+
+    def conversation(ws):
+        ws.receive_json()
+        for _ in range(2):
+            for _ in range(10):
+                ws.send_bytes(silence)
+            ws.send_json({"type": "end_turn"})
+            _, audio = _read_turn(ws)
+            assert audio > 0
+        _stop(ws)
+
+    _converse(client, "/ws/voice/sofra", conversation)
+
+
+def test_tool_call_turns_complete(fake_upstream):
+    fake_upstream(
+        reply_seconds=0.2, first_audio_delay=0, connect_latency=0, realtime=False,
+        tool_every=1, tool_name="get_menu", tool_args='{"restaurant_id": "1"}'
+    )
+
+    def conversation(ws):
+        ws.receive_json()
+        for turn in range(2):
+            ws.send_json({"type": "text_input", "content": f"المنيو {turn}"})
+            texts, _ = _read_turn(ws)
+            assert texts
+        _stop(ws)
+
+    _converse(TestClient(app), "/ws/voice/sofra", conversation)
+
+
+def test_agent_ids_are_case_insensitive(voice):
+    client, _ = voice
+    with client.websocket_connect("/ws/voice/Sofra") as ws:
+        assert ws.receive_json()["agent"] == "sofra"
+        _stop(ws)
+
+
+def test_unknown_agent_is_refused(voice):
+    client, _ = voice
+    with client.websocket_connect("/ws/voice/nobody") as ws:
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 4004